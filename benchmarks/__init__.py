@@ -0,0 +1 @@
+# Đây là file init để biến thư mục benchmarks thành một package Python
@@ -0,0 +1,97 @@
+# benchmarks/bench_db_serving.py
+"""
+So sánh thời gian truy vấn giữa chế độ đọc file trên đĩa và chế độ SQLite in-memory
+
+Chạy: python -m benchmarks.bench_db_serving --rows 50000 --repeat 200
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from benchmarks.synthetic_data import make_listings
+from crawler.clean_data import create_sqlite_database
+from utils.db_serving import InMemoryDatabase
+
+# Các truy vấn mà ứng dụng thực hiện (giống utils/data_service.py)
+SIMILAR_LISTINGS_QUERY = """
+    SELECT
+        *,
+        ABS(price_numeric - ?) AS price_diff,
+        ((price_numeric - ?) / ? * 100) AS price_diff_percent
+    FROM motorbikes
+    WHERE 1=1 AND LOWER(brand) LIKE LOWER(?) AND LOWER(model_normalized) LIKE LOWER(?)
+    ORDER BY price_diff ASC, post_date DESC
+"""
+
+QUERY_MIX = [
+    ("get_brands", "SELECT DISTINCT brand FROM motorbikes", ()),
+    ("get_models", "SELECT DISTINCT model_normalized FROM motorbikes WHERE brand = ?", ("Honda",)),
+    ("get_similar_listings", SIMILAR_LISTINGS_QUERY, (30_000_000, 30_000_000, 30_000_000, "%Honda%", "%Vision%")),
+    ("load_market_data", """
+        SELECT brand, COUNT(*), ROUND(AVG(price_numeric), 1)
+        FROM motorbikes GROUP BY brand ORDER BY COUNT(*) DESC
+    """, ()),
+]
+
+
+def disk_connect(db_path):
+    """Mở kết nối mới tới file database (giống chế độ "disk")"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def run_query_mix(connect, repeat):
+    """
+    Chạy toàn bộ các truy vấn, mỗi lần gọi mở một kết nối mới như trong ứng dụng
+
+    Returns:
+        dict: Tên truy vấn -> danh sách thời gian (ms)
+    """
+    timings = {name: [] for name, _, _ in QUERY_MIX}
+    for _ in range(repeat):
+        for name, query, params in QUERY_MIX:
+            start_time = time.perf_counter()
+            conn = connect()
+            conn.execute(query, params).fetchall()
+            conn.close()
+            timings[name].append((time.perf_counter() - start_time) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50_000, help="Số bài đăng giả lập")
+    parser.add_argument("--repeat", type=int, default=200, help="Số lần lặp lại bộ truy vấn")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "motorbike_database.db")
+        create_sqlite_database(make_listings(args.rows), db_path)
+
+        memory_db = InMemoryDatabase(db_path)
+        memory_db.refresh_if_changed(force=True)
+
+        results = {
+            "disk": run_query_mix(lambda: disk_connect(db_path), args.repeat),
+            "memory": run_query_mix(memory_db.connect, args.repeat),
+        }
+
+    print(f"\n{args.rows:,} bài đăng, {args.repeat} lần lặp (thời gian trung vị / p95, ms)")
+    print(f"{'Truy vấn':<24}{'disk':>20}{'memory':>20}{'tăng tốc':>12}")
+    for name, _, _ in QUERY_MIX:
+        disk, memory = results["disk"][name], results["memory"][name]
+        disk_p95 = statistics.quantiles(disk, n=20)[-1]
+        memory_p95 = statistics.quantiles(memory, n=20)[-1]
+        speedup = statistics.median(disk) / statistics.median(memory)
+        print(
+            f"{name:<24}{statistics.median(disk):>10.3f} / {disk_p95:<7.3f}"
+            f"{statistics.median(memory):>10.3f} / {memory_p95:<7.3f}{speedup:>10.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
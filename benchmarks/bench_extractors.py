@@ -0,0 +1,58 @@
+# benchmarks/bench_extractors.py
+"""
+Đo tốc độ trích xuất (trang/giây) của các bộ trích xuất trên các trang mẫu đã lưu
+
+Chạy: python -m benchmarks.bench_extractors --seconds 2
+"""
+import argparse
+import os
+import time
+
+from crawler.extractors import LxmlExtractor, SoupExtractor, StructuredDataExtractor, etree
+
+FIXTURE_DIR = os.path.join("tests", "crawler", "fixtures")
+
+
+def pages_per_second(func, content, seconds):
+    """Gọi func(content) liên tục trong khoảng seconds giây, trả về số trang mỗi giây"""
+    count = 0
+    start_time = time.perf_counter()
+    while True:
+        func(content)
+        count += 1
+        elapsed = time.perf_counter() - start_time
+        if elapsed >= seconds:
+            return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=2.0, help="Thời gian đo cho mỗi bộ trích xuất và mỗi trang")
+    args = parser.parse_args()
+
+    pages = {}
+    for name in ("listing_page", "detail_page"):
+        with open(os.path.join(FIXTURE_DIR, f"{name}.html"), encoding="utf-8") as f:
+            pages[name] = f.read()
+
+    extractors = [SoupExtractor(), StructuredDataExtractor()]
+    if etree is not None:
+        extractors.append(LxmlExtractor())
+    else:
+        print("Chưa cài lxml, bỏ qua LxmlExtractor")
+
+    print(f"\n{'Bộ trích xuất':<16}{'Trang danh sách (trang/s)':>28}{'Trang chi tiết (trang/s)':>28}")
+    baseline = None
+    for extractor in extractors:
+        listing = pages_per_second(extractor.listing_urls, pages["listing_page"], args.seconds)
+        detail = pages_per_second(extractor.detail, pages["detail_page"], args.seconds)
+        if baseline is None:
+            baseline = (listing, detail)
+        print(
+            f"{extractor.name:<16}{listing:>18.1f} (x{listing / baseline[0]:<5.1f})"
+            f"{detail:>18.1f} (x{detail / baseline[1]:<5.1f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
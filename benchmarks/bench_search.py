@@ -0,0 +1,65 @@
+# benchmarks/bench_search.py
+"""
+Đo thời gian tìm kiếm toàn văn (FTS5) so với quét LIKE trên toàn bảng
+
+Chạy: python -m benchmarks.bench_search --rows 1000000 --repeat 50
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from benchmarks.synthetic_data import make_listings
+from crawler.clean_data import create_sqlite_database
+from utils.text_search import search_listing_ids
+
+QUERIES = ["chính chủ", "biển số đẹp", "Air Blade 2019", "exciter bao test", "sh mo"]
+
+LIKE_QUERY = """
+    SELECT * FROM motorbikes
+    WHERE title LIKE ? OR description LIKE ?
+    LIMIT 20
+"""
+
+
+def time_call(func, repeat):
+    """Trả về danh sách thời gian (ms) của các lần gọi hàm"""
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start_time) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Số bài đăng giả lập")
+    parser.add_argument("--repeat", type=int, default=50, help="Số lần lặp lại mỗi truy vấn")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "motorbike_database.db")
+        start_time = time.perf_counter()
+        create_sqlite_database(make_listings(args.rows), db_path)
+        build_seconds = time.perf_counter() - start_time
+
+        conn = sqlite3.connect(db_path)
+        print(f"\n{args.rows:,} bài đăng, tạo database + chỉ mục trong {build_seconds:.1f}s")
+        print(f"{'Truy vấn':<20}{'FTS5 trung vị / p95 (ms)':>28}{'LIKE trung vị (ms)':>22}")
+        for text in QUERIES:
+            fts = time_call(lambda: search_listing_ids(conn, text, limit=20), args.repeat)
+            like = time_call(
+                lambda: conn.execute(LIKE_QUERY, (f"%{text}%", f"%{text}%")).fetchall(), max(2, args.repeat // 10)
+            )
+            print(
+                f"{text:<20}{statistics.median(fts):>16.3f} / {statistics.quantiles(fts, n=20)[-1]:<9.3f}"
+                f"{statistics.median(like):>20.3f}"
+            )
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
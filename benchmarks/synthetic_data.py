@@ -0,0 +1,82 @@
+# benchmarks/synthetic_data.py
+import numpy as np
+import pandas as pd
+
+# Các mẫu xe theo thương hiệu, giá tham khảo (triệu VND)
+MODEL_CATALOGUE = {
+    "Honda": {"Vision": 30, "Air Blade": 42, "SH Mode": 55, "Lead": 38, "Wave": 16, "Future": 28,
+              "Blade": 19, "Winner X": 40, "Winner": 32},
+    "Yamaha": {"Exciter": 38, "Sirius": 17, "Jupiter": 22, "Nouvo": 20, "Mio": 14},
+    "Suzuki": {"Raider": 35, "Satria": 45},
+    "Piaggio": {"Liberty": 50},
+    "SYM": {"Attila": 18, "Elegant": 12, "Angela": 14},
+}
+
+PROVINCES = ["TP. Hồ Chí Minh", "Hà Nội", "Đà Nẵng", "Bình Dương", "Đồng Nai", "Cần Thơ", "Hải Phòng"]
+ORIGINS = ["Việt Nam", "Thái Lan", "Nhật Bản", "Indonesia"]
+PHRASES = ["chính chủ", "biển số đẹp", "máy êm", "bao test", "xe zin", "giấy tờ đầy đủ", "đi kỹ", "mới thay nhớt"]
+
+
+def make_listings(n_rows, seed=42):
+    """
+    Tạo DataFrame bài đăng giả lập có cùng cấu trúc với đầu ra của filter_raw_data
+
+    Args:
+        n_rows (int): Số bài đăng cần tạo
+        seed (int): Hạt giống ngẫu nhiên
+
+    Returns:
+        DataFrame chứa các bài đăng giả lập
+    """
+    rng = np.random.default_rng(seed)
+
+    pairs = [(brand, model, price) for brand, models in MODEL_CATALOGUE.items() for model, price in models.items()]
+    idx = rng.integers(0, len(pairs), n_rows)
+    brands = np.array([p[0] for p in pairs])[idx]
+    models = np.array([p[1] for p in pairs])[idx]
+    ref_prices = np.array([p[2] for p in pairs], dtype=float)[idx]
+
+    reg_year = rng.integers(2005, 2026, n_rows)
+    mileage = rng.integers(500, 120_000, n_rows)
+    age = 2025 - reg_year
+    price_millions = np.round(ref_prices * (0.93 ** age) * rng.lognormal(0, 0.15, n_rows), 2)
+    price_numeric = (price_millions * 1_000_000).astype(np.int64)
+    days_since_posted = rng.integers(0, 365, n_rows)
+    post_date = pd.Timestamp("2025-04-30") - pd.to_timedelta(days_since_posted, unit="D")
+
+    phrase_idx = rng.integers(0, len(PHRASES), (n_rows, 2))
+    phrases = np.array(PHRASES)
+    titles = pd.Series(brands) + " " + pd.Series(models) + " " + pd.Series(reg_year).astype(str)
+    descriptions = (
+        "Cần bán " + titles + ", " + pd.Series(phrases[phrase_idx[:, 0]]) + ", " + pd.Series(phrases[phrase_idx[:, 1]])
+    )
+    provinces = np.array(PROVINCES)[rng.integers(0, len(PROVINCES), n_rows)]
+    origins = np.array(ORIGINS)[rng.integers(0, len(ORIGINS), n_rows)]
+    urls = [f"/mua-ban-xe-may/{100_000_000 + i}.htm" for i in range(n_rows)]
+
+    return pd.DataFrame({
+        "title": titles,
+        "price": [f"{p:,}".replace(",", ".") + " đ" for p in price_numeric],
+        "price_numeric": price_numeric,
+        "description": descriptions,
+        "model": models,
+        "model_normalized": models,
+        "brand": brands,
+        "reg_year": reg_year.astype(str),
+        "reg_year_numeric": reg_year,
+        "mileage": mileage.astype(str),
+        "mileage_numeric": mileage,
+        "origin": origins,
+        "origin_normalized": origins,
+        "location": provinces,
+        "province": provinces,
+        "condition": "Đã sử dụng",
+        "vehicle_type": "Tay ga",
+        "engine_capacity": "100 - 175 cc",
+        "post_time": [f"Đăng {d} ngày trước" for d in days_since_posted],
+        "days_since_posted": days_since_posted,
+        "post_date": post_date,
+        "url": urls,
+        "url_full": ["https://xe.chotot.com" + u for u in urls],
+        "price_millions": price_millions,
+    })
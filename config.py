@@ -1,6 +1,7 @@
 import os
 import sqlite3
 import streamlit as st
+from utils.db_serving import get_memory_database
 
 # Đường dẫn database
 DB_PATH = os.path.join('data', 'motorbike_database.db')
@@ -8,9 +9,58 @@ DB_PATH = os.path.join('data', 'motorbike_database.db')
 # Đường dẫn đến model
 MODEL_PATH = os.path.join('models', 'rf.pkl')
 
+# Chế độ phục vụ database: "disk" (đọc trực tiếp file) hoặc "memory" (nạp vào SQLite in-memory khi khởi động)
+DB_SERVING_MODE = os.getenv("DB_SERVING_MODE", "disk")
+
+# Cache kết quả truy vấn trên đĩa, dùng chung giữa các tiến trình (để trống RESULT_CACHE_DIR để tắt)
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", os.path.join('data', 'cache'))
+RESULT_CACHE_MAX_MB = int(os.getenv("RESULT_CACHE_MAX_MB", "256"))
+
+# Kiểm tra bài đăng còn tồn tại (liveness sweeper): thời gian chờ mỗi request (giây)
+LIVENESS_REQUEST_TIMEOUT = float(os.getenv("LIVENESS_REQUEST_TIMEOUT", "2.5"))
+
+# Crawler Chợ Tốt: số request mỗi giây và số request đồng thời tối đa cho mỗi host
+CRAWL_RATE = float(os.getenv("CRAWL_RATE", "2"))
+CRAWL_MAX_IN_FLIGHT = int(os.getenv("CRAWL_MAX_IN_FLIGHT", "4"))
+# Thời gian chờ kết nối và chờ dữ liệu của mỗi request (giây), để server treo không giữ mãi một luồng
+CRAWL_CONNECT_TIMEOUT = float(os.getenv("CRAWL_CONNECT_TIMEOUT", "5"))
+CRAWL_READ_TIMEOUT = float(os.getenv("CRAWL_READ_TIMEOUT", "20"))
+
+# Trạng thái thu thập (mã tin, lần đầu/lần cuối thấy, hash nội dung) để không tải lại bài đăng đã có;
+# bài đăng đã tải trong CRAWL_REFETCH_HOURS giờ thì bỏ qua (để trống CRAWL_STATE_PATH để tắt)
+CRAWL_STATE_PATH = os.getenv("CRAWL_STATE_PATH", os.path.join('data', 'crawl_state.db'))
+CRAWL_REFETCH_HOURS = float(os.getenv("CRAWL_REFETCH_HOURS", "72"))
+
+# Nhật ký ghi trước (JSONL) các bài đăng đã trích xuất, dùng để tiếp tục lượt thu thập bị dừng giữa chừng
+CRAWL_LOG_PATH = os.getenv("CRAWL_LOG_PATH", os.path.join('data', 'raw', 'chotot_details.jsonl'))
+# Số nhật ký cũ (đã đổi tên khi bắt đầu lượt mới) được giữ lại, các nhật ký cũ hơn bị xóa
+# (chỉ khi dùng trạng thái thu thập, nơi đã lưu bản ghi của mọi bài đăng)
+CRAWL_LOG_KEEP = int(os.getenv("CRAWL_LOG_KEEP", "5"))
+
+# API phân tích ảnh/mô tả (có thể trỏ tới server thay thế khi test) và thời gian nhớ kết quả phân tích (giây)
+CLAUDE_API_URL = os.getenv("CLAUDE_API_URL", "https://api.anthropic.com/v1/messages")
+ANALYSIS_CACHE_TTL = int(os.getenv("ANALYSIS_CACHE_TTL", str(7 * 24 * 3600)))
+
+# Gọi API phân tích: số request đồng thời tối đa của mỗi tiến trình, số lần thử lại lỗi 429/5xx,
+# thời gian chờ một request và thời hạn của cả lời gọi (giây)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "30"))
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", "60"))
+
+# Cache ảnh đã render của các biểu đồ trong bộ nhớ mỗi tiến trình (số biểu đồ và dung lượng tối đa)
+FIGURE_CACHE_MAX_ENTRIES = int(os.getenv("FIGURE_CACHE_MAX_ENTRIES", "64"))
+FIGURE_CACHE_MAX_MB = int(os.getenv("FIGURE_CACHE_MAX_MB", "64"))
+
+# Ảnh gửi đi phân tích được thu nhỏ về cạnh dài tối đa (pixel) và nén lại JPEG với chất lượng này
+ANALYSIS_IMAGE_MAX_EDGE = int(os.getenv("ANALYSIS_IMAGE_MAX_EDGE", "1568"))
+ANALYSIS_IMAGE_QUALITY = int(os.getenv("ANALYSIS_IMAGE_QUALITY", "85"))
+
 # Hàm kết nối trực tiếp đến database
 def get_db_connection():
     """Kết nối đến database với đường dẫn tuyệt đối"""
+    if DB_SERVING_MODE == "memory":
+        return get_memory_database(DB_PATH).connect()
     db_path = os.path.abspath(DB_PATH)
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
@@ -24,6 +74,13 @@ def check_database():
         return False
     return True
 
+# Nạp database vào bộ nhớ khi khởi động (chỉ ở chế độ "memory")
+def preload_database():
+    """Nạp trước database vào SQLite in-memory khi DB_SERVING_MODE = 'memory'"""
+    if DB_SERVING_MODE != "memory" or not os.path.exists(DB_PATH):
+        return
+    get_memory_database(DB_PATH)
+
 # Kiểm tra model tồn tại
 def check_model():
     """Kiểm tra xem model có tồn tại không"""
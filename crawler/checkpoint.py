@@ -0,0 +1,137 @@
+# crawler/checkpoint.py
+import csv
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+
+logger = logging.getLogger("ChototCrawler")
+
+
+class CrawlLog:
+    """
+    Nhật ký ghi trước (JSONL) của một lượt thu thập: mỗi bài đăng được ghi thành một dòng ngay khi
+    trích xuất xong và được flush xuống đĩa, nên dừng giữa chừng chỉ mất bài đăng đang xử lý
+
+    Dòng cuối bị cắt dở (khi tiến trình bị dừng lúc đang ghi) được bỏ qua khi đọc lại.
+    """
+    def __init__(self, path, resume=False, fsync=True, keep_rotated=None):
+        """
+        Args:
+            path (str): Đường dẫn file JSONL
+            resume (bool): Ghi tiếp vào nhật ký cũ; nếu False thì nhật ký cũ được đổi tên
+                           (thêm hậu tố thời gian) và bắt đầu nhật ký mới
+            fsync (bool): Gọi fsync sau mỗi dòng (an toàn cả khi mất điện)
+            keep_rotated (int): Số nhật ký cũ được giữ lại sau khi đổi tên (None để giữ tất cả). Chỉ đặt khi
+                                dữ liệu của nhật ký đã được lưu ở nơi khác (trạng thái thu thập)
+        """
+        self.path = path
+        self.fsync = fsync
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        if not resume and os.path.exists(path) and os.path.getsize(path) > 0:
+            rotated = f"{path}.{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+            os.replace(path, rotated)
+            logger.info(f"Đã chuyển nhật ký cũ sang {rotated}")
+            if keep_rotated is not None:
+                self.prune_rotated(keep_rotated)
+
+        self._lock = threading.Lock()
+        self._file = open(path, "a+", encoding="utf-8")
+        # Dòng cuối bị cắt dở thì xuống dòng trước khi ghi tiếp
+        self._file.seek(0, os.SEEK_END)
+        if self._file.tell() > 0:
+            self._file.seek(self._file.tell() - 1)
+            if self._file.read(1) != "\n":
+                self._file.write("\n")
+
+    def rotated_paths(self):
+        """Các nhật ký cũ đã được đổi tên (path.<YYYYmmdd-HHMMSS>), cũ nhất trước"""
+        return rotated_log_paths(self.path)
+
+    def prune_rotated(self, keep):
+        """
+        Xóa các nhật ký cũ, chỉ giữ lại keep nhật ký mới nhất
+
+        Returns:
+            list: Các file đã xóa
+        """
+        rotated = self.rotated_paths()
+        removed = rotated[:max(len(rotated) - keep, 0)]
+        for rotated_path in removed:
+            os.remove(rotated_path)
+        if removed:
+            logger.info(f"Đã xóa {len(removed)} nhật ký cũ của {self.path}")
+        return removed
+
+    def append(self, record):
+        """Ghi một bài đăng vào cuối nhật ký"""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def records(self):
+        """Đọc lần lượt các bài đăng đã ghi (không nạp cả file vào bộ nhớ)"""
+        return read_log(self.path)
+
+    def completed_urls(self):
+        """Tập URL đã có trong nhật ký"""
+        return {record["url"] for record in self.records() if record.get("url")}
+
+    def export_csv(self, csv_path, fieldnames):
+        """
+        Ghi toàn bộ nhật ký ra CSV theo từng dòng
+
+        Returns:
+            int: Số bài đăng đã ghi
+        """
+        return write_csv(self.records(), csv_path, fieldnames)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def rotated_log_paths(path):
+    """Các nhật ký cũ của path đã được đổi tên (path.<YYYYmmdd-HHMMSS>), cũ nhất trước"""
+    directory = os.path.dirname(path) or "."
+    if not os.path.isdir(directory):
+        return []
+    pattern = re.compile(re.escape(os.path.basename(path)) + r"\.\d{8}-\d{6}$")
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if pattern.match(name))
+
+
+def read_log(path):
+    """Đọc lần lượt các bài đăng trong một file nhật ký (bỏ qua dòng hỏng), rỗng nếu không có file"""
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def write_csv(records, csv_path, fieldnames):
+    """
+    Ghi lần lượt các bản ghi ra CSV (không giữ cả danh sách trong bộ nhớ)
+
+    Returns:
+        int: Số bản ghi đã ghi
+    """
+    count = 0
+    with open(csv_path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            count += 1
+    return count
@@ -1,8 +1,16 @@
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
-import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from config import (
+    CRAWL_RATE, CRAWL_MAX_IN_FLIGHT, CRAWL_STATE_PATH, CRAWL_REFETCH_HOURS, CRAWL_LOG_PATH, CRAWL_LOG_KEEP,
+    CRAWL_CONNECT_TIMEOUT, CRAWL_READ_TIMEOUT,
+)
+from crawler.rate_limiter import HostRateLimiter, ThroughputMeter
+from crawler.http_session import CrawlSession
+from crawler.extractors import ExtractorChain, DETAIL_FIELDS
+from crawler.crawl_state import CrawlStateStore
+from crawler.checkpoint import CrawlLog, read_log, rotated_log_paths, write_csv
 
 # Cấu hình logging
 logging.basicConfig(
@@ -18,12 +26,31 @@ logger = logging.getLogger("ChototCrawler")
 class ChototCrawler:
     """Crawler để thu thập dữ liệu từ website Chợ Tốt"""
     
-    def __init__(self):
-        """Khởi tạo crawler với các cấu hình cơ bản"""
+    def __init__(self, rate=CRAWL_RATE, max_in_flight=CRAWL_MAX_IN_FLIGHT, extractor=None,
+                 state_path=CRAWL_STATE_PATH, refetch_after_hours=CRAWL_REFETCH_HOURS,
+                 timeout=(CRAWL_CONNECT_TIMEOUT, CRAWL_READ_TIMEOUT)):
+        """Khởi tạo crawler với các cấu hình cơ bản
+        
+        Args:
+            rate (float): Số request mỗi giây tối đa cho mỗi host
+            max_in_flight (int): Số request đồng thời tối đa cho mỗi host
+            extractor: Bộ trích xuất dữ liệu từ trang (mặc định ExtractorChain: dữ liệu có cấu trúc, rồi HTML)
+            state_path (str): File SQLite lưu trạng thái thu thập (None để luôn tải lại mọi bài đăng)
+            refetch_after_hours (float): Bài đăng đã tải trong khoảng này thì không tải lại
+            timeout (tuple): Thời gian chờ (kết nối, đọc dữ liệu) của mỗi request (giây)
+        """
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         self.base_url = "https://xe.chotot.com/mua-ban-xe-may"
+        self.max_in_flight = max_in_flight
+        # Mọi request đi qua bộ giới hạn tốc độ theo host
+        self.limiter = HostRateLimiter(rate, max_in_flight)
+        # Kết nối keep-alive dùng chung, số kết nối mỗi host bằng số request đồng thời được phép
+        self.session = CrawlSession(self.headers, pool_size=max(max_in_flight, 1), timeout=timeout)
+        self.extractor = extractor or ExtractorChain()
+        self.state = CrawlStateStore(state_path, refetch_after_hours) if state_path else None
+        self.last_crawl_stats = None
         
     def get_page_content(self, url):
         """Lấy nội dung từ một trang web
@@ -35,29 +62,24 @@ class ChototCrawler:
             str: Nội dung HTML của trang web hoặc None nếu có lỗi
         """
         try:
-            response = requests.get(url, headers=self.headers)
+            with self.limiter.slot(url):
+                response = self.session.get(url)
             response.raise_for_status()
             return response.text
         except requests.RequestException as e:
             logger.error(f"Lỗi khi tải trang: {e}")
             return None
             
-    def parse_single_listing(self, listing):
-        """Phân tích một phần tử sản phẩm để lấy URL
-        
-        Args:
-            listing (BeautifulSoup): Đối tượng BeautifulSoup của phần tử sản phẩm
-            
-        Returns:
-            str: URL của sản phẩm hoặc None nếu có lỗi
-        """
-        try:
-            href = listing.find('a', class_='cebeqpz')['href']
-            logger.info(f"Đã tìm thấy URL: {href}")
-            return href
-        except Exception as e:
-            logger.error(f"Lỗi khi phân tích phần tử: {e}")
-            return None
+    def _log_transfer(self, label):
+        """Ghi log số byte tải về và tỷ lệ tái sử dụng kết nối của lượt thu thập vừa xong"""
+        stats = self.session.stats()
+        reuse = f"{stats['reuse_ratio']:.0%}" if stats['reuse_ratio'] is not None else "-"
+        logger.info(
+            f"Lượt thu thập {label}: {stats['requests']} request, {stats['bytes_wire']:,} bytes qua mạng "
+            f"({stats['bytes_decoded']:,} bytes sau giải nén), {stats['new_connections']} kết nối mới, "
+            f"tái sử dụng kết nối {reuse}"
+        )
+        return stats
             
     def parse_page_listings(self, content):
         """Phân tích nội dung trang để lấy danh sách các URL sản phẩm
@@ -71,27 +93,28 @@ class ChototCrawler:
         if not content:
             return []
         
-        soup = BeautifulSoup(content, 'html.parser')
-        listings = soup.find_all('li', {'itemtype': 'http://schema.org/ListItem'})
-        
-        all_listings = []
-        for listing in listings:
-            data = self.parse_single_listing(listing)
-            if data:
-                all_listings.append(data)
-        
+        all_listings = self.extractor.listing_urls(content)
+        for href in all_listings:
+            logger.info(f"Đã tìm thấy URL: {href}")
         return all_listings
             
-    def scrape_multiple_pages(self, num_pages=5):
+    def scrape_multiple_pages(self, num_pages=5, stop_when_known=True):
         """Thu thập URL sản phẩm từ nhiều trang
         
+        Trang danh sách xếp tin mới nhất trước, nên khi mọi bài đăng trên một trang đều đã được tải
+        trang chi tiết gần đây thì các trang sau cũng vậy và việc phân trang dừng lại. Bài đăng chỉ mới
+        thấy trên trang danh sách (lượt chỉ lấy URL, hoặc lượt tải chi tiết bị dừng giữa chừng)
+        vẫn được tính là cần tải.
+        
         Args:
-            num_pages (int): Số trang cần thu thập
+            num_pages (int): Số trang tối đa cần thu thập
+            stop_when_known (bool): Dừng khi gặp trang không còn bài đăng cần tải (cần trạng thái thu thập)
             
         Returns:
             list: Danh sách các URL sản phẩm
         """
         all_listings = []
+        self.session.reset_stats()
         
         for page in range(1, num_pages + 1):
             logger.info(f"\nĐang thu thập trang {page}...")
@@ -103,9 +126,18 @@ class ChototCrawler:
             if page_listings:
                 all_listings.extend(page_listings)
                 logger.info(f"Đã tìm thấy {len(page_listings)} sản phẩm trên trang {page}")
-            
-            # Chờ giữa các request để không gây quá tải cho server
-            time.sleep(1)
+                
+                if self.state is not None:
+                    new_listings = self.state.mark_seen(page_listings)
+                    pending = self.state.pending_fetch(page_listings)
+                    logger.info(
+                        f"Trang {page} có {len(new_listings)} bài đăng mới, {len(pending)} bài đăng cần tải"
+                    )
+                    if stop_when_known and not pending:
+                        logger.info(f"Trang {page} không còn bài đăng cần tải, dừng phân trang")
+                        break
+        
+        self._log_transfer("danh sách")
         
         # Lưu danh sách URLs vào file CSV
         df = pd.DataFrame(all_listings)
@@ -127,88 +159,111 @@ class ChototCrawler:
         try:
             logger.info(f"\nĐang phân tích URL: {url}")
             full_url = self.base_url + url if not url.startswith('http') else url
-            response = requests.get(full_url, headers=self.headers)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Trích xuất các thông tin cần thiết
-            title = soup.find("div", {"class": "cpmughi"}).find("h1").text
-            price = soup.find("b", {"class": "p26z2wb"}).text
-            description = soup.find("p", {"class": "cvatvjo"}).text
-            details = soup.find_all("span", {"class": "bwq0cbs"})
-            
-            # Trích xuất các chi tiết cụ thể
-            origin = details[7].text
-            location = details[8].text
-            post_time = details[9].text
-            brand = details[11].text
-            model = details[13].text
-            reg_year = details[15].text
-            mileage = details[17].text
-            condition = details[19].text
-            vehicle_type = details[21].text
-            engine_capacity = details[23].text
-            warranty = details[27].text
-            weight = details[29].text
+            with self.limiter.slot(full_url):
+                response = self.session.get(full_url)
+            # 429/5xx được tính là lỗi thay vì phân tích trang báo lỗi
+            response.raise_for_status()
+            data = self.extractor.detail(response.text)
+            if data is None:
+                logger.error(f"Không trích xuất được thông tin từ trang sản phẩm {url}")
+                return None
             
             # In thông tin để kiểm tra
-            logger.info(f"Tiêu đề: {title}")
-            logger.info(f"Giá: {price}")
+            logger.info(f"Tiêu đề: {data['title']}")
+            logger.info(f"Giá: {data['price']}")
             
-            # Trả về dưới dạng từ điển
-            return {
-                "title": title,
-                "price": price,
-                "description": description,
-                "origin": origin,
-                "location": location,
-                "post_time": post_time,
-                "brand": brand,
-                "model": model,
-                "reg_year": reg_year,
-                "mileage": mileage,
-                "condition": condition,
-                "vehicle_type": vehicle_type,
-                "engine_capacity": engine_capacity,
-                "warranty": warranty,
-                "weight": weight,
-                "url": url
-            }
+            data["url"] = url
+            return data
             
         except Exception as e:
             logger.error(f"Lỗi khi phân tích trang sản phẩm {url}: {e}")
             return None
             
-    def scrape_listings_with_details(self, urls):
+    def scrape_listings_with_details(self, urls, resume=False, log_path=CRAWL_LOG_PATH):
         """Thu thập thông tin chi tiết từ danh sách URLs
         
+        Các trang chi tiết được tải song song (tối đa max_in_flight request đồng thời),
+        tốc độ được giữ bởi bộ giới hạn theo host. Bài đăng đã tải trong refetch_after_hours giờ
+        gần đây được bỏ qua. Mỗi bài đăng được lưu ngay (không giữ trong bộ nhớ): bản ghi vào trạng thái
+        thu thập, và bài đăng mới hoặc đổi nội dung vào nhật ký JSONL. File CSV được xuất lại ở cuối lượt
+        từ trạng thái thu thập (gồm cả bài đăng không tải lại ở lượt này), hoặc từ nhật ký nếu không dùng
+        trạng thái thu thập.
+        
         Args:
             urls (list): Danh sách URLs sản phẩm cần thu thập
+            resume (bool): Tiếp tục lượt trước bị dừng giữa chừng: giữ nhật ký cũ và bỏ qua các URL đã có trong đó
+            log_path (str): Đường dẫn nhật ký JSONL
             
         Returns:
-            list: Danh sách thông tin chi tiết của các sản phẩm
+            dict: Số liệu của lượt thu thập (cũng lưu ở last_crawl_stats), gồm records (số bài đăng trong file CSV)
+                  và log_path
         """
-        all_data = []
+        keep_rotated = None
+        if self.state is not None:
+            # Mọi bài đăng được lưu vào trạng thái thu thập trước khi ghi nhật ký, nên nhật ký cũ chỉ là bản sao
+            # và có thể xóa bớt; riêng nhật ký từ trước khi trạng thái lưu bản ghi thì phải gộp vào trước
+            if self.state.missing_records():
+                imported = sum(
+                    self.state.import_records(read_log(path))
+                    for path in [log_path] + rotated_log_paths(log_path)[::-1]
+                )
+                logger.info(f"Đã gộp {imported} bản ghi từ nhật ký cũ vào trạng thái thu thập")
+            keep_rotated = CRAWL_LOG_KEEP
+        log = CrawlLog(log_path, resume=resume, keep_rotated=keep_rotated)
+        completed = 0
+        if resume:
+            done = log.completed_urls()
+            completed = sum(1 for url in urls if url in done)
+            urls = [url for url in urls if url not in done]
+            logger.info(f"Tiếp tục lượt trước: {completed} bài đăng đã có trong nhật ký {log_path}")
+        
+        skipped = 0
+        if self.state is not None:
+            pending = self.state.pending_fetch(urls)
+            skipped = len(urls) - len(pending)
+            logger.info(f"Bỏ qua {skipped} bài đăng đã tải gần đây, còn {len(pending)} bài cần tải")
+            urls = pending
+        
         total = len(urls)
+        meter = ThroughputMeter()
+        self.session.reset_stats()
         
-        for i, url in enumerate(urls, 1):
+        def fetch(item):
+            i, url = item
             logger.info(f"Đang xử lý {i}/{total}: {url}")
-            
-            # Thêm độ trễ nhỏ để tránh bị chặn
-            time.sleep(1)
-            
-            # Trích xuất dữ liệu
             data = self.extract_data(url)
-            if data:
-                all_data.append(data)
-                
+            meter.record(data is not None)
+            if data is None:
+                return False
+            # Bản ghi và lần tải được lưu cùng một transaction; nhật ký chỉ nhận bài đăng mới hoặc đổi nội dung
+            is_changed = self.state is None or self.state.record_fetch(url, data)
+            if is_changed:
+                log.append(data)
+            
             # Ghi log tiến độ
             if i % 10 == 0:
                 logger.info(f"Đã xử lý {i}/{total} URLs")
+            return is_changed
         
-        # Lưu kết quả vào file CSV
-        df = pd.DataFrame(all_data)
+        try:
+            with ThreadPoolExecutor(max_workers=max(self.max_in_flight, 1), thread_name_prefix="chotot") as executor:
+                changed = sum(executor.map(fetch, enumerate(urls, 1)))
+        finally:
+            log.close()
+        
+        self.last_crawl_stats = meter.report()
+        self.last_crawl_stats.update(skipped=skipped, changed=changed, resumed=completed, log_path=log_path)
+        self.last_crawl_stats["transfer"] = self._log_transfer("chi tiết")
+        logger.info(
+            f"Đã tải {self.last_crawl_stats['requests']} trang chi tiết trong {self.last_crawl_stats['elapsed_s']} giây "
+            f"({self.last_crawl_stats['requests_per_s']} trang/giây, {self.last_crawl_stats['failed']} lỗi, "
+            f"{changed} bài mới hoặc thay đổi nội dung)"
+        )
+        
+        # Xuất lại file CSV (đọc từng dòng) từ kho bản ghi tích lũy, hoặc từ nhật ký nếu không có trạng thái thu thập
         filename = 'data/processed/chotot_motorbikes.csv'
-        df.to_csv(filename, index=False, encoding='utf-8-sig')
-        logger.info(f"Đã lưu dữ liệu chi tiết vào file {filename}")
+        records = self.state.records() if self.state is not None else log.records()
+        self.last_crawl_stats["records"] = write_csv(records, filename, DETAIL_FIELDS + ["url"])
+        logger.info(f"Đã lưu {self.last_crawl_stats['records']} bài đăng vào file {filename}")
         
-        return all_data
\ No newline at end of file
+        return self.last_crawl_stats
@@ -3,7 +3,12 @@ import numpy as np
 import logging
 import os
 import re
+import hashlib
 from datetime import datetime
+from utils.text_search import build_search_index
+from utils.price_sketch import store_price_sketches
+from utils.price_histogram import store_price_histograms
+from utils.price_trend import update_price_trends
 
 # Thiết lập logger
 logger = logging.getLogger("data_preprocessing")
@@ -591,27 +596,134 @@ def filter_raw_data(csv_file_path, output_file_path=None):
         logger.error(traceback.format_exc())
         return pd.DataFrame()
 
+def compute_data_version(df):
+    """
+    Tính phiên bản dữ liệu dựa trên hash nội dung của DataFrame
+
+    Args:
+        df: DataFrame cần tính phiên bản
+
+    Returns:
+        Chuỗi hex 16 ký tự, thay đổi khi và chỉ khi nội dung dữ liệu thay đổi
+    """
+    hasher = hashlib.sha256()
+    hasher.update(",".join(map(str, df.columns)).encode("utf-8"))
+    hasher.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return hasher.hexdigest()[:16]
+
+def stamp_data_version(conn, df):
+    """
+    Ghi phiên bản dữ liệu và thời điểm tạo vào bảng metadata
+
+    Args:
+        conn: Kết nối SQLite đến cơ sở dữ liệu
+        df: DataFrame vừa được lưu vào bảng motorbikes
+
+    Returns:
+        Phiên bản dữ liệu đã ghi
+    """
+    data_version = compute_data_version(df)
+    conn.execute('CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT)')
+    conn.executemany(
+        'INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)',
+        [('data_version', data_version), ('built_at', datetime.now().isoformat(timespec='seconds'))]
+    )
+    conn.commit()
+    return data_version
+
+def ensure_liveness_columns(conn):
+    """
+    Thêm cột trạng thái còn tồn tại của bài đăng (is_alive, last_checked_at) và các chỉ mục liên quan nếu chưa có
+
+    Args:
+        conn: Kết nối SQLite đến cơ sở dữ liệu
+    """
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(motorbikes)').fetchall()}
+    if 'is_alive' not in columns:
+        conn.execute('ALTER TABLE motorbikes ADD COLUMN is_alive INTEGER NOT NULL DEFAULT 1')
+    if 'last_checked_at' not in columns:
+        conn.execute('ALTER TABLE motorbikes ADD COLUMN last_checked_at TEXT')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_alive ON motorbikes(is_alive)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_last_checked ON motorbikes(last_checked_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_url_full ON motorbikes(url_full)')
+    conn.commit()
+
+def read_liveness_status(conn):
+    """
+    Đọc trạng thái còn tồn tại đã kiểm tra của các bài đăng hiện có (để giữ lại khi tạo lại bảng)
+
+    Returns:
+        list: Các dòng (url_full, is_alive, last_checked_at), rỗng nếu chưa có
+    """
+    try:
+        return conn.execute(
+            'SELECT url_full, is_alive, last_checked_at FROM motorbikes WHERE last_checked_at IS NOT NULL'
+        ).fetchall()
+    except Exception:
+        # Bảng chưa tồn tại hoặc chưa có các cột trạng thái
+        return []
+
+def restore_liveness_status(conn, statuses):
+    """Ghi lại trạng thái đã kiểm tra cho các bài đăng có cùng url_full sau khi tạo lại bảng"""
+    if not statuses:
+        return
+    conn.execute('CREATE TEMP TABLE previous_status (url_full TEXT PRIMARY KEY, is_alive INTEGER, last_checked_at TEXT)')
+    conn.executemany('INSERT OR REPLACE INTO previous_status VALUES (?, ?, ?)', statuses)
+    conn.execute('''
+        UPDATE motorbikes
+        SET is_alive = previous_status.is_alive, last_checked_at = previous_status.last_checked_at
+        FROM previous_status
+        WHERE motorbikes.url_full = previous_status.url_full
+    ''')
+    conn.execute('DROP TABLE previous_status')
+    conn.commit()
+
 def create_sqlite_database(df, db_path='data/processed/motorbike_db.sqlite'):
     """
     Tạo cơ sở dữ liệu SQLite từ DataFrame
-    
+
+    Database được dựng trên một bản sao tạm (chép từ database hiện có, để giữ trạng thái còn tồn tại và
+    chuỗi xu hướng giá), gắn phiên bản rồi mới thay thế file cũ bằng os.replace. Nếu một bước bị lỗi,
+    database cũ được giữ nguyên cùng phiên bản của nó, nên cache theo phiên bản không phục vụ dữ liệu
+    mới dưới phiên bản cũ. Kết quả kiểm tra của liveness sweeper ghi vào file cũ trong lúc dựng sẽ
+    được kiểm tra lại ở lượt quét sau.
+
     Args:
         df: DataFrame cần lưu
         db_path: Đường dẫn đến file cơ sở dữ liệu
+
+    Raises:
+        Exception: Lỗi của bước bị hỏng (sau khi đã ghi log và xóa file tạm)
     """
+    import sqlite3
+
+    # Tạo thư mục nếu chưa tồn tại
+    db_dir = os.path.dirname(db_path)
+    if db_dir and not os.path.exists(db_dir):
+        os.makedirs(db_dir)
+
+    build_path = f"{db_path}.build-{os.getpid()}"
+    conn = None
     try:
-        import sqlite3
-        
-        # Tạo thư mục nếu chưa tồn tại
-        db_dir = os.path.dirname(db_path)
-        if db_dir and not os.path.exists(db_dir):
-            os.makedirs(db_dir)
-        
-        # Kết nối đến cơ sở dữ liệu
-        conn = sqlite3.connect(db_path)
-        
+        if os.path.exists(build_path):
+            os.remove(build_path)
+        conn = sqlite3.connect(build_path)
+
+        # Bắt đầu từ bản sao của database hiện có (nếu có)
+        if os.path.exists(db_path):
+            source = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+            try:
+                source.backup(conn)
+            finally:
+                source.close()
+
+        # Giữ lại trạng thái còn tồn tại mà liveness sweeper đã kiểm tra
+        previous_status = read_liveness_status(conn)
+
         # Lưu DataFrame vào bảng
         df.to_sql('motorbikes', conn, if_exists='replace', index=False)
+        ensure_liveness_columns(conn)
+        restore_liveness_status(conn, previous_status)
         
         # Tạo chỉ mục để tăng tốc truy vấn
         cursor = conn.cursor()
@@ -621,15 +733,44 @@ def create_sqlite_database(df, db_path='data/processed/motorbike_db.sqlite'):
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_brand ON motorbikes(brand)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_post_date ON motorbikes(post_date)')
 
-        # Đóng kết nối
+        # Chỉ mục toàn văn (FTS5) cho tiêu đề và mô tả
+        indexed_count = build_search_index(conn)
+        logger.info(f"Đã đánh chỉ mục toàn văn cho {indexed_count} bài đăng")
+
+        # Phân phối giá theo mẫu xe × năm × nhóm km để tra phân vị giá trên trang dự đoán
+        sketch_count = store_price_sketches(conn, df)
+        logger.info(f"Đã lưu phân phối giá cho {sketch_count} nhóm xe")
+
+        # Histogram giá theo thương hiệu và mẫu xe cho biểu đồ phân phối giá
+        histogram_count = store_price_histograms(conn, df)
+        logger.info(f"Đã lưu histogram giá cho {histogram_count} thương hiệu/mẫu xe")
+
+        # Chuỗi thời gian giá theo tháng/tuần, chỉ tính lại các kỳ có bài đăng mới hoặc thay đổi
+        trend_stats = update_price_trends(conn, df)
+        logger.info(
+            f"Xu hướng giá: {trend_stats['new_listings']} bài đăng mới, {trend_stats['changed_listings']} bài thay đổi, "
+            f"tính lại {trend_stats['updated_groups']} kỳ × thương hiệu"
+        )
+
+        # Gắn phiên bản dữ liệu để cache phía ứng dụng biết khi nào cần làm mới
+        data_version = stamp_data_version(conn, df)
         conn.close()
-        
-        logger.info(f"Đã lưu {len(df)} bản ghi vào cơ sở dữ liệu SQLite tại {db_path}")
+        conn = None
+
+        # Thay database cũ trong một bước: người đọc thấy trọn database cũ hoặc trọn database mới
+        os.replace(build_path, db_path)
+        logger.info(f"Đã lưu {len(df)} bản ghi vào cơ sở dữ liệu SQLite tại {db_path} (phiên bản {data_version})")
         
     except Exception as e:
         logger.error(f"Lỗi khi tạo cơ sở dữ liệu SQLite: {str(e)}")
         import traceback
         logger.error(traceback.format_exc())
+        raise
+    finally:
+        if conn is not None:
+            conn.close()
+        if os.path.exists(build_path):
+            os.remove(build_path)
 
 if __name__ == "__main__":
     # Đường dẫn đến file dữ liệu raw
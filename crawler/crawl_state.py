@@ -0,0 +1,202 @@
+# crawler/crawl_state.py
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+# Mã tin là dãy số cuối URL bài đăng, ví dụ /mua-ban-xe-may-tp-ho-chi-minh/123456789.htm
+_LISTING_ID = re.compile(r"(\d+)(?:\.htm)?/?(?:[?#].*)?$")
+
+
+def listing_id(url):
+    """Mã tin của một URL bài đăng (URL nguyên vẹn nếu không tìm thấy mã)"""
+    match = _LISTING_ID.search(url)
+    return match.group(1) if match else url
+
+
+def content_hash(data):
+    """SHA-256 của nội dung bài đăng đã trích xuất (không tính url)"""
+    payload = {key: value for key, value in data.items() if key != "url"}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class CrawlStateStore:
+    """
+    Trạng thái thu thập lưu trong SQLite: mỗi bài đăng một dòng với lần đầu/lần cuối thấy trên trang danh sách,
+    lần cuối tải trang chi tiết, hash nội dung và bản ghi trích xuất gần nhất
+
+    Bảng này là kho dữ liệu tích lũy của crawler: bài đăng không được tải lại (vì mới tải gần đây)
+    vẫn giữ bản ghi cũ, nên file CSV được xuất từ đây chứ không từ nhật ký của một lượt.
+    Dùng chung được giữa các luồng tải trang chi tiết.
+    """
+    def __init__(self, path, refetch_after_hours=72):
+        """
+        Args:
+            path (str): Đường dẫn file SQLite
+            refetch_after_hours (float): Bài đăng đã tải trong khoảng này thì không tải lại
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = path
+        self.refetch_after = timedelta(hours=refetch_after_hours)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS crawl_state (
+                    listing_id TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    first_seen TEXT NOT NULL,
+                    last_seen TEXT NOT NULL,
+                    last_fetched TEXT,
+                    content_hash TEXT,
+                    record TEXT
+                )
+            """)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(crawl_state)")}
+            if "record" not in columns:
+                # File trạng thái cũ chưa lưu bản ghi: các bài đăng này được coi như chưa tải
+                self._conn.execute("ALTER TABLE crawl_state ADD COLUMN record TEXT")
+
+    def mark_seen(self, urls, now=None):
+        """
+        Ghi nhận các bài đăng vừa thấy trên một trang danh sách
+
+        Returns:
+            list: URL của các bài đăng chưa từng thấy trước đó
+        """
+        seen_at = (now or datetime.now()).isoformat(timespec="seconds")
+        ids = {listing_id(url): url for url in urls}
+        if not ids:
+            return []
+        with self._lock, self._conn:
+            placeholders = ", ".join("?" for _ in ids)
+            known = {
+                row[0] for row in self._conn.execute(
+                    f"SELECT listing_id FROM crawl_state WHERE listing_id IN ({placeholders})", list(ids)
+                )
+            }
+            self._conn.executemany(
+                """
+                INSERT INTO crawl_state (listing_id, url, first_seen, last_seen) VALUES (?, ?, ?, ?)
+                ON CONFLICT(listing_id) DO UPDATE SET url = excluded.url, last_seen = excluded.last_seen
+                """,
+                [(key, url, seen_at, seen_at) for key, url in ids.items()]
+            )
+        return [url for key, url in ids.items() if key not in known]
+
+    def needs_fetch(self, url, now=None):
+        """Bài đăng chưa có bản ghi chi tiết, hoặc lần tải cuối đã quá refetch_after"""
+        threshold = ((now or datetime.now()) - self.refetch_after).isoformat(timespec="seconds")
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_fetched, record IS NOT NULL FROM crawl_state WHERE listing_id = ?", (listing_id(url),)
+            ).fetchone()
+        return row is None or row[0] is None or not row[1] or row[0] < threshold
+
+    def pending_fetch(self, urls, now=None):
+        """
+        Lọc các bài đăng cần tải trang chi tiết (như needs_fetch, một truy vấn cho cả danh sách)
+
+        Returns:
+            list: URL của các bài đăng chưa tải hoặc đã tải quá refetch_after, theo thứ tự đầu vào
+        """
+        threshold = ((now or datetime.now()) - self.refetch_after).isoformat(timespec="seconds")
+        ids = {listing_id(url) for url in urls}
+        if not ids:
+            return []
+        with self._lock:
+            placeholders = ", ".join("?" for _ in ids)
+            fresh = {
+                row[0] for row in self._conn.execute(
+                    f"SELECT listing_id FROM crawl_state WHERE listing_id IN ({placeholders}) "
+                    "AND record IS NOT NULL AND last_fetched >= ?",
+                    [*ids, threshold]
+                )
+            }
+        return [url for url in urls if listing_id(url) not in fresh]
+
+    def record_fetch(self, url, data, now=None):
+        """
+        Ghi nhận đã tải trang chi tiết của bài đăng; bản ghi chỉ được ghi lại khi nội dung thay đổi
+
+        Returns:
+            bool: True nếu nội dung khác lần tải trước (hoặc là lần tải đầu tiên)
+        """
+        fetched_at = (now or datetime.now()).isoformat(timespec="seconds")
+        key = listing_id(url)
+        digest = content_hash(data)
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT content_hash, record IS NOT NULL FROM crawl_state WHERE listing_id = ?", (key,)
+            ).fetchone()
+            changed = row is None or row[0] != digest
+            if row is not None and not changed and row[1]:
+                self._conn.execute(
+                    "UPDATE crawl_state SET last_fetched = ? WHERE listing_id = ?", (fetched_at, key)
+                )
+            else:
+                self._conn.execute(
+                    """
+                    INSERT INTO crawl_state (listing_id, url, first_seen, last_seen, last_fetched, content_hash, record)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(listing_id) DO UPDATE SET last_fetched = excluded.last_fetched,
+                        content_hash = excluded.content_hash, record = excluded.record
+                    """,
+                    (key, url, fetched_at, fetched_at, fetched_at, digest, json.dumps(data, ensure_ascii=False))
+                )
+        return changed
+
+    def missing_records(self):
+        """Số bài đăng đã tải nhưng chưa có bản ghi (trạng thái từ phiên bản cũ chỉ lưu dữ liệu trong nhật ký)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM crawl_state WHERE last_fetched IS NOT NULL AND record IS NULL"
+            ).fetchone()[0]
+
+    def import_records(self, records):
+        """
+        Gộp bản ghi từ nhật ký cũ vào các bài đăng chưa có bản ghi (không ghi đè bản ghi đã có)
+
+        Returns:
+            int: Số bài đăng được bổ sung bản ghi
+        """
+        rows = [
+            (json.dumps(record, ensure_ascii=False), content_hash(record), listing_id(record["url"]))
+            for record in records if record.get("url")
+        ]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "UPDATE crawl_state SET record = ?, content_hash = ? WHERE listing_id = ? AND record IS NULL", rows
+            )
+            return self._conn.total_changes - before
+
+    def records(self):
+        """
+        Đọc lần lượt bản ghi gần nhất của mọi bài đăng đã tải, theo thứ tự lần đầu thấy
+
+        Dùng kết nối riêng (WAL cho phép đọc song song với các luồng đang ghi).
+        """
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            cursor = conn.execute(
+                "SELECT record FROM crawl_state WHERE record IS NOT NULL ORDER BY first_seen, listing_id"
+            )
+            for (record,) in cursor:
+                yield json.loads(record)
+        finally:
+            conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM crawl_state").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
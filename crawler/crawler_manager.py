@@ -32,7 +32,9 @@ class CrawlerManager:
             **kwargs: Các tham số bổ sung cho crawler cụ thể
             
         Returns:
-            list: Dữ liệu thu thập được
+            list | dict: Với chotot, danh sách URL bài đăng; nếu get_details=True thì là số liệu của lượt
+                         thu thập chi tiết (dict từ scrape_listings_with_details, dữ liệu nằm trong nhật ký
+                         log_path). Với vnexpress, danh sách mẫu xe. None nếu crawler không tồn tại hoặc bị lỗi
         """
         if crawler_name not in self.crawlers:
             logger.error(f"Crawler không tồn tại: {crawler_name}")
@@ -48,7 +50,9 @@ class CrawlerManager:
                     num_pages=kwargs.get('num_pages', 5)
                 )
                 if kwargs.get('get_details', False):
-                    return self.crawlers[crawler_name].scrape_listings_with_details(listings)
+                    return self.crawlers[crawler_name].scrape_listings_with_details(
+                        listings, resume=kwargs.get('resume', False)
+                    )
                 return listings
             
             elif crawler_name == 'vnexpress':
@@ -0,0 +1,247 @@
+# crawler/extractors.py
+"""
+Các bộ trích xuất dữ liệu từ trang Chợ Tốt
+
+Thứ tự ưu tiên: dữ liệu có cấu trúc nhúng trong trang (JSON-LD, __NEXT_DATA__) rồi mới đến phân tích HTML
+theo class. Phân tích HTML dùng lxml với XPath biên dịch sẵn nếu đã cài lxml, nếu không thì dùng
+BeautifulSoup với html.parser như trước.
+
+Mỗi bộ trích xuất có thuộc tính name và hai phương thức: listing_urls(content) trả về các URL bài đăng
+trên trang danh sách ([] nếu không trích xuất được) và detail(content) trả về dict với các trường
+DETAIL_FIELDS (None nếu không trích xuất được), để bộ tiếp theo trong ExtractorChain thử lại.
+"""
+import json
+import logging
+import re
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:  # lxml là tùy chọn, không có thì phân tích bằng html.parser
+    etree = lxml_html = None
+
+logger = logging.getLogger("ChototCrawler")
+
+# Các trường của một bài đăng, theo thứ tự cột của file CSV
+DETAIL_FIELDS = [
+    "title", "price", "description", "origin", "location", "post_time", "brand", "model", "reg_year",
+    "mileage", "condition", "vehicle_type", "engine_capacity", "warranty", "weight",
+]
+
+# Nhãn thông số trên trang -> trường
+PARAMETER_LABELS = {
+    "Xuất xứ": "origin",
+    "Hãng xe": "brand",
+    "Dòng xe": "model",
+    "Năm đăng ký": "reg_year",
+    "Số Km đã đi": "mileage",
+    "Tình trạng": "condition",
+    "Loại xe": "vehicle_type",
+    "Dung tích xe": "engine_capacity",
+    "Chính sách bảo hành": "warranty",
+    "Trọng lượng": "weight",
+}
+
+# Thông số bắt buộc phải đọc được từ dữ liệu có cấu trúc; thiếu thì nhãn trên trang đã đổi
+# và bộ trích xuất nhường cho phân tích HTML thay vì trả về bài đăng thiếu thông số
+REQUIRED_PARAMETER_FIELDS = ["brand", "model", "reg_year", "mileage"]
+
+# Vị trí các giá trị trong danh sách span thông số của trang chi tiết
+DETAIL_SPAN_POSITIONS = {
+    "origin": 7, "location": 8, "post_time": 9, "brand": 11, "model": 13, "reg_year": 15, "mileage": 17,
+    "condition": 19, "vehicle_type": 21, "engine_capacity": 23, "warranty": 27, "weight": 29,
+}
+
+# Khối <script> chứa dữ liệu có cấu trúc; tìm bằng regex nên không phải dựng cây DOM của cả trang
+_JSON_LD = re.compile(r'<script[^>]*type="application/ld\+json"[^>]*>(.*?)</script>', re.S | re.I)
+_NEXT_DATA = re.compile(r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S | re.I)
+
+
+def _format_price(value):
+    """25500000 -> "25.500.000 đ" (giống giá hiển thị trên trang)"""
+    return f"{int(value):,}".replace(",", ".") + " đ"
+
+
+def _relative_url(url):
+    """Bỏ scheme và host của URL Chợ Tốt để giống href trên trang danh sách"""
+    parts = urlsplit(url)
+    return parts.path if parts.netloc else url
+
+
+class StructuredDataExtractor:
+    """Đọc JSON-LD (danh sách bài đăng) và trạng thái __NEXT_DATA__ (trang chi tiết) nhúng trong trang"""
+    name = "structured"
+
+    def _json_ld(self, content):
+        for block in _JSON_LD.findall(content):
+            try:
+                data = json.loads(block)
+            except ValueError:
+                continue
+            yield from data if isinstance(data, list) else [data]
+
+    def listing_urls(self, content):
+        for data in self._json_ld(content):
+            if isinstance(data, dict) and data.get("@type") == "ItemList":
+                urls = []
+                for element in data.get("itemListElement", []):
+                    item = element.get("item") if isinstance(element.get("item"), dict) else element
+                    if item.get("url"):
+                        urls.append(_relative_url(item["url"]))
+                return urls
+        return []
+
+    def _find_ad(self, node):
+        """Tìm đối tượng chứa bài đăng (có khóa "ad" và "parameters") ở bất kỳ độ sâu nào"""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if isinstance(current, dict):
+                if isinstance(current.get("ad"), dict) and isinstance(current.get("parameters"), list):
+                    return current
+                stack.extend(current.values())
+            elif isinstance(current, list):
+                stack.extend(current)
+        return None
+
+    def detail(self, content):
+        match = _NEXT_DATA.search(content)
+        if not match:
+            return None
+        try:
+            ad_info = self._find_ad(json.loads(match.group(1)))
+        except ValueError:
+            return None
+        if ad_info is None:
+            return None
+
+        ad = ad_info["ad"]
+        data = dict.fromkeys(DETAIL_FIELDS)
+        data["title"] = ad.get("subject")
+        data["description"] = ad.get("body")
+        if ad.get("price_string"):
+            data["price"] = ad["price_string"]
+        elif ad.get("price") is not None:
+            data["price"] = _format_price(ad["price"])
+        location = [ad.get(key) for key in ("ward_name", "area_name", "region_name")]
+        data["location"] = ", ".join(part for part in location if part) or None
+        if ad.get("date"):
+            data["post_time"] = ad["date"] if ad["date"].startswith("Đăng") else f"Đăng {ad['date']}"
+        for parameter in ad_info["parameters"]:
+            field = PARAMETER_LABELS.get(parameter.get("label"))
+            if field:
+                data[field] = parameter.get("value")
+
+        if not data["title"] or not data["price"]:
+            return None
+        missing = [field for field in REQUIRED_PARAMETER_FIELDS if not data[field]]
+        if missing:
+            logger.warning(
+                f"__NEXT_DATA__ thiếu thông số {', '.join(missing)} (nhãn trên trang có thể đã đổi), "
+                f"chuyển sang phân tích HTML"
+            )
+            return None
+        return data
+
+
+class LxmlExtractor:
+    """Phân tích HTML bằng lxml với các XPath được biên dịch một lần"""
+    name = "lxml"
+
+    def __init__(self):
+        if etree is None:
+            raise ImportError("Cần cài lxml để dùng LxmlExtractor")
+        self._listing_hrefs = etree.XPath(
+            "//li[@itemtype='http://schema.org/ListItem']//a[contains(concat(' ', normalize-space(@class), ' '), ' cebeqpz ')]/@href"
+        )
+        self._title = etree.XPath("string((//div[contains(concat(' ', @class, ' '), ' cpmughi ')]//h1)[1])")
+        self._price = etree.XPath("string((//b[contains(concat(' ', @class, ' '), ' p26z2wb ')])[1])")
+        self._description = etree.XPath("string((//p[contains(concat(' ', @class, ' '), ' cvatvjo ')])[1])")
+        self._details = etree.XPath("//span[contains(concat(' ', @class, ' '), ' bwq0cbs ')]")
+
+    def listing_urls(self, content):
+        if not content:
+            return []
+        return [str(href) for href in self._listing_hrefs(lxml_html.fromstring(content))]
+
+    def detail(self, content):
+        tree = lxml_html.fromstring(content)
+        details = [span.text_content() for span in self._details(tree)]
+        if len(details) <= max(DETAIL_SPAN_POSITIONS.values()):
+            return None
+        data = {"title": self._title(tree), "price": self._price(tree), "description": self._description(tree)}
+        data.update({field: details[index] for field, index in DETAIL_SPAN_POSITIONS.items()})
+        if not data["title"] or not data["price"]:
+            return None
+        return {field: data[field] for field in DETAIL_FIELDS}
+
+
+class SoupExtractor:
+    """Phân tích HTML bằng BeautifulSoup với html.parser (cách làm ban đầu, không cần thư viện ngoài)"""
+    name = "html.parser"
+
+    def listing_urls(self, content):
+        if not content:
+            return []
+        soup = BeautifulSoup(content, 'html.parser')
+        urls = []
+        for listing in soup.find_all('li', {'itemtype': 'http://schema.org/ListItem'}):
+            link = listing.find('a', class_='cebeqpz')
+            if link is not None and link.get('href'):
+                urls.append(link['href'])
+        return urls
+
+    def detail(self, content):
+        soup = BeautifulSoup(content, 'html.parser')
+        title = soup.find("div", {"class": "cpmughi"})
+        price = soup.find("b", {"class": "p26z2wb"})
+        description = soup.find("p", {"class": "cvatvjo"})
+        details = soup.find_all("span", {"class": "bwq0cbs"})
+        if title is None or title.find("h1") is None or price is None:
+            return None
+        if len(details) <= max(DETAIL_SPAN_POSITIONS.values()):
+            return None
+
+        data = {
+            "title": title.find("h1").text,
+            "price": price.text,
+            "description": description.text if description is not None else None,
+        }
+        data.update({field: details[index].text for field, index in DETAIL_SPAN_POSITIONS.items()})
+        return {field: data[field] for field in DETAIL_FIELDS}
+
+
+def html_extractor():
+    """Bộ phân tích HTML nhanh nhất hiện có: lxml nếu đã cài, nếu không thì html.parser"""
+    return LxmlExtractor() if etree is not None else SoupExtractor()
+
+
+class ExtractorChain:
+    """Thử lần lượt từng bộ trích xuất, dùng kết quả đầu tiên không rỗng"""
+    name = "chain"
+
+    def __init__(self, extractors=None):
+        """
+        Args:
+            extractors (list): Các bộ trích xuất theo thứ tự ưu tiên
+                               (mặc định: dữ liệu có cấu trúc, rồi phân tích HTML)
+        """
+        self.extractors = extractors if extractors is not None else [StructuredDataExtractor(), html_extractor()]
+
+    def listing_urls(self, content):
+        if not content:
+            return []
+        for extractor in self.extractors:
+            urls = extractor.listing_urls(content)
+            if urls:
+                return urls
+        return []
+
+    def detail(self, content):
+        for extractor in self.extractors:
+            data = extractor.detail(content)
+            if data:
+                return data
+        return None
@@ -0,0 +1,80 @@
+# crawler/http_session.py
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+# urllib3 chỉ thêm "br" khi đã cài Brotli, nên không bao giờ nhận về nội dung không giải nén được
+CRAWL_ACCEPT_ENCODING = ACCEPT_ENCODING.replace(",", ", ")
+
+
+class CrawlSession:
+    """
+    Session HTTP dùng chung của crawler
+
+    Giữ kết nối keep-alive trong connection pool (số kết nối mỗi host bằng giới hạn request đồng thời
+    của bộ giới hạn tốc độ), nhận nội dung nén gzip/br và đếm số byte tải về, số kết nối mới
+    để tính tỷ lệ tái sử dụng kết nối.
+    """
+    def __init__(self, headers=None, pool_size=4, max_hosts=10, timeout=(5, 20)):
+        """
+        Args:
+            headers (dict): Header gửi kèm mọi request
+            pool_size (int): Số kết nối tối đa cho mỗi host
+            max_hosts (int): Số host được giữ connection pool cùng lúc
+            timeout (tuple): Thời gian chờ (kết nối, đọc dữ liệu) mặc định của mỗi request (giây)
+        """
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        self.session.headers["Accept-Encoding"] = CRAWL_ACCEPT_ENCODING
+        # pool_block: không mở thêm kết nối khi pool đã đầy, request chờ kết nối được trả lại
+        self.adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+
+        self._lock = threading.Lock()
+        self._baseline_connections = 0
+        self._counters = {"requests": 0, "bytes_wire": 0, "bytes_decoded": 0}
+
+    def get(self, url, **kwargs):
+        """GET qua connection pool; nội dung được đọc hết để ghi nhận số byte và trả kết nối về pool"""
+        kwargs.setdefault("timeout", self.timeout)
+        response = self.session.get(url, **kwargs)
+        decoded = len(response.content)
+        # Số byte thực tế nhận qua mạng (trước khi giải nén)
+        wire = response.raw.tell() if response.raw is not None else decoded
+        with self._lock:
+            self._counters["requests"] += 1
+            self._counters["bytes_wire"] += wire
+            self._counters["bytes_decoded"] += decoded
+        return response
+
+    def _connections_opened(self):
+        """Tổng số kết nối TCP/TLS urllib3 đã mở trên các pool hiện có"""
+        pools = self.adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+
+    def reset_stats(self):
+        """Bắt đầu đếm lại cho một lượt thu thập mới (kết nối đang mở vẫn được giữ)"""
+        with self._lock:
+            self._counters = {"requests": 0, "bytes_wire": 0, "bytes_decoded": 0}
+            self._baseline_connections = self._connections_opened()
+
+    def stats(self):
+        """
+        Returns:
+            dict: requests, bytes_wire, bytes_decoded, new_connections, reuse_ratio
+                  (tỷ lệ request dùng lại kết nối đã có)
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats["new_connections"] = self._connections_opened() - self._baseline_connections
+        requests_count = stats["requests"]
+        stats["reuse_ratio"] = (
+            round(max(requests_count - stats["new_connections"], 0) / requests_count, 3) if requests_count else None
+        )
+        return stats
+
+    def close(self):
+        self.session.close()
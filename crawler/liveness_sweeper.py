@@ -0,0 +1,186 @@
+# crawler/liveness_sweeper.py
+"""
+Job chạy nền kiểm tra định kỳ các bài đăng trong bảng motorbikes còn tồn tại hay không
+
+Chạy: python -m crawler.liveness_sweeper --db data/motorbike_database.db --rate 2 --interval 600
+"""
+import argparse
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import requests
+
+from crawler.clean_data import ensure_liveness_columns
+from utils.liveness import LivenessChecker
+
+# Thiết lập logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Status code cho biết bài đăng đã bị gỡ; các lỗi khác (5xx, 429, lỗi mạng) chưa đủ để kết luận
+GONE_STATUSES = {404, 410}
+
+
+def classify_status(status_code):
+    """
+    Chuyển status code thành trạng thái is_alive
+
+    Returns:
+        int: 1 (còn), 0 (đã gỡ) hoặc None (chưa kết luận được)
+    """
+    if status_code == 200:
+        return 1
+    if status_code in GONE_STATUSES:
+        return 0
+    return None
+
+
+class LivenessSweeper:
+    """
+    Kiểm tra lại url_full của các bài đăng lâu chưa được kiểm tra, với tốc độ giới hạn
+
+    Kết quả được ghi theo url_full (không theo rowid), vì database có thể được tạo lại trong lúc
+    một lượt đang kiểm tra URL.
+    """
+    def __init__(self, db_path, rate=2.0, batch_size=200, max_age_hours=24, checker=None):
+        """
+        Khởi tạo sweeper
+
+        Args:
+            db_path (str): Đường dẫn đến file database
+            rate (float): Số URL tối đa được kiểm tra mỗi giây
+            batch_size (int): Số bài đăng kiểm tra trong mỗi lượt
+            max_age_hours (float): Bài đăng được kiểm tra lại sau khoảng thời gian này
+            checker (LivenessChecker): Bộ kiểm tra URL (mặc định tạo mới)
+        """
+        self.db_path = db_path
+        self.rate = rate
+        self.batch_size = batch_size
+        self.max_age = timedelta(hours=max_age_hours)
+        self.checker = checker or LivenessChecker()
+
+        conn = self._connect()
+        try:
+            ensure_liveness_columns(conn)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def due_listings(self, conn, now):
+        """
+        Các bài đăng chưa từng được kiểm tra hoặc kiểm tra đã lâu, cũ nhất trước
+
+        Returns:
+            list: Các dòng (url_full, is_alive)
+        """
+        threshold = (now - self.max_age).isoformat(timespec='seconds')
+        return conn.execute("""
+            SELECT url_full, is_alive FROM motorbikes
+            WHERE url_full IS NOT NULL AND (last_checked_at IS NULL OR last_checked_at < ?)
+            ORDER BY last_checked_at
+            LIMIT ?
+        """, (threshold, self.batch_size)).fetchall()
+
+    def _status(self, url):
+        try:
+            return self.checker.status(url)
+        except requests.RequestException as e:
+            logger.info(f"Không kiểm tra được {url}: {str(e)}")
+            return None
+
+    def sweep_batch(self):
+        """
+        Kiểm tra một lượt bài đăng đến hạn và ghi kết quả vào database
+
+        Returns:
+            dict: checked, alive, dead, unknown, changed
+        """
+        now = datetime.now()
+        conn = self._connect()
+        try:
+            listings = self.due_listings(conn, now)
+        finally:
+            conn.close()
+
+        # Giới hạn tốc độ: mỗi URL được gửi đi cách nhau 1/rate giây, chạy song song trong pool
+        futures = []
+        interval = 1.0 / self.rate if self.rate > 0 else 0.0
+        start_time = time.monotonic()
+        with ThreadPoolExecutor(max_workers=8, thread_name_prefix="sweeper") as executor:
+            for index, (url, is_alive) in enumerate(listings):
+                delay = start_time + index * interval - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append((url, is_alive, executor.submit(self._status, url)))
+
+        checked_at = datetime.now().isoformat(timespec='seconds')
+        stats = {"checked": len(futures), "alive": 0, "dead": 0, "unknown": 0, "changed": 0}
+        updates = []
+        for url, is_alive, future in futures:
+            status = classify_status(future.result())
+            stats[{1: "alive", 0: "dead", None: "unknown"}[status]] += 1
+            if status is not None and status != is_alive:
+                stats["changed"] += 1
+            updates.append((checked_at, status, url))
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "UPDATE motorbikes SET last_checked_at = ?, is_alive = COALESCE(?, is_alive) WHERE url_full = ?",
+                    updates
+                )
+                if stats["changed"]:
+                    bump_liveness_version(conn)
+        finally:
+            conn.close()
+
+        logger.info(f"Đã kiểm tra {stats['checked']} bài đăng: {stats}")
+        return stats
+
+    def run(self, interval=600, once=False):
+        """
+        Chạy liên tục: quét hết các bài đăng đến hạn, rồi nghỉ interval giây trước lượt tiếp theo
+
+        Args:
+            interval (float): Thời gian nghỉ giữa các vòng quét (giây)
+            once (bool): Chỉ quét một vòng rồi dừng
+        """
+        while True:
+            while self.sweep_batch()["checked"] == self.batch_size:
+                pass
+            if once:
+                return
+            time.sleep(interval)
+
+
+def bump_liveness_version(conn):
+    """Tăng liveness_version trong bảng metadata để cache phía ứng dụng bỏ kết quả cũ"""
+    conn.execute('CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT)')
+    row = conn.execute("SELECT value FROM metadata WHERE key = 'liveness_version'").fetchone()
+    version = int(row[0]) + 1 if row else 1
+    conn.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES ('liveness_version', ?)", (str(version),))
+    return version
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", default="data/motorbike_database.db", help="Đường dẫn đến file database")
+    parser.add_argument("--rate", type=float, default=2.0, help="Số URL tối đa mỗi giây")
+    parser.add_argument("--batch-size", type=int, default=200, help="Số bài đăng mỗi lượt")
+    parser.add_argument("--max-age-hours", type=float, default=24, help="Kiểm tra lại sau bao nhiêu giờ")
+    parser.add_argument("--interval", type=float, default=600, help="Thời gian nghỉ giữa các vòng quét (giây)")
+    parser.add_argument("--once", action="store_true", help="Chỉ quét một vòng")
+    args = parser.parse_args()
+
+    sweeper = LivenessSweeper(args.db, rate=args.rate, batch_size=args.batch_size, max_age_hours=args.max_age_hours)
+    sweeper.run(interval=args.interval, once=args.once)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# crawler/rate_limiter.py
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """
+    Token bucket: trung bình tối đa rate request mỗi giây, cho phép dồn tối đa burst request liền nhau
+
+    Mỗi lần acquire đặt trước một token (số token có thể âm) rồi ngủ ngoài khóa đến lượt của mình,
+    nên các luồng được phục vụ theo thứ tự gọi và không luồng nào giữ khóa khi chờ.
+    """
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        """
+        Args:
+            rate (float): Số request mỗi giây (<= 0 là không giới hạn)
+            burst (int): Số token tối đa tích lũy khi rảnh
+            clock, sleep: Đồng hồ và hàm ngủ (thay được trong test)
+        """
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Chờ đến khi được phép gửi một request
+
+        Returns:
+            float: Thời gian đã chờ (giây)
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+class HostRateLimiter:
+    """
+    Giới hạn tốc độ theo từng host: một token bucket và một giới hạn số request đang chạy cho mỗi host
+    """
+    def __init__(self, rate, max_in_flight, burst=1, clock=time.monotonic, sleep=time.sleep):
+        """
+        Args:
+            rate (float): Số request mỗi giây cho mỗi host
+            max_in_flight (int): Số request đồng thời tối đa cho mỗi host
+            burst (int): Số request được gửi liền nhau khi rảnh
+        """
+        self.rate = rate
+        self.max_in_flight = max_in_flight
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = (
+                    TokenBucket(self.rate, self.burst, clock=self._clock, sleep=self._sleep),
+                    threading.BoundedSemaphore(self.max_in_flight),
+                )
+            return self._hosts[host]
+
+    @contextmanager
+    def slot(self, url):
+        """
+        Giữ một chỗ cho request tới url: chờ chỗ trống trong giới hạn đồng thời, rồi chờ token
+
+        Ví dụ:
+            with limiter.slot(url):
+                response = session.get(url)
+        """
+        bucket, in_flight = self._host(url)
+        with in_flight:
+            bucket.acquire()
+            yield
+
+
+class ThroughputMeter:
+    """Đếm số request thành công/thất bại và tính tốc độ thực tế của một lượt thu thập"""
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._start = clock()
+        self._lock = threading.Lock()
+        self.succeeded = 0
+        self.failed = 0
+
+    def record(self, ok):
+        with self._lock:
+            if ok:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+
+    def report(self):
+        """
+        Returns:
+            dict: requests, succeeded, failed, elapsed_s, requests_per_s
+        """
+        with self._lock:
+            elapsed = self._clock() - self._start
+            total = self.succeeded + self.failed
+            return {
+                "requests": total,
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "elapsed_s": round(elapsed, 2),
+                "requests_per_s": round(total / elapsed, 2) if elapsed > 0 else None,
+            }
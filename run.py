@@ -16,9 +16,10 @@ from webpages.market_overview import show_market_overview
 from webpages.price_prediction import show_price_prediction
 from webpages.bike_comparison import show_bike_comparison
 from webpages.bike_suggestion import show_bike_suggestion
+from webpages.listing_search import show_listing_search
 
 # Import cấu hình
-from config import check_database
+from config import check_database, preload_database
 
 def main():
     """Hàm chính của ứng dụng Streamlit"""
@@ -47,7 +48,8 @@ def main():
         st.warning(f"Không thể tải CSS: {str(e)}")
 
     # Kiểm tra database trước
-    check_database()
+    if check_database():
+        preload_database()
 
     # Sidebar
     st.sidebar.title("🏍️ Dự Đoán Giá Xe Máy Cũ")
@@ -55,6 +57,7 @@ def main():
         "Chọn trang:",
         [
             "Dự đoán giá xe", 
+            "Tìm kiếm tin đăng",
             # "Tổng quan thị trường", 
             # "So sánh xe", 
             # "Gợi ý mua xe"
@@ -70,6 +73,8 @@ def main():
         show_bike_comparison()
     elif page == "Gợi ý mua xe":
         show_bike_suggestion()
+    elif page == "Tìm kiếm tin đăng":
+        show_listing_search()
 
     # Thêm footer
     st.markdown('<div class="footer">Ứng dụng dự đoán giá xe máy cũ © 2025</div>', unsafe_allow_html=True)
@@ -0,0 +1,147 @@
+import json
+
+import pandas as pd
+
+from crawler import chotot_crawler
+from crawler.checkpoint import CrawlLog
+from crawler.chotot_crawler import ChototCrawler
+from crawler.crawl_state import CrawlStateStore
+
+
+def test_log_survives_truncated_last_line(tmp_path):
+    path = tmp_path / "details.jsonl"
+    log = CrawlLog(str(path))
+    log.append({"url": "/1.htm", "title": "Xe máy"})
+    log.close()
+    # Tiến trình bị dừng khi đang ghi dòng thứ hai
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"url": "/2.htm", "tit')
+
+    log = CrawlLog(str(path), resume=True)
+    assert log.completed_urls() == {"/1.htm"}
+    log.append({"url": "/3.htm", "title": "Xe số"})
+    log.close()
+    assert [record["url"] for record in log.records()] == ["/1.htm", "/3.htm"]
+
+
+def test_new_run_rotates_previous_log(tmp_path):
+    path = tmp_path / "details.jsonl"
+    CrawlLog(str(path)).append({"url": "/old.htm"})
+    log = CrawlLog(str(path))
+    log.close()
+    assert log.completed_urls() == set()
+    rotated = [p for p in tmp_path.iterdir() if p.name.startswith("details.jsonl.")]
+    assert len(rotated) == 1
+    assert json.loads(rotated[0].read_text(encoding="utf-8"))["url"] == "/old.htm"
+
+
+def test_rotation_keeps_only_recent_logs(tmp_path):
+    path = tmp_path / "details.jsonl"
+    for stamp in ["20240101-000000", "20240102-000000", "20240103-000000"]:
+        (tmp_path / f"details.jsonl.{stamp}").write_text('{"url": "/old.htm"}\n', encoding="utf-8")
+    (tmp_path / "details.jsonl.bak").write_text("", encoding="utf-8")
+    path.write_text('{"url": "/last.htm"}\n', encoding="utf-8")
+
+    log = CrawlLog(str(path), keep_rotated=2)
+    log.close()
+
+    rotated = log.rotated_paths()
+    assert len(rotated) == 2
+    assert rotated[0].endswith("details.jsonl.20240103-000000")
+    assert json.loads(open(rotated[1], encoding="utf-8").read())["url"] == "/last.htm"
+    # Các file không phải nhật ký đã đổi tên không bị xóa
+    assert (tmp_path / "details.jsonl.bak").exists()
+
+
+def test_rotated_logs_kept_without_state(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data" / "processed").mkdir(parents=True)
+    log_path = tmp_path / "details.jsonl"
+    for stamp in ["20240101-000000", "20240102-000000", "20240103-000000"]:
+        (tmp_path / f"details.jsonl.{stamp}").write_text('{"url": "/old.htm"}\n', encoding="utf-8")
+
+    crawler = ChototCrawler(rate=0, max_in_flight=1, state_path=None)
+    monkeypatch.setattr(crawler, "extract_data", lambda url: {"title": "Xe", "url": url})
+    crawler.scrape_listings_with_details(["/item/1.htm"], log_path=str(log_path))
+
+    # Không có trạng thái thu thập: nhật ký cũ là bản duy nhất của dữ liệu nên không bị xóa
+    assert len(CrawlLog(str(log_path), resume=True).rotated_paths()) == 3
+
+
+def test_old_logs_merged_into_state_before_pruning(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data" / "processed").mkdir(parents=True)
+    monkeypatch.setattr(chotot_crawler, "CRAWL_LOG_KEEP", 1)
+    log_path = tmp_path / "details.jsonl"
+    state_path = str(tmp_path / "state.db")
+
+    # Trạng thái thu thập từ phiên bản cũ: đã tải nhưng dữ liệu chỉ nằm trong các nhật ký
+    store = CrawlStateStore(state_path)
+    for n in range(3):
+        store.record_fetch(f"/item/{n}.htm", {})
+    store._conn.execute("UPDATE crawl_state SET record = NULL")
+    store._conn.commit()
+    store.close()
+    (tmp_path / "details.jsonl.20240101-000000").write_text(
+        '{"url": "/item/0.htm", "title": "Cũ"}\n{"url": "/item/1.htm", "title": "Xe 1"}\n', encoding="utf-8"
+    )
+    log_path.write_text('{"url": "/item/0.htm", "title": "Xe 0"}\n', encoding="utf-8")
+
+    crawler = ChototCrawler(rate=0, max_in_flight=1, state_path=state_path)
+    fetched = []
+
+    def extract(url):
+        fetched.append(url)
+        return {"title": "Xe mới", "url": url}
+
+    monkeypatch.setattr(crawler, "extract_data", extract)
+    stats = crawler.scrape_listings_with_details(["/item/0.htm", "/item/2.htm"], log_path=str(log_path))
+    crawler.state.close()
+
+    # /item/2.htm không có trong nhật ký nào nên được tải lại; nhật ký cũ nhất bị xóa sau khi đã gộp
+    assert fetched == ["/item/2.htm"] and stats["records"] == 3
+    saved = pd.read_csv(tmp_path / "data" / "processed" / "chotot_motorbikes.csv")
+    assert dict(zip(saved["url"], saved["title"])) == {
+        "/item/0.htm": "Xe 0", "/item/1.htm": "Xe 1", "/item/2.htm": "Xe mới"
+    }
+    assert not (tmp_path / "details.jsonl.20240101-000000").exists()
+    assert len(CrawlLog(str(log_path), resume=True).rotated_paths()) == 1
+
+
+def test_resume_skips_completed_urls(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data" / "processed").mkdir(parents=True)
+    log_path = str(tmp_path / "details.jsonl")
+    urls = [f"/item/{i}.htm" for i in range(10)]
+    fetched = []
+
+    crawler = ChototCrawler(rate=0, max_in_flight=3, state_path=None)
+
+    def crash_after_four(url):
+        if len(fetched) >= 4:
+            raise KeyboardInterrupt
+        fetched.append(url)
+        return {"title": f"Xe {url}", "price": "1 đ", "url": url}
+
+    # Lượt đầu bị dừng giữa chừng (Ctrl-C); các bài đã trích xuất vẫn nằm trong nhật ký
+    monkeypatch.setattr(crawler, "extract_data", crash_after_four)
+    try:
+        crawler.scrape_listings_with_details(urls, log_path=log_path)
+    except KeyboardInterrupt:
+        pass
+    first_run = set(fetched)
+    assert CrawlLog(log_path, resume=True).completed_urls() == first_run
+
+    def extract(url):
+        fetched.append(url)
+        return {"title": "Xe", "price": "1 đ", "url": url}
+
+    fetched.clear()
+    monkeypatch.setattr(crawler, "extract_data", extract)
+    stats = crawler.scrape_listings_with_details(urls, resume=True, log_path=log_path)
+
+    assert set(fetched) == set(urls) - first_run
+    assert stats["resumed"] == len(first_run) and stats["records"] == 10
+    saved = pd.read_csv(tmp_path / "data" / "processed" / "chotot_motorbikes.csv")
+    assert sorted(saved["url"]) == sorted(urls)
+    assert list(saved.columns[:3]) == ["title", "price", "description"]
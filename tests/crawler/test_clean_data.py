@@ -0,0 +1,56 @@
+import sqlite3
+
+import pytest
+
+from benchmarks.synthetic_data import make_listings
+from crawler import clean_data
+from crawler.clean_data import create_sqlite_database
+from utils.db_serving import read_metadata
+from utils.price_trend import OBSERVATIONS_TABLE
+
+
+def count_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM motorbikes").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_failed_build_keeps_previous_database(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "motorbike_database.db")
+    create_sqlite_database(make_listings(20), db_path)
+    version = read_metadata(db_path)["data_version"]
+
+    def broken_index(conn):
+        raise sqlite3.OperationalError("no such module: fts5")
+
+    monkeypatch.setattr(clean_data, "build_search_index", broken_index)
+    with pytest.raises(sqlite3.OperationalError):
+        create_sqlite_database(make_listings(30, seed=1), db_path)
+
+    # Dữ liệu mới không xuất hiện dưới phiên bản cũ, và không còn file tạm
+    assert count_rows(db_path) == 20
+    assert read_metadata(db_path)["data_version"] == version
+    assert not [path for path in tmp_path.iterdir() if ".build-" in path.name]
+
+    monkeypatch.undo()
+    create_sqlite_database(make_listings(30, seed=1), db_path)
+    assert count_rows(db_path) == 30
+    assert read_metadata(db_path)["data_version"] != version
+
+
+def test_rebuild_keeps_incremental_tables(tmp_path):
+    db_path = str(tmp_path / "motorbike_database.db")
+    first = make_listings(20)
+    create_sqlite_database(first, db_path)
+
+    # Đợt sau thiếu một nửa bài đăng: lịch sử xu hướng giá vẫn giữ các bài đã bị gỡ
+    create_sqlite_database(first.iloc[:10], db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        observed = conn.execute(f"SELECT COUNT(*) FROM {OBSERVATIONS_TABLE}").fetchone()[0]
+    finally:
+        conn.close()
+    assert count_rows(db_path) == 10
+    assert observed == 20
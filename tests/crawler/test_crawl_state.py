@@ -0,0 +1,195 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+import pytest
+
+from crawler import crawl_state
+from crawler.checkpoint import CrawlLog
+from crawler.chotot_crawler import ChototCrawler
+from crawler.crawl_state import CrawlStateStore, listing_id
+
+DETAIL_PAGE = (Path(__file__).parent / "fixtures" / "detail_page.html").read_text(encoding="utf-8")
+PER_PAGE = 3
+
+
+def listing_page(ids):
+    items = [
+        {"@type": "ListItem", "position": n + 1, "url": f"https://xe.chotot.com/mua-ban-xe-may-ha-noi/{ad_id}.htm"}
+        for n, ad_id in enumerate(ids)
+    ]
+    data = {"@context": "https://schema.org", "@type": "ItemList", "itemListElement": items}
+    return f'<html><head><script type="application/ld+json">{json.dumps(data)}</script></head><body></body></html>'
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Tin mới nhất trước, giống trang danh sách của Chợ Tốt
+    inventory = []
+    requests = []
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == "/mua-ban-xe-may" and "page" in parse_qs(parts.query):
+            page = int(parse_qs(parts.query)["page"][0])
+            Handler.requests.append(("list", page))
+            body = listing_page(Handler.inventory[(page - 1) * PER_PAGE:page * PER_PAGE])
+        else:
+            Handler.requests.append(("detail", listing_id(parts.path)))
+            body = DETAIL_PAGE
+        body = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    Handler.inventory = [str(100 + i) for i in range(15)]
+    Handler.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_listing_id():
+    assert listing_id("/mua-ban-xe-may-ha-noi/123456789.htm") == "123456789"
+    assert listing_id("https://xe.chotot.com/mua-ban-xe-may-ha-noi/123456789.htm?src=list") == "123456789"
+    assert listing_id("/khong-co-ma") == "/khong-co-ma"
+
+
+def test_store_tracks_seen_and_fetched(tmp_path):
+    store = CrawlStateStore(str(tmp_path / "state.db"), refetch_after_hours=24)
+    now = datetime(2025, 5, 1, 12)
+    assert store.mark_seen(["/a/1.htm", "/a/2.htm"], now=now) == ["/a/1.htm", "/a/2.htm"]
+    assert store.mark_seen(["/b/2.htm", "/a/3.htm"], now=now) == ["/a/3.htm"]
+    assert len(store) == 3
+
+    assert store.needs_fetch("/a/1.htm", now=now)
+    assert store.record_fetch("/a/1.htm", {"price": "1 đ", "url": "/a/1.htm"}, now=now)
+    assert not store.needs_fetch("/a/1.htm", now=now + timedelta(hours=23))
+    assert store.needs_fetch("/a/1.htm", now=now + timedelta(hours=25))
+    assert store.pending_fetch(["/a/3.htm", "/a/1.htm", "/x/9.htm"], now=now) == ["/a/3.htm", "/x/9.htm"]
+    assert store.pending_fetch(["/a/1.htm"], now=now + timedelta(hours=25)) == ["/a/1.htm"]
+
+    # Cùng nội dung (url khác vẫn là cùng mã tin) thì không tính là thay đổi và không ghi lại bản ghi
+    assert not store.record_fetch("/c/1.htm", {"price": "1 đ", "url": "/c/1.htm"}, now=now)
+    assert list(store.records()) == [{"price": "1 đ", "url": "/a/1.htm"}]
+    assert store.record_fetch("/a/1.htm", {"price": "2 đ"}, now=now)
+    assert list(store.records()) == [{"price": "2 đ"}]
+
+    # Trạng thái được giữ sau khi mở lại file
+    store.close()
+    assert len(CrawlStateStore(str(tmp_path / "state.db"))) == 3
+
+
+def test_state_without_records_is_refetched(tmp_path):
+    path = str(tmp_path / "state.db")
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE crawl_state (
+            listing_id TEXT PRIMARY KEY, url TEXT NOT NULL, first_seen TEXT NOT NULL, last_seen TEXT NOT NULL,
+            last_fetched TEXT, content_hash TEXT
+        )
+    """)
+    conn.execute("INSERT INTO crawl_state VALUES ('1', '/a/1.htm', '2025-05-01', '2025-05-01', '2025-05-01', 'x')")
+    conn.commit()
+    conn.close()
+
+    # File trạng thái cũ không có bản ghi để xuất CSV, nên bài đăng phải được tải lại
+    store = CrawlStateStore(path, refetch_after_hours=24)
+    now = datetime(2025, 5, 1, 12)
+    assert store.pending_fetch(["/a/1.htm"], now=now) == ["/a/1.htm"]
+    assert store.needs_fetch("/a/1.htm", now=now)
+    store.record_fetch("/a/1.htm", {"price": "1 đ"}, now=now)
+    assert store.pending_fetch(["/a/1.htm"], now=now) == []
+    store.close()
+
+
+def test_recurring_crawl_costs_only_new_inventory(tmp_path, monkeypatch, server):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data" / "raw").mkdir(parents=True)
+    (tmp_path / "data" / "processed").mkdir(parents=True)
+
+    def crawl(now=None):
+        Handler.requests = []
+        crawler = ChototCrawler(rate=0, max_in_flight=2, state_path=str(tmp_path / "state.db"))
+        crawler.base_url = f"{server}/mua-ban-xe-may"
+        if now is not None:
+            monkeypatch.setattr(crawl_state, "datetime", type("Clock", (datetime,), {"now": staticmethod(lambda: now)}))
+        urls = crawler.scrape_multiple_pages(num_pages=5)
+        stats = crawler.scrape_listings_with_details(urls, log_path=str(tmp_path / "details.jsonl"))
+        crawler.state.close()
+        lists = [page for kind, page in Handler.requests if kind == "list"]
+        fetched = sorted(ad_id for kind, ad_id in Handler.requests if kind == "detail")
+        return lists, fetched, stats
+
+    def exported_ids():
+        saved = pd.read_csv(tmp_path / "data" / "processed" / "chotot_motorbikes.csv")
+        return sorted(listing_id(url) for url in saved["url"])
+
+    def logged_ids():
+        return sorted(listing_id(record["url"]) for record in CrawlLog(str(tmp_path / "details.jsonl"), resume=True).records())
+
+    lists, fetched, stats = crawl()
+    assert lists == [1, 2, 3, 4, 5]
+    assert len(fetched) == 15 and stats["records"] == 15
+    assert stats["changed"] == 15
+
+    # Không có tin mới: dừng ngay sau trang 1 và không tải lại trang chi tiết nào,
+    # nhưng file CSV vẫn chứa toàn bộ bài đăng đã biết
+    lists, fetched, stats = crawl()
+    assert lists == [1] and fetched == [] and stats["skipped"] == 3
+    assert stats["records"] == 15 and len(exported_ids()) == 15
+
+    # Hai tin mới ở đầu: trang 2 chỉ còn tin đã biết nên dừng ở đó, chỉ tải hai tin mới
+    Handler.inventory = ["900", "901"] + Handler.inventory
+    lists, fetched, stats = crawl()
+    assert lists == [1, 2]
+    assert fetched == ["900", "901"]
+    assert stats["skipped"] == 4 and stats["changed"] == 2
+    assert exported_ids() == sorted(Handler.inventory)
+    assert logged_ids() == ["900", "901"]
+
+    # Quá hạn tải lại: 5 trang (15 bài đăng) được tải lại nhưng nội dung không đổi nên không ghi vào nhật ký;
+    # hai bài đăng đã trôi khỏi 5 trang đầu vẫn còn trong file CSV
+    lists, fetched, stats = crawl(now=datetime.now() + timedelta(hours=100))
+    assert len(fetched) == 15 and stats["changed"] == 0
+    assert logged_ids() == [] and stats["records"] == 17
+
+
+def test_listing_only_run_does_not_stop_detail_run(tmp_path, monkeypatch, server):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data" / "raw").mkdir(parents=True)
+    (tmp_path / "data" / "processed").mkdir(parents=True)
+
+    def new_crawler():
+        crawler = ChototCrawler(rate=0, max_in_flight=2, state_path=str(tmp_path / "state.db"))
+        crawler.base_url = f"{server}/mua-ban-xe-may"
+        return crawler
+
+    # Lượt chỉ lấy URL: mọi bài đăng đã thấy nhưng chưa tải trang chi tiết
+    crawler = new_crawler()
+    assert len(crawler.scrape_multiple_pages(num_pages=5)) == 15
+    crawler.state.close()
+
+    # Lượt sau vẫn đi hết các trang và tải đủ trang chi tiết
+    Handler.requests = []
+    crawler = new_crawler()
+    urls = crawler.scrape_multiple_pages(num_pages=5)
+    stats = crawler.scrape_listings_with_details(urls, log_path=str(tmp_path / "details.jsonl"))
+    crawler.state.close()
+    assert [page for kind, page in Handler.requests if kind == "list"] == [1, 2, 3, 4, 5]
+    assert stats["records"] == 15 and stats["skipped"] == 0
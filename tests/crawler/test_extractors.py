@@ -0,0 +1,68 @@
+import json
+import re
+from pathlib import Path
+
+import pytest
+
+from crawler.extractors import ExtractorChain, SoupExtractor, StructuredDataExtractor, html_extractor
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def read_fixture(name):
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+@pytest.fixture(scope="module")
+def listing_page():
+    return read_fixture("listing_page.html")
+
+
+@pytest.fixture(scope="module")
+def detail_page():
+    return read_fixture("detail_page.html")
+
+
+def without_scripts(content):
+    return re.sub(r"<script.*?</script>", "", content, flags=re.S)
+
+
+@pytest.mark.parametrize("extractor", [StructuredDataExtractor(), SoupExtractor(), html_extractor()],
+                         ids=lambda extractor: extractor.name)
+def test_extractors_agree_on_fixtures(extractor, listing_page, detail_page):
+    assert extractor.listing_urls(listing_page) == json.loads(read_fixture("listing_page.expected.json"))
+    assert extractor.detail(detail_page) == json.loads(read_fixture("detail_page.expected.json"))
+
+
+def test_chain_falls_back_to_html_without_structured_data(listing_page, detail_page):
+    chain = ExtractorChain()
+    assert StructuredDataExtractor().detail(without_scripts(detail_page)) is None
+    assert chain.detail(without_scripts(detail_page)) == json.loads(read_fixture("detail_page.expected.json"))
+    assert chain.listing_urls(without_scripts(listing_page)) == json.loads(read_fixture("listing_page.expected.json"))
+
+
+def test_structured_data_survives_class_renames(detail_page):
+    renamed = detail_page.replace("bwq0cbs", "zz91abc").replace("p26z2wb", "zz92abc")
+    assert SoupExtractor().detail(renamed) is None
+    assert ExtractorChain().detail(renamed) == json.loads(read_fixture("detail_page.expected.json"))
+
+
+def test_structured_data_with_unknown_labels_falls_back(detail_page, caplog):
+    # Nhãn thông số trong __NEXT_DATA__ đổi khác PARAMETER_LABELS: không nhận bài đăng thiếu hãng/mẫu xe
+    start = detail_page.index('id="__NEXT_DATA__"')
+    end = detail_page.index("</script>", start)
+    relabeled = (
+        detail_page[:start]
+        + detail_page[start:end].replace("Hãng xe", "Thương hiệu").replace("Dòng xe", "Mẫu")
+        + detail_page[end:]
+    )
+    assert StructuredDataExtractor().detail(relabeled) is None
+    assert "brand, model" in caplog.text
+    assert ExtractorChain().detail(relabeled) == json.loads(read_fixture("detail_page.expected.json"))
+
+
+def test_unparseable_pages():
+    chain = ExtractorChain()
+    assert chain.listing_urls("") == []
+    assert chain.detail("<html><body>Trang không tồn tại</body></html>") is None
+    assert chain.detail('<script id="__NEXT_DATA__" type="application/json">{broken</script>') is None
@@ -0,0 +1,109 @@
+import gzip
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+import requests
+
+from crawler.chotot_crawler import ChototCrawler
+from crawler.http_session import CRAWL_ACCEPT_ENCODING, CrawlSession
+
+DETAIL_PAGE = (Path(__file__).parent / "fixtures" / "detail_page.html").read_bytes()
+PAGE = ("<html><body>" + "<p>Honda Vision 2020, biển số đẹp</p>" * 500 + "</body></html>").encode("utf-8")
+
+
+class Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 để giữ kết nối keep-alive giữa các request
+    protocol_version = "HTTP/1.1"
+    encodings = []
+
+    def do_GET(self):
+        accept = self.headers.get("Accept-Encoding", "")
+        Handler.encodings.append(accept)
+        body = PAGE
+        if self.path.startswith("/slow"):
+            time.sleep(1)
+        if self.path.startswith("/busy"):
+            # Trang báo lỗi vẫn có nội dung trang chi tiết hợp lệ
+            body = DETAIL_PAGE
+            self.send_response(429)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self.send_response(200)
+        if "gzip" in accept:
+            body = gzip.compress(PAGE)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    Handler.encodings = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_compressed_keep_alive_requests(base_url):
+    session = CrawlSession(pool_size=2)
+    for i in range(10):
+        assert session.get(f"{base_url}/page/{i}").content == PAGE
+
+    stats = session.stats()
+    assert stats["requests"] == 10
+    assert stats["bytes_decoded"] == 10 * len(PAGE)
+    assert stats["bytes_wire"] < stats["bytes_decoded"] / 10
+    assert stats["new_connections"] == 1
+    assert stats["reuse_ratio"] == 0.9
+    assert all("gzip" in accept for accept in Handler.encodings)
+    assert "gzip" in CRAWL_ACCEPT_ENCODING
+
+
+def test_connections_bounded_by_pool_size(base_url):
+    session = CrawlSession(pool_size=2)
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        list(executor.map(lambda i: session.get(f"{base_url}/page/{i}"), range(30)))
+    assert session.stats()["new_connections"] <= 2
+
+    # Đếm lại cho lượt sau: kết nối cũ vẫn được dùng lại
+    session.reset_stats()
+    session.get(f"{base_url}/again")
+    assert session.stats()["new_connections"] == 0
+    assert session.stats()["reuse_ratio"] == 1.0
+
+
+def test_crawler_uses_pooled_session(base_url):
+    crawler = ChototCrawler(rate=0, max_in_flight=3, state_path=None)
+    crawler.session.reset_stats()
+    for i in range(3):
+        assert crawler.get_page_content(f"{base_url}/list?page={i}") == PAGE.decode("utf-8")
+    stats = crawler.session.stats()
+    assert stats["requests"] == 3 and stats["new_connections"] == 1
+    assert "Mozilla" in crawler.session.session.headers["User-Agent"]
+
+
+def test_stalled_server_times_out(base_url):
+    session = CrawlSession(pool_size=1, timeout=(1, 0.2))
+    with pytest.raises(requests.Timeout):
+        session.get(f"{base_url}/slow")
+    # Kết nối treo không giữ chỗ trong pool: request sau vẫn chạy
+    assert session.get(f"{base_url}/page").content == PAGE
+
+
+def test_error_pages_count_as_failures(base_url):
+    crawler = ChototCrawler(rate=0, max_in_flight=2, state_path=None, timeout=(1, 0.2))
+    assert crawler.extract_data(f"{base_url}/busy/1.htm") is None
+    assert crawler.extract_data(f"{base_url}/slow/2.htm") is None
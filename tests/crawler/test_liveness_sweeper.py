@@ -0,0 +1,106 @@
+import sqlite3
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from benchmarks.synthetic_data import make_listings
+from crawler.clean_data import create_sqlite_database
+from crawler.liveness_sweeper import LivenessSweeper
+from utils.db_serving import InMemoryDatabase
+from utils.liveness import LivenessChecker
+
+
+class Handler(BaseHTTPRequestHandler):
+    STATUSES = {"/ok": 200, "/gone": 404, "/error": 503}
+
+    def do_HEAD(self):
+        self.send_response(self.STATUSES.get(self.path, 200))
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def make_db(path, base_url, order=(0, 1, 2)):
+    df = make_listings(3).assign(
+        title=["a", "b", "c"],
+        url_full=[f"{base_url}/ok", f"{base_url}/gone", f"{base_url}/error"],
+    )
+    create_sqlite_database(df.iloc[list(order)].reset_index(drop=True), path)
+
+
+def read_status(path):
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT title, is_alive, last_checked_at IS NOT NULL FROM motorbikes ORDER BY title").fetchall()
+    version = conn.execute("SELECT value FROM metadata WHERE key = 'liveness_version'").fetchone()
+    conn.close()
+    return rows, version[0] if version else None
+
+
+def test_sweep_marks_gone_listings_and_bumps_version(tmp_path, base_url):
+    db_path = str(tmp_path / "motorbike_database.db")
+    make_db(db_path, base_url)
+    assert read_status(db_path) == ([("a", 1, 0), ("b", 1, 0), ("c", 1, 0)], None)
+
+    sweeper = LivenessSweeper(db_path, rate=100, checker=LivenessChecker(request_timeout=1))
+    stats = sweeper.sweep_batch()
+
+    assert stats == {"checked": 3, "alive": 1, "dead": 1, "unknown": 1, "changed": 1}
+    # 503 chưa đủ để kết luận: giữ nguyên is_alive nhưng vẫn ghi thời điểm kiểm tra
+    assert read_status(db_path) == ([("a", 1, 1), ("b", 0, 1), ("c", 1, 1)], "1")
+
+    # Tất cả đã được kiểm tra gần đây nên lượt sau không còn gì để làm
+    assert sweeper.sweep_batch()["checked"] == 0
+
+    # Tạo lại database từ dữ liệu mới vẫn giữ trạng thái đã kiểm tra
+    make_db(db_path, base_url)
+    assert read_status(db_path) == ([("a", 1, 1), ("b", 0, 1), ("c", 1, 1)], "1")
+
+
+def test_rebuild_during_sweep_keeps_results_on_the_right_listing(tmp_path, base_url):
+    db_path = str(tmp_path / "motorbike_database.db")
+    make_db(db_path, base_url)
+
+    class RebuildingChecker(LivenessChecker):
+        rebuilt = False
+
+        def status(self, url):
+            # Database được tạo lại (thứ tự dòng khác) trong lúc đang kiểm tra URL
+            if not RebuildingChecker.rebuilt:
+                RebuildingChecker.rebuilt = True
+                make_db(db_path, base_url, order=(2, 0, 1))
+            return super().status(url)
+
+    sweeper = LivenessSweeper(db_path, rate=100, checker=RebuildingChecker(request_timeout=1))
+    assert sweeper.sweep_batch()["dead"] == 1
+    assert read_status(db_path) == ([("a", 1, 1), ("b", 0, 1), ("c", 1, 1)], "1")
+
+
+def test_memory_copy_reloads_only_when_liveness_changes(tmp_path, base_url):
+    db_path = str(tmp_path / "motorbike_database.db")
+    make_db(db_path, base_url)
+    memory_db = InMemoryDatabase(db_path, check_interval=0)
+    assert memory_db.refresh_if_changed(force=True)
+
+    sweeper = LivenessSweeper(db_path, rate=100, checker=LivenessChecker(request_timeout=1))
+    sweeper.sweep_batch()
+    assert memory_db.refresh_if_changed()
+    conn = memory_db.connect()
+    assert conn.execute("SELECT is_alive FROM motorbikes WHERE title = 'b'").fetchone()[0] == 0
+    conn.close()
+
+    # Lượt quét chỉ ghi last_checked_at không làm nạp lại cả database
+    sweeper.max_age = timedelta(seconds=-1)
+    assert sweeper.sweep_batch() == {"checked": 3, "alive": 1, "dead": 1, "unknown": 1, "changed": 0}
+    assert not memory_db.refresh_if_changed()
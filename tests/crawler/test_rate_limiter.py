@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from crawler.chotot_crawler import ChototCrawler
+from crawler.rate_limiter import HostRateLimiter, ThroughputMeter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        with self.lock:
+            self.now += seconds
+
+
+def test_token_bucket_burst_then_steady_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, burst=2, clock=clock, sleep=clock.sleep)
+    waits = [bucket.acquire() for _ in range(5)]
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2:] == pytest.approx([0.1, 0.1, 0.1])
+    assert clock.now == pytest.approx(0.3)
+
+    # Nghỉ lâu chỉ tích lũy tối đa burst token
+    clock.now += 10
+    assert [bucket.acquire() for _ in range(3)] == pytest.approx([0.0, 0.0, 0.1])
+
+
+def test_unlimited_rate_never_waits():
+    assert TokenBucket(rate=0).acquire() == 0.0
+
+
+def test_limiter_caps_rate_and_in_flight_per_host():
+    limiter = HostRateLimiter(rate=50, max_in_flight=2)
+    lock = threading.Lock()
+    in_flight = {"a": 0, "b": 0}
+    peak = {"a": 0, "b": 0}
+    started = []
+
+    def request(host):
+        with limiter.slot(f"http://{host}.example/item"):
+            with lock:
+                started.append((host, time.monotonic()))
+                in_flight[host] += 1
+                peak[host] = max(peak[host], in_flight[host])
+            time.sleep(0.05)
+            with lock:
+                in_flight[host] -= 1
+
+    threads = [threading.Thread(target=request, args=(host,)) for host in "ab" * 10]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == {"a": 2, "b": 2}
+    # Mỗi host 10 request ở 50 request/giây: request cuối bắt đầu sau ít nhất ~0.18 giây
+    for host in "ab":
+        times = sorted(t for h, t in started if h == host)
+        assert times[-1] - start >= 0.17
+
+
+def test_concurrent_details_report_throughput(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data" / "processed").mkdir(parents=True)
+    crawler = ChototCrawler(rate=100, max_in_flight=4, state_path=None)
+
+    def fake_extract(url):
+        with crawler.limiter.slot(crawler.base_url + url):
+            time.sleep(0.02)
+        return None if url.endswith("7") else {"title": "Xe", "price": "1 đ", "url": url}
+
+    monkeypatch.setattr(crawler, "extract_data", fake_extract)
+    urls = [f"/item-{i}" for i in range(20)]
+    stats = crawler.scrape_listings_with_details(urls, log_path=str(tmp_path / "details.jsonl"))
+
+    saved = pd.read_csv(tmp_path / "data" / "processed" / "chotot_motorbikes.csv")
+    assert sorted(saved["url"]) == sorted(url for url in urls if not url.endswith("7"))
+    assert stats is crawler.last_crawl_stats
+    assert (stats["requests"], stats["succeeded"], stats["failed"], stats["records"]) == (20, 18, 2, 18)
+    assert stats["requests_per_s"] <= 100 * 1.1
+
+
+def test_meter_report():
+    clock = FakeClock()
+    meter = ThroughputMeter(clock=clock)
+    for ok in (True, True, False):
+        meter.record(ok)
+    clock.now = 1.5
+    assert meter.report() == {"requests": 3, "succeeded": 2, "failed": 1, "elapsed_s": 1.5, "requests_per_s": 2.0}
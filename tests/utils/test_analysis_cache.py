@@ -0,0 +1,83 @@
+import base64
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils import analysis_cache, data_service
+from utils.analysis_cache import (
+    AnalysisCache, MemoryBackend, description_cache_key, image_cache_key, set_analysis_cache
+)
+from utils.result_cache import ResultCache
+
+
+class FakeClaude(BaseHTTPRequestHandler):
+    """Server thay thế API phân tích, trả về cùng một kết quả JSON và đếm số request"""
+    requests = 0
+
+    def do_POST(self):
+        FakeClaude.requests += 1
+        self.rfile.read(int(self.headers["Content-Length"]))
+        text = '```json\n{"brand": "Honda", "model": "Vision", "year": 2021, "cc": 110}\n```'
+        body = json.dumps({"content": [{"type": "text", "text": text}]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    FakeClaude.requests = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeClaude)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(data_service, "CLAUDE_API_KEY", "test-key")
+    monkeypatch.setattr(data_service, "CLAUDE_API_URL", f"http://127.0.0.1:{server.server_address[1]}/v1/messages")
+    set_analysis_cache(AnalysisCache(MemoryBackend()))
+    yield
+    set_analysis_cache(None)
+    server.shutdown()
+    server.server_close()
+
+
+def test_keys_depend_on_content_only():
+    image = base64.b64encode(b"\xff\xd8jpeg bytes").decode()
+    assert image_cache_key(image) == image_cache_key(image)
+    assert image_cache_key(image) != image_cache_key(base64.b64encode(b"other").decode())
+
+    assert description_cache_key("Honda  Vision\n2021 ") == description_cache_key("honda vision 2021")
+    assert description_cache_key("Honda Vision 2021") != description_cache_key("Honda Vision 2022")
+
+
+def test_ttl_expiry(monkeypatch):
+    cache = AnalysisCache(MemoryBackend(), ttl=60)
+    now = 1_000_000.0
+    monkeypatch.setattr(analysis_cache.time, "time", lambda: now)
+    cache.set("k", {"brand": "Honda"})
+    assert cache.get("k") == {"brand": "Honda"}
+
+    now += 61
+    assert cache.get("k") is None
+
+
+def test_disk_backend_shared_between_instances(tmp_path):
+    AnalysisCache(ResultCache(str(tmp_path))).set("k", {"brand": "Yamaha"})
+    assert AnalysisCache(ResultCache(str(tmp_path))).get("k") == {"brand": "Yamaha"}
+
+
+def test_repeat_analysis_hits_cache(fake_api):
+    image = base64.b64encode(b"\xff\xd8same photo").decode()
+    first = data_service.analyze_image(image)
+    second = data_service.analyze_image(image)
+    assert first == second and first["model"] == "Vision"
+    assert FakeClaude.requests == 1
+
+    data_service.analyze_description("Bán Honda Vision 2021, đi 12.000 km")
+    data_service.analyze_description("bán honda vision 2021,  đi 12.000 km ")
+    assert FakeClaude.requests == 2
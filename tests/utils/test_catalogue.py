@@ -0,0 +1,62 @@
+import sqlite3
+
+import pytest
+
+from utils.catalogue import BikeCatalogue
+
+
+@pytest.fixture
+def catalogue():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""
+        CREATE TABLE motorbikes (brand TEXT, model_normalized TEXT, reg_year_numeric REAL, mileage_numeric REAL)
+    """)
+    conn.executemany("INSERT INTO motorbikes VALUES (?, ?, ?, ?)", [
+        ("Honda", "Vision", 2018.0, 12000.0),
+        ("Honda", "Vision", 2021.0, 3500.0),
+        ("Honda", "Air Blade", 2019.0, None),
+        ("Yamaha", "Exciter", None, None),
+        ("Yamaha", None, 2020.0, 1000.0),
+        (None, "Wave", 2015.0, 1000.0),
+    ])
+    catalogue = BikeCatalogue.from_connection(conn)
+    conn.close()
+    return catalogue
+
+
+def test_brands_and_models_sorted(catalogue):
+    assert catalogue.brands() == ["Honda", "Yamaha"]
+    assert catalogue.models("Honda") == ["Air Blade", "Vision"]
+    assert catalogue.models("Suzuki") == []
+    assert len(catalogue) == 3
+
+    # Danh sách trả về là bản sao, sửa không ảnh hưởng danh mục
+    catalogue.brands().append("Suzuki")
+    assert catalogue.brands() == ["Honda", "Yamaha"]
+
+
+def test_ranges(catalogue):
+    assert catalogue.model_info("Honda", "Vision") == {
+        "year_range": (2018, 2021),
+        "km_range": (3500, 12000),
+        "listing_count": 2,
+    }
+    assert catalogue.year_range("Honda", "Air Blade") == (2019, 2019)
+    assert catalogue.km_range("Honda", "Air Blade") == (None, None)
+    assert catalogue.km_range("Honda", "Wave") == (None, None)
+    assert catalogue.model_info("Suzuki", "Raider") is None
+
+
+def test_market_range_label(catalogue):
+    assert catalogue.market_range_label("Honda", "Vision") == "đời 2018 - 2021, 3,500 - 12,000 km (2 tin đăng)"
+    # Mẫu xe không có số km (MIN/MAX trả về NULL) không làm lỗi định dạng
+    assert catalogue.market_range_label("Honda", "Air Blade") == "đời 2019 (1 tin đăng)"
+    assert catalogue.market_range_label("Yamaha", "Exciter") == "chưa có thông tin đời xe và số km (1 tin đăng)"
+    assert catalogue.market_range_label("Suzuki", "Raider") is None
+
+
+def test_empty_catalogue():
+    catalogue = BikeCatalogue()
+    assert catalogue.brands() == []
+    assert len(catalogue) == 0
+    assert catalogue.year_range("Honda", "Vision") == (None, None)
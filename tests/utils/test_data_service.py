@@ -0,0 +1,68 @@
+import sqlite3
+
+import pytest
+
+from benchmarks.synthetic_data import make_listings
+from crawler.clean_data import create_sqlite_database
+from utils import data_service, result_cache
+from utils.listing_cards import DESCRIPTION_MAX_LENGTH
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "motorbike_database.db")
+    create_sqlite_database(make_listings(200), db_path)
+    monkeypatch.setattr(data_service, "DB_PATH", db_path)
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_DIR", "")
+    data_service._load_similar_listings.clear()
+    data_service._search_listings.clear()
+    yield db_path
+    data_service._load_similar_listings.clear()
+    data_service._search_listings.clear()
+
+
+def test_transient_errors_are_not_cached(database, monkeypatch):
+    connect = data_service.get_db_connection
+    failures = {"left": 2}
+
+    def flaky_connection():
+        if failures["left"]:
+            failures["left"] -= 1
+            raise sqlite3.OperationalError("database is locked")
+        return connect()
+
+    monkeypatch.setattr(data_service, "get_db_connection", flaky_connection)
+    assert data_service.get_similar_listings(30_000_000).empty
+    assert data_service.search_listings("honda").empty
+
+    # Cùng phiên bản dữ liệu: lần gọi sau truy vấn lại thay vì trả về kết quả lỗi đã cache
+    assert not data_service.get_similar_listings(30_000_000).empty
+    assert not data_service.search_listings("honda").empty
+
+
+def test_similar_listings_are_limited_and_shared_across_close_prices(database, monkeypatch, tmp_path):
+    monkeypatch.setattr(result_cache, "_cache", result_cache.ResultCache(str(tmp_path / "cache")))
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_DIR", str(tmp_path / "cache"))
+    calls = []
+    connect = data_service.get_db_connection
+
+    def counting_connection():
+        calls.append(1)
+        return connect()
+
+    conn = sqlite3.connect(database)
+    conn.execute("UPDATE motorbikes SET description = description || ?", ("x" * 1_000,))
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(data_service, "get_db_connection", counting_connection)
+    listings = data_service.get_similar_listings(30_012_345, brand="Honda", limit=4)
+
+    assert len(listings) == 4
+    assert "vehicle_type" not in listings.columns
+    assert (listings["description"].str.len() == DESCRIPTION_MAX_LENGTH + 1).all()
+    assert listings["price_diff"].is_monotonic_increasing
+
+    # Giá dự đoán gần nhau (cùng bước làm tròn) dùng lại kết quả đã cache
+    data_service.get_similar_listings(30_040_000, brand="Honda", limit=4, mileage=12_345.6)
+    assert len(calls) == 1
@@ -0,0 +1,134 @@
+import os
+import sqlite3
+
+import pytest
+
+from utils import db_serving
+from utils.db_serving import (
+    InMemoryDatabase,
+    get_content_version,
+    get_data_version,
+    get_memory_database,
+    read_data_version,
+    read_metadata,
+)
+
+
+def write_db(path, titles, metadata=None):
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("DROP TABLE IF EXISTS motorbikes")
+        conn.execute("CREATE TABLE motorbikes (title TEXT)")
+        conn.executemany("INSERT INTO motorbikes (title) VALUES (?)", [(title,) for title in titles])
+        if metadata is not None:
+            conn.execute("CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT)")
+            conn.executemany("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", metadata.items())
+    conn.close()
+
+    # Đảm bảo chữ ký file đổi kể cả khi hai lần ghi rơi vào cùng một tick đồng hồ
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def titles(memory_db):
+    conn = memory_db.connect()
+    try:
+        return [row["title"] for row in conn.execute("SELECT title FROM motorbikes ORDER BY title")]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "motorbike_database.db")
+    write_db(path, ["a", "b"], {"data_version": "v1", "built_at": "2024-01-01T00:00:00"})
+    return path
+
+
+def test_load_copies_database_into_memory(db_path):
+    memory_db = InMemoryDatabase(db_path)
+    assert memory_db.refresh_if_changed(force=True)
+    assert titles(memory_db) == ["a", "b"]
+
+    # Bản sao độc lập với file trên đĩa và chỉ cho phép đọc
+    os.remove(db_path)
+    assert titles(memory_db) == ["a", "b"]
+    conn = memory_db.connect()
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("INSERT INTO motorbikes (title) VALUES ('c')")
+    conn.close()
+
+
+def test_reloads_when_data_version_changes(db_path):
+    memory_db = InMemoryDatabase(db_path, check_interval=0)
+    memory_db.refresh_if_changed(force=True)
+    old_conn = memory_db.connect()
+
+    write_db(db_path, ["c"], {"data_version": "v2"})
+    assert memory_db.refresh_if_changed()
+    assert titles(memory_db) == ["c"]
+    assert not memory_db.refresh_if_changed()
+
+    # Kết nối mở trước khi nạp lại vẫn đọc database cũ
+    assert [row[0] for row in old_conn.execute("SELECT title FROM motorbikes ORDER BY title")] == ["a", "b"]
+    old_conn.close()
+
+
+def test_ignores_writes_that_keep_content_version(db_path):
+    memory_db = InMemoryDatabase(db_path, check_interval=0)
+    memory_db.refresh_if_changed(force=True)
+
+    write_db(db_path, ["a", "b", "c"], {"data_version": "v1"})
+    assert not memory_db.refresh_if_changed()
+
+    write_db(db_path, ["a", "b", "c"], {"data_version": "v1", "liveness_version": "1"})
+    assert memory_db.refresh_if_changed()
+    assert titles(memory_db) == ["a", "b", "c"]
+
+
+def test_check_interval_throttles_version_checks(db_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(db_serving.time, "monotonic", lambda: clock[0])
+    memory_db = InMemoryDatabase(db_path, check_interval=1.0)
+    memory_db.refresh_if_changed(force=True)
+
+    write_db(db_path, ["c"], {"data_version": "v2"})
+    clock[0] += 0.5
+    assert not memory_db.refresh_if_changed()
+    assert titles(memory_db) == ["a", "b"]
+
+    clock[0] += 0.6
+    assert memory_db.refresh_if_changed()
+    assert titles(memory_db) == ["c"]
+
+    write_db(db_path, ["d"], {"data_version": "v3"})
+    assert memory_db.refresh_if_changed(force=True)
+
+
+def test_get_memory_database_is_shared(db_path, monkeypatch):
+    monkeypatch.setattr(db_serving, "_instances", {})
+    memory_db = get_memory_database(db_path)
+    assert get_memory_database(os.path.join(os.path.dirname(db_path), ".", "motorbike_database.db")) is memory_db
+    assert titles(memory_db) == ["a", "b"]
+
+
+def test_metadata_and_versions(db_path, tmp_path):
+    assert read_metadata(db_path) == {"data_version": "v1", "built_at": "2024-01-01T00:00:00"}
+    assert read_data_version(db_path) == "v1"
+    assert get_data_version(db_path) == "v1"
+    assert get_content_version(db_path) == ("v1", "0")
+
+    write_db(db_path, ["a"], {"data_version": "v2", "liveness_version": "3"})
+    assert get_data_version(db_path) == "v2"
+    assert get_content_version(db_path) == ("v2", "3")
+
+    # Database cũ chưa có bảng metadata: dùng chữ ký file
+    legacy_path = str(tmp_path / "legacy.db")
+    write_db(legacy_path, ["a"])
+    assert read_metadata(legacy_path) == {}
+    assert read_data_version(legacy_path).startswith("file-")
+    assert get_data_version(legacy_path) == read_data_version(legacy_path)
+
+    missing_path = str(tmp_path / "missing.db")
+    assert get_data_version(missing_path) is None
+    assert get_content_version(missing_path) == (None, None)
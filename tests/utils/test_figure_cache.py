@@ -0,0 +1,74 @@
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from utils.figure_cache import FigureCache, figure_key
+from utils.visualization import create_market_overview
+
+
+def market_data(count=120):
+    return pd.DataFrame({
+        "Thương hiệu": ["Honda", "Yamaha", "Suzuki"],
+        "Số lượng giao dịch": [count, 80, 40],
+        "Giá trung bình (triệu VND)": [35.0, 32.5, 28.0],
+    })
+
+
+class CountingBuilder:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, data):
+        self.calls += 1
+        fig, ax = plt.subplots(figsize=(2, 2))
+        ax.bar(data.iloc[:, 0], data.iloc[:, 1])
+        return fig
+
+
+def test_builder_runs_once_per_key():
+    cache = FigureCache()
+    build = CountingBuilder()
+    first = cache.render("bars", build, market_data(), data_version=1)
+    second = cache.render("bars", build, market_data(), data_version=1)
+    assert first == second
+    assert first.startswith(b"\x89PNG")
+    assert build.calls == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_changed_data_or_version_rerenders():
+    cache = FigureCache()
+    build = CountingBuilder()
+    cache.render("bars", build, market_data(), data_version=1)
+    cache.render("bars", build, market_data(count=121), data_version=1)
+    cache.render("bars", build, market_data(), data_version=2)
+    assert build.calls == 3
+
+
+def test_key_depends_on_content_not_identity():
+    assert figure_key("x", 1, (market_data(),)) == figure_key("x", 1, (market_data(),))
+    assert figure_key("x", 1, (market_data(),)) != figure_key("x", 1, (market_data(),), fmt="svg")
+    assert figure_key("x", 1, (), {"a": 1}) != figure_key("x", 1, (), {"a": 2})
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = FigureCache(max_entries=2, max_bytes=1000)
+    cache.set("a", b"1" * 100)
+    cache.set("b", b"2" * 100)
+    cache.get("a")
+    cache.set("c", b"3" * 100)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+    cache.set("d", b"4" * 950)
+    assert cache.get("a") is None and cache.get("c") is None
+    assert cache.stats()["size_bytes"] == 950
+
+    cache.set("huge", b"5" * 2000)
+    assert cache.get("huge") is None
+
+
+def test_svg_output_for_visualization_function():
+    cache = FigureCache()
+    data = cache.render("market_overview", create_market_overview, market_data(), data_version=1, fmt="svg")
+    assert b"<svg" in data
+    assert plt.get_fignums() == []
@@ -0,0 +1,46 @@
+import io
+
+import numpy as np
+from PIL import Image
+
+from utils.image_preprocessing import preprocess_image
+
+
+def make_photo(size, orientation=None, mode="RGB", fmt="JPEG"):
+    """Ảnh nhiễu (khó nén) giống ảnh chụp từ điện thoại, có thể kèm EXIF orientation"""
+    rng = np.random.default_rng(0)
+    channels = len(mode)
+    pixels = rng.integers(0, 256, (size[1], size[0], channels), dtype=np.uint8)
+    image = Image.fromarray(pixels.squeeze(), mode)
+    exif = Image.Exif()
+    exif[0x010F] = "PhoneMaker"  # Make
+    if orientation:
+        exif[0x0112] = orientation
+    output = io.BytesIO()
+    if fmt == "JPEG":
+        image.save(output, format=fmt, quality=98, exif=exif)
+    else:
+        image.save(output, format=fmt)
+    return output.getvalue()
+
+
+def test_downscales_orients_and_strips_metadata():
+    raw = make_photo((4000, 3000), orientation=6)  # xoay 90 độ: ảnh đứng
+    data, stats = preprocess_image(raw, max_edge=1000, quality=80)
+
+    result = Image.open(io.BytesIO(data))
+    assert result.format == "JPEG"
+    assert result.size == (750, 1000)
+    assert stats["original_size"] == (4000, 3000) and stats["size"] == (750, 1000)
+    assert len(result.getexif()) == 0
+    assert stats["bytes"] == len(data)
+    assert stats["bytes_saved"] == len(raw) - len(data) > 0
+
+
+def test_small_png_with_alpha_is_not_upscaled():
+    raw = make_photo((300, 200), mode="RGBA", fmt="PNG")
+    data, stats = preprocess_image(raw, max_edge=1000)
+
+    result = Image.open(io.BytesIO(data))
+    assert result.mode == "RGB"
+    assert result.size == (300, 200)
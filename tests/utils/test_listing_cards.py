@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from utils.listing_cards import render_listing_cards
+
+
+def test_renders_one_card_per_listing_with_fallbacks():
+    df = pd.DataFrame({
+        "title": ["Honda Vision 2020", "Yamaha Exciter"],
+        "brand": ["Honda", None],
+        "model": ["Vision", "Exciter"],
+        "reg_year": ["2020", ""],
+        "post_date_display": ["01/04/2025", None],
+        "days_since_posted": [3, 7],
+        "description": ["x" * 200, np.nan],
+        "price_millions": [25.5, None],
+        "price": ["25.500.000 đ", "30.000.000 đ"],
+        "url_full": ["/mua-ban-xe-may/1.htm", "https://xe.chotot.com/2.htm"],
+    })
+    html = render_listing_cards(df)
+
+    assert html.count("class='listing-card'") == 2
+    assert "🏭 Model: Honda Vision" in html and "Model:  Exciter" not in html
+    assert "Năm đăng ký: 2020" in html and html.count("Năm đăng ký") == 1
+    assert "Đăng ngày: 01/04/2025" in html and "Đã đăng: 7 ngày trước" in html
+    assert "x" * 147 + "..." in html and "x" * 148 not in html
+    assert "25.5 triệu" in html and "30.000.000 đ" in html
+    assert "href='https://xe.chotot.com/mua-ban-xe-may/1.htm'" in html
+    assert render_listing_cards(df.iloc[0:0]) == ""
+
+
+def test_escapes_user_content_and_unsafe_urls():
+    df = pd.DataFrame({
+        "title": ["<script>alert(1)</script>"],
+        "location": ["Hà Nội & 'HCM'"],
+        "url_full": ["javascript:alert(1)"],
+    })
+    html = render_listing_cards(df)
+
+    assert "<script>" not in html and "&lt;script&gt;" in html
+    assert "Hà Nội &amp; &#x27;HCM&#x27;" in html
+    assert "href='#'" in html
@@ -0,0 +1,66 @@
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from utils.liveness import LivenessChecker
+
+
+class Handler(BaseHTTPRequestHandler):
+    hits = Counter()
+
+    def _respond(self, with_body):
+        Handler.hits[(self.command, self.path)] += 1
+        if self.path == "/slow":
+            time.sleep(1.5)
+        if self.path == "/no-head" and self.command == "HEAD":
+            status = 405
+        elif self.path == "/gone":
+            status = 404
+        else:
+            status = 200
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        if with_body:
+            self.wfile.write(b"ok")
+
+    def do_HEAD(self):
+        self._respond(with_body=False)
+
+    def do_GET(self):
+        self._respond(with_body=True)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    Handler.hits.clear()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_head_first_with_get_fallback(base_url):
+    checker = LivenessChecker(request_timeout=1)
+    statuses = [checker.status(f"{base_url}/{path}") for path in ("ok", "gone", "no-head")]
+
+    assert statuses == [200, 404, 200]
+    assert Handler.hits[("GET", "/ok")] == 0
+    assert Handler.hits[("GET", "/no-head")] == 1
+
+
+def test_request_timeout(base_url):
+    checker = LivenessChecker(request_timeout=0.2)
+    start = time.perf_counter()
+    with pytest.raises(requests.Timeout):
+        checker.status(f"{base_url}/slow")
+    assert time.perf_counter() - start < 1.2
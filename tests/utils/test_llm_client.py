@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.llm_client import LLMClient, LLMClientError
+
+
+class MockAPI(BaseHTTPRequestHandler):
+    """Endpoint giả lập: trả lần lượt các status trong `script`, sau đó 200"""
+    script = deque()
+    delay = 0.0
+    requests = 0
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        with MockAPI.lock:
+            MockAPI.requests += 1
+            MockAPI.in_flight += 1
+            MockAPI.max_in_flight = max(MockAPI.max_in_flight, MockAPI.in_flight)
+            status, headers = MockAPI.script.popleft() if MockAPI.script else (200, {})
+        time.sleep(MockAPI.delay)
+        body = json.dumps({"ok": status == 200}).encode("utf-8")
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with MockAPI.lock:
+            MockAPI.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def url():
+    MockAPI.script.clear()
+    MockAPI.delay = 0.0
+    MockAPI.requests = MockAPI.in_flight = MockAPI.max_in_flight = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1/messages"
+    server.shutdown()
+    server.server_close()
+
+
+def test_retries_429_and_5xx_then_succeeds(url):
+    MockAPI.script.extend([(429, {"Retry-After": "0"}), (503, {})])
+    client = LLMClient(max_retries=3, backoff_base=0.01)
+
+    assert client.post_json(url, {"q": 1}) == {"ok": True}
+    metrics = client.metrics()
+    assert MockAPI.requests == 3
+    assert (metrics["calls"], metrics["requests"], metrics["retries"], metrics["failures"]) == (1, 3, 2, 0)
+    assert metrics["latency_p50_ms"] is not None
+
+
+def test_gives_up_after_max_retries_and_on_client_errors(url):
+    MockAPI.script.extend([(500, {})] * 5)
+    client = LLMClient(max_retries=2, backoff_base=0.01)
+    with pytest.raises(LLMClientError):
+        client.post_json(url, {})
+    assert MockAPI.requests == 3
+
+    MockAPI.script.clear()
+    MockAPI.script.append((400, {}))
+    with pytest.raises(LLMClientError):
+        client.post_json(url, {})
+    assert MockAPI.requests == 4  # 4xx khác 429 không thử lại
+    assert client.metrics()["failures"] == 2
+
+
+def test_retry_after_beyond_deadline_fails_fast(url):
+    MockAPI.script.append((429, {"Retry-After": "30"}))
+    client = LLMClient(max_retries=3)
+    start_time = time.monotonic()
+    with pytest.raises(LLMClientError):
+        client.post_json(url, {}, deadline=2)
+    assert time.monotonic() - start_time < 1
+
+
+def test_concurrency_is_bounded(url):
+    MockAPI.delay = 0.2
+    client = LLMClient(max_concurrency=2)
+    threads = [threading.Thread(target=client.post_json, args=(url, {})) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    metrics = client.metrics()
+    assert MockAPI.max_in_flight == 2
+    assert metrics["calls"] == 6 and metrics["in_flight"] == 0
+    assert metrics["queue_wait_p95_ms"] >= 300
+
+
+def test_queue_wait_respects_deadline(url):
+    MockAPI.delay = 0.5
+    client = LLMClient(max_concurrency=1)
+    busy = threading.Thread(target=client.post_json, args=(url, {}))
+    busy.start()
+    time.sleep(0.1)
+    with pytest.raises(LLMClientError):
+        client.post_json(url, {}, deadline=0.1)
+    busy.join()
@@ -0,0 +1,62 @@
+import pickle
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from utils.market_snapshot import MarketSnapshot
+
+
+@pytest.fixture
+def listings():
+    return pd.DataFrame({
+        "brand": ["Honda", "Honda", "Yamaha", "Honda", None, "Yamaha"],
+        "model_normalized": ["Vision", "Vision", "Exciter", "Lead", "Wave", "Exciter"],
+        "price_numeric": [30e6, 32e6, 40e6, 38e6, 15e6, None],
+        "reg_year_numeric": [2019, 2021, 2020, 2018, 2015, 2020],
+    })
+
+
+def test_kpis_brand_and_detailed_tables(listings):
+    snapshot = MarketSnapshot(listings)
+
+    assert snapshot.total_count == 5
+    assert snapshot.avg_price == pytest.approx(35.0)
+    assert snapshot.model_count == 3
+
+    brands = snapshot.brands.set_index("Thương hiệu")
+    assert list(brands.index) == ["Honda", "Yamaha"]
+    assert brands.loc["Honda", "Số lượng giao dịch"] == 3
+    assert brands.loc["Honda", "Giá trung bình (triệu VND)"] == pytest.approx(33.3)
+    assert brands.loc["Yamaha", "Giá trung bình (triệu VND)"] == pytest.approx(40.0)
+
+    vision = snapshot.detailed.set_index("Mẫu xe").loc["Vision"]
+    assert vision["Số tin đăng"] == 2
+    assert vision["Giá thấp nhất (triệu)"] == 30.0
+    assert vision["Năm đăng ký"] == "2019-2021"
+
+
+def test_sources_agree(listings):
+    conn = sqlite3.connect(":memory:")
+    listings.to_sql("motorbikes", conn, index=False)
+    from_sql = MarketSnapshot.from_connection(conn)
+    from_frame = MarketSnapshot(listings)
+
+    pd.testing.assert_frame_equal(from_sql.brands, from_frame.brands)
+    pd.testing.assert_frame_equal(from_sql.detailed, from_frame.detailed)
+    assert from_sql.avg_price == from_frame.avg_price
+
+
+def test_empty_market():
+    snapshot = MarketSnapshot()
+    assert snapshot.total_count == 0
+    assert snapshot.avg_price is None
+    assert snapshot.brands.empty and snapshot.detailed.empty
+
+
+def test_snapshot_survives_disk_cache_round_trip(listings):
+    # Snapshot được lưu trong cache trên đĩa (pickle) để các tiến trình khác dùng lại
+    snapshot = pickle.loads(pickle.dumps(MarketSnapshot(listings)))
+    assert snapshot.total_count == 5 and snapshot.avg_price == pytest.approx(35.0)
+    pd.testing.assert_frame_equal(snapshot.brands, MarketSnapshot(listings).brands)
+    pd.testing.assert_frame_equal(snapshot.detailed, MarketSnapshot(listings).detailed)
@@ -0,0 +1,59 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.price_histogram import (
+    ALL_MODELS, N_BINS, PriceHistogramIndex, build_price_histograms, store_price_histograms,
+)
+from utils.visualization import create_price_distribution
+
+
+@pytest.fixture
+def listings():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "brand": ["Honda"] * 300 + ["Yamaha"] * 100 + [None],
+        "model_normalized": ["Vision"] * 200 + ["SH"] * 100 + ["Exciter"] * 60 + [None] * 40 + ["Vision"],
+        "price_numeric": np.concatenate([
+            rng.uniform(20e6, 40e6, 200), rng.uniform(60e6, 120e6, 100), rng.uniform(30e6, 50e6, 100), [1e6],
+        ]),
+    })
+
+
+def test_histograms_match_numpy(listings):
+    edges, histograms = build_price_histograms(listings)
+    assert len(edges) == N_BINS + 1 and edges[0] == 0
+
+    rows = histograms.set_index(["brand", "model"])
+    vision = np.frombuffer(rows.loc[("Honda", "Vision"), "counts"], dtype=np.uint32)
+    prices = listings.loc[listings["brand"].eq("Honda") & listings["model_normalized"].eq("Vision"), "price_numeric"]
+    expected, _ = np.histogram(np.minimum(prices / 1e6, edges[-1]), bins=edges)
+    assert vision.tolist() == expected.tolist()
+
+    # Dòng gộp thương hiệu gồm cả tin không rõ mẫu xe; tin không rõ thương hiệu bị bỏ
+    assert rows.loc[("Honda", ALL_MODELS), "listing_count"] == 300
+    assert rows.loc[("Yamaha", ALL_MODELS), "listing_count"] == 100
+    assert histograms["listing_count"].sum() == 300 + 100 + 300 + 60
+
+
+def test_store_and_read_distribution(listings):
+    conn = sqlite3.connect(":memory:")
+    assert store_price_histograms(conn, listings) == 5
+    index = PriceHistogramIndex.from_connection(conn)
+
+    assert index.brands() == ["Honda", "Yamaha"]
+    by_brand = index.distribution()
+    assert list(by_brand) == ["Honda", "Yamaha"]
+    assert by_brand["Honda"].sum() == 300
+    assert list(index.distribution("Honda")) == ["Vision", "SH"]
+    assert list(index.distribution("Honda", limit=1)) == ["Vision"]
+    assert index.distribution("Suzuki") == {}
+
+
+def test_missing_table_and_empty_chart():
+    index = PriceHistogramIndex.from_connection(sqlite3.connect(":memory:"))
+    assert len(index) == 0 and index.brands() == []
+    fig = create_price_distribution(index.edges, index.distribution())
+    assert fig.axes[0].get_title() == "Phân phối giá theo thương hiệu"
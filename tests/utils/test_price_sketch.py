@@ -0,0 +1,50 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.price_sketch import ALL, PriceSketchIndex, build_price_sketches, km_bucket, price_bin, store_price_sketches
+
+
+@pytest.fixture
+def listings():
+    prices = np.linspace(20_000_000, 40_000_000, 101)
+    return pd.DataFrame({
+        "brand": "Honda",
+        "model_normalized": "Vision",
+        "reg_year_numeric": [2020] * 100 + [2021],
+        "mileage_numeric": [15_000] * 100 + [3_000],
+        "price_numeric": prices,
+    })
+
+
+def test_buckets():
+    assert km_bucket([0, 4_999, 5_000, 15_000, 49_999, 200_000]).tolist() == [0, 0, 1, 2, 4, 5]
+    assert price_bin([0, 1_000_000, 2e9]).tolist() == [0, 0, 127]
+
+
+def test_build_levels(listings):
+    sketches = build_price_sketches(listings)
+    keys = set(zip(sketches["reg_year"], sketches["km_bucket"]))
+    assert keys == {(2020, 2), (2021, 0), (2020, ALL), (2021, ALL), (ALL, ALL)}
+    assert sketches.set_index(["reg_year", "km_bucket"]).loc[(ALL, ALL), "listing_count"] == 101
+
+
+def test_percentile_lookup_roundtrip(listings):
+    conn = sqlite3.connect(":memory:")
+    store_price_sketches(conn, listings)
+    index = PriceSketchIndex.from_connection(conn)
+
+    low = index.percentile("Honda", "Vision", 2020, 12_000, 21_000_000)
+    high = index.percentile("Honda", "Vision", 2020, 12_000, 39_000_000)
+    assert low["percentile"] < 10 < 90 < high["percentile"]
+    assert (low["reg_year"], low["km_label"], low["listing_count"]) == (2020, "10-20k km", 100)
+
+    # Nhóm quá ít tin đăng thì dùng phân phối của cả mẫu xe
+    sparse = index.percentile("Honda", "Vision", 2021, 3_000, 30_000_000)
+    assert (sparse["reg_year"], sparse["km_label"], sparse["listing_count"]) == (None, None, 101)
+    assert 40 <= sparse["percentile"] <= 60
+
+    assert index.percentile("Yamaha", "Exciter", 2020, 12_000, 30_000_000) is None
+    assert len(PriceSketchIndex.from_connection(sqlite3.connect(":memory:"))) == 0
@@ -0,0 +1,89 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from utils.price_trend import ALL_MODELS, load_price_trends, rollup_trends, trend_series, update_price_trends
+from utils.visualization import create_price_trend
+
+
+def make_batch(rows):
+    return pd.DataFrame(rows, columns=["url_full", "post_date", "brand", "model_normalized", "price_numeric"])
+
+
+@pytest.fixture
+def first_batch():
+    return make_batch([
+        ("u1", "2025-01-06", "Honda", "Vision", 30_000_000),
+        ("u2", "2025-01-20", "Honda", "Vision", 34_000_000),
+        ("u3", "2025-01-21", "Honda", "SH", 80_000_000),
+        ("u4", "2025-02-03", "Honda", "Vision", 32_000_000),
+        ("u5", "2025-02-10", "Yamaha", "Exciter", 40_000_000),
+        ("u6", "2025-02-11", "Yamaha", None, 42_000_000),
+    ])
+
+
+def trends_table(conn):
+    return pd.read_sql_query("SELECT * FROM price_trends ORDER BY granularity, period_start, brand, model", conn)
+
+
+def test_rollup_medians():
+    observations = pd.DataFrame({
+        "post_date": ["2025-01-06", "2025-01-20", "2025-01-21"],
+        "brand": "Honda",
+        "model": ["Vision", "Vision", "SH"],
+        "price": [30_000_000, 34_000_000, 80_000_000],
+    })
+    trends = rollup_trends(observations, "month").set_index(["brand", "model"])
+    assert trends.loc[("Honda", "Vision"), "price_median"] == 32.0
+    assert trends.loc[("Honda", ALL_MODELS), "price_median"] == 34.0
+    assert trends.loc[("Honda", ALL_MODELS), "price_mean"] == 48.0
+    assert set(rollup_trends(observations, "week")["period_start"]) == {"2025-01-06", "2025-01-20"}
+
+
+def test_incremental_update_matches_full_rebuild(first_batch):
+    conn = sqlite3.connect(":memory:")
+    stats = update_price_trends(conn, first_batch)
+    assert stats["new_listings"] == 6
+
+    # Đợt sau: u1 đã bị gỡ, u2 đổi giá, ngày đăng của u4 xê dịch, thêm u7
+    second_batch = make_batch([
+        ("u2", "2025-01-20", "Honda", "Vision", 33_000_000),
+        ("u3", "2025-01-21", "Honda", "SH", 80_000_000),
+        ("u4", "2025-02-04", "Honda", "Vision", 32_000_000),
+        ("u7", "2025-03-03", "Honda", "Vision", 31_000_000),
+    ])
+    stats = update_price_trends(conn, second_batch)
+    assert stats == {"new_listings": 1, "changed_listings": 1, "updated_groups": 4}
+
+    expected = sqlite3.connect(":memory:")
+    update_price_trends(expected, make_batch([
+        ("u1", "2025-01-06", "Honda", "Vision", 30_000_000),
+        ("u2", "2025-01-20", "Honda", "Vision", 33_000_000),
+        ("u3", "2025-01-21", "Honda", "SH", 80_000_000),
+        ("u4", "2025-02-03", "Honda", "Vision", 32_000_000),
+        ("u5", "2025-02-10", "Yamaha", "Exciter", 40_000_000),
+        ("u6", "2025-02-11", "Yamaha", None, 42_000_000),
+        ("u7", "2025-03-03", "Honda", "Vision", 31_000_000),
+    ]))
+    pd.testing.assert_frame_equal(trends_table(conn), trends_table(expected))
+
+    assert update_price_trends(conn, second_batch)["updated_groups"] == 0
+
+
+def test_load_and_chart(first_batch):
+    conn = sqlite3.connect(":memory:")
+    update_price_trends(conn, first_batch)
+
+    monthly = load_price_trends(conn, "month")
+    series = trend_series(monthly)
+    assert list(series.columns) == ["Honda", "Yamaha"]
+    assert series.loc[pd.Timestamp("2025-01-01"), "Honda"] == 34.0
+
+    models = trend_series(load_price_trends(conn, "month", brand="Honda"))
+    assert list(models.columns) == ["Vision", "SH"]
+    assert len(load_price_trends(conn, "week", periods=2)["period_start"].unique()) == 2
+
+    fig = create_price_trend(series)
+    assert [tick.get_text() for tick in fig.axes[0].get_xticklabels()] == ["T1/25", "T2/25"]
+    assert load_price_trends(sqlite3.connect(":memory:")).empty
@@ -0,0 +1,98 @@
+from utils import result_cache
+from utils.result_cache import ResultCache, disk_cached, make_cache_key
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def cache(tmp_path) -> ResultCache:
+    return ResultCache(str(tmp_path), max_bytes=10_000)
+
+
+def test_get_set_roundtrip_and_stats(cache):
+    df = pd.DataFrame({"brand": ["Honda", "Yamaha"], "count": [3, 2]})
+    assert cache.get("missing") == (False, None)
+
+    cache.set("market", df)
+    found, value = cache.get("market")
+
+    assert found
+    pd.testing.assert_frame_equal(value, df)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_shared_between_instances(tmp_path):
+    writer = ResultCache(str(tmp_path))
+    reader = ResultCache(str(tmp_path))
+
+    writer.set("key", [1, 2, 3])
+
+    assert reader.get("key") == (True, [1, 2, 3])
+    reader.flush()
+    assert writer.stats()["hits"] == 1
+
+
+def test_hit_does_not_write_until_flush(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.set("key", "value")
+    conn = cache._connect()
+    changes = conn.total_changes
+
+    for _ in range(5):
+        assert cache.get("key") == (True, "value")
+    cache.get("missing")
+    assert conn.total_changes == changes
+
+    cache.flush()
+    counters = dict(conn.execute("SELECT name, count FROM stats").fetchall())
+    assert (counters["hits"], counters["misses"]) == (5, 1)
+
+
+def test_size_tracked_incrementally(cache):
+    cache.set("a", "x" * 1_000)
+    cache.set("b", "y" * 2_000)
+    cache.set("a", "z" * 500)  # ghi đè: chỉ tính kích thước mới
+    cache.delete("b")
+
+    size = cache._connect().execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+    assert cache.stats()["size_bytes"] == size
+
+    cache.clear()
+    assert cache.stats()["size_bytes"] == 0
+
+
+def test_lru_eviction(cache):
+    payload = "x" * 4_000
+    cache.set("a", payload)
+    cache.set("b", payload)
+    cache.get("a")  # "a" vừa được dùng, "b" là mục cũ nhất
+    cache.set("c", payload)
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a")[0] and cache.get("c")[0]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_key_depends_on_data_version():
+    assert make_cache_key("q", "v1", (1,), {}) != make_cache_key("q", "v2", (1,), {})
+    assert make_cache_key("q", "v1", (1,), {"a": 1}) == make_cache_key("q", "v1", (1,), {"a": 1})
+
+
+def test_disk_cached(cache, monkeypatch):
+    monkeypatch.setattr(result_cache, "_cache", cache)
+    calls = []
+
+    @disk_cached("square", should_cache=lambda value: value >= 0)
+    def square(data_version, x):
+        calls.append((data_version, x))
+        return x * x if x >= 0 else -1
+
+    assert square("v1", 3) == 9
+    assert square("v1", 3) == 9
+    assert square("v2", 3) == 9
+    assert square("v1", -2) == -1
+    assert square("v1", -2) == -1
+
+    assert calls == [("v1", 3), ("v2", 3), ("v1", -2), ("v1", -2)]
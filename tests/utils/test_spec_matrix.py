@@ -0,0 +1,85 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from utils.spec_matrix import (
+    MAX_COMPARE_BIKES, advantages_matrix, fetch_bike_specs, ownership_costs, radar_matrix, score_matrix
+)
+
+SPECS = [
+    # brand, model, variant, engine_cc, price_new, avg_price_used, fuel_consumption, horsepower, torque,
+    # weight, fuel_capacity, year_start, year_end, segment, transmission
+    ("Honda", "Vision", "Tiêu chuẩn", 110, 31, 25, 1.8, 8.8, 9.2, 97, 4.9, 2014, 2024, "Xe tay ga", "Tự động"),
+    ("Honda", "Vision", "Cao cấp", 110, 33, 27, 1.8, 8.8, 9.2, 99, 4.9, 2016, 2024, "Xe tay ga", "Tự động"),
+    ("Yamaha", "Exciter", "GP", 155, 50, 40, 2.2, 17.7, 14.4, 121, 5.4, 2021, 2024, "Xe côn tay", "Côn tay"),
+    ("Honda", "Wave Alpha", "Tiêu chuẩn", 110, 18, 14, 1.7, 8.2, 8.4, 97, 3.7, 2017, 2024, "Xe số", "Số"),
+]
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""
+        CREATE TABLE motorbikes (
+            brand TEXT, model TEXT, variant TEXT, engine_cc REAL, price_new REAL, avg_price_used REAL,
+            fuel_consumption REAL, horsepower REAL, torque REAL, weight REAL, fuel_capacity REAL,
+            year_start INTEGER, year_end INTEGER, segment TEXT, transmission TEXT
+        )
+    """)
+    conn.executemany(f"INSERT INTO motorbikes VALUES ({', '.join(['?'] * 15)})", SPECS)
+    return conn
+
+
+def test_fetch_uses_one_query_and_keeps_order(conn):
+    statements = []
+    conn.set_trace_callback(statements.append)
+    specs = fetch_bike_specs(conn, [("Yamaha", "Exciter"), ("Suzuki", "Raider"), ("Honda", "Vision")])
+
+    assert len(statements) == 1
+    assert list(specs.index) == ["Yamaha Exciter", "Honda Vision"]
+    assert specs.loc["Honda Vision", "adjusted_price"] == pytest.approx(26)
+    assert specs.loc["Honda Vision", "year_start"] == 2014
+
+
+def test_fetch_caps_selection(conn):
+    bikes = [("Honda", "Vision")] * 3 + [(f"Brand {i}", "Model") for i in range(2 * MAX_COMPARE_BIKES)]
+    statements = []
+    conn.set_trace_callback(statements.append)
+    fetch_bike_specs(conn, bikes)
+    assert statements[0].count("'Model'") == MAX_COMPARE_BIKES - 1
+
+
+def test_scores_match_pairwise_formula(conn):
+    specs = fetch_bike_specs(conn, [("Honda", "Vision"), ("Yamaha", "Exciter")])
+    scores = score_matrix(specs)
+    vision, exciter = specs.loc["Honda Vision"], specs.loc["Yamaha Exciter"]
+
+    performance = vision["horsepower"] / exciter["horsepower"] * 15 + vision["torque"] / exciter["torque"] * 15 + 10
+    cost = 15 + vision["fuel_consumption"] / vision["fuel_consumption"] * 15
+    convenience = 25 + vision["fuel_capacity"] / exciter["fuel_capacity"] * 5
+    assert scores.loc["Honda Vision", "performance"] == pytest.approx(performance)
+    assert scores.loc["Honda Vision", "cost"] == pytest.approx(cost)
+    assert scores.loc["Honda Vision", "total"] == pytest.approx(performance + cost + convenience)
+    assert (scores["total"] <= 100).all()
+
+
+def test_ownership_costs(conn):
+    specs = fetch_bike_specs(conn, [("Honda", "Wave Alpha"), ("Yamaha", "Exciter")])
+    costs = ownership_costs(specs)
+    wave = costs.loc["Honda Wave Alpha"]
+    assert wave["fuel_per_year"] == pytest.approx(1.7 / 100 * 10_000 * 25_000 / 1e6)
+    assert wave["maintenance_per_year"] == pytest.approx(14 * 0.05)
+    assert wave["total_3yr"] == pytest.approx(14 + (wave["fuel_per_year"] + wave["maintenance_per_year"]) * 3)
+
+
+def test_radar_and_advantages(conn):
+    specs = fetch_bike_specs(conn, [("Honda", "Vision"), ("Yamaha", "Exciter"), ("Honda", "Wave Alpha")])
+    radar = radar_matrix(specs)
+    assert radar.shape == (3, 6)
+    assert np.all((radar >= 0) & (radar <= 1))
+
+    flags = advantages_matrix(specs)
+    assert flags.loc["Yamaha Exciter", "horsepower"]
+    assert flags.loc["Honda Wave Alpha", "adjusted_price"]
+    assert not flags.loc["Yamaha Exciter", "adjusted_price"]
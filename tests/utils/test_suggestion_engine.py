@@ -0,0 +1,82 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.suggestion_engine import SuggestionEngine
+
+SEGMENTS = ["Xe số", "Xe tay ga", "Xe côn tay"]
+BRANDS = ["Honda", "Yamaha", "Suzuki", "Piaggio"]
+
+
+@pytest.fixture
+def conn():
+    rng = np.random.default_rng(7)
+    n = 2_000
+    specs = pd.DataFrame({
+        "brand": rng.choice(BRANDS, n),
+        "model": [f"Model {i % 97}" for i in range(n)],
+        "variant": [f"Bản {i}" for i in range(n)],
+        "engine_cc": rng.choice([110, 125, 150, 155, 175], n),
+        "price_new": rng.integers(15, 120, n).astype(float),
+        "avg_price_used": rng.integers(10, 100, n).astype(float),
+        "segment": rng.choice(SEGMENTS, n),
+        "abs": rng.integers(0, 2, n),
+        "transmission": "Tự động",
+        "fuel_consumption": rng.integers(15, 30, n) / 10,
+        "brake_front": rng.choice(["Đĩa", "Cơ"], n),
+        "horsepower": rng.integers(6, 20, n).astype(float),
+        "torque": rng.integers(6, 16, n).astype(float),
+        "weight": rng.integers(90, 140, n).astype(float),
+        "fuel_capacity": rng.integers(35, 60, n) / 10,
+    })
+    conn = sqlite3.connect(":memory:")
+    specs.to_sql("motorbikes", conn, index=False)
+    return conn
+
+
+def sql_suggestions(conn, budget, segment, engine, brands, features, order):
+    """Truy vấn tham chiếu giống cách trang gợi ý từng dựng SQL động"""
+    conditions, params = ["avg_price_used <= ?"], [budget]
+    if segment != "Tất cả":
+        conditions.append("segment = ?")
+        params.append(segment)
+    if engine == "125-150cc":
+        conditions.append("engine_cc >= 125 AND engine_cc <= 150")
+    if brands:
+        conditions.append(f"brand IN ({', '.join('?' * len(brands))})")
+        params.extend(brands)
+    if "ABS" in features:
+        conditions.append("abs = 1")
+    if "Mạnh mẽ" in features:
+        conditions.append("horsepower > 10")
+    query = f"SELECT variant FROM motorbikes WHERE {' AND '.join(conditions)} ORDER BY {order}, rowid LIMIT 10"
+    return [row[0] for row in conn.execute(query, params)]
+
+
+@pytest.mark.parametrize("purpose, order", [
+    ("Đi lại hàng ngày", "fuel_consumption, avg_price_used"),
+    ("Đi phố", "weight, avg_price_used"),
+    ("Đi xa", "fuel_capacity DESC, avg_price_used"),
+    ("Thể thao", "horsepower DESC, torque DESC"),
+])
+def test_matches_sql_ordering(conn, purpose, order):
+    engine = SuggestionEngine.from_connection(conn)
+    for segment, engine_size, brands, features in [
+        ("Tất cả", "Tất cả", [], []),
+        ("Xe tay ga", "125-150cc", ["Honda", "Yamaha"], ["ABS"]),
+        ("Xe côn tay", "Tất cả", ["Piaggio"], ["Mạnh mẽ", "ABS"]),
+    ]:
+        result = engine.suggest(60, segment, engine_size, purpose, brands, features)
+        expected = sql_suggestions(conn, 60, segment, engine_size, brands, features, order)
+        assert result["variant"].tolist() == expected
+
+
+def test_unknown_values_and_empty_engine(conn):
+    engine = SuggestionEngine.from_connection(conn)
+    assert engine.suggest(60, brands=["Không có"]).empty
+    assert engine.suggest(5).empty
+    assert len(engine.suggest(100, features=["Cốp rộng"])) == 10
+    assert (engine.suggest(100, features=["Cốp rộng"])["segment"] == "Xe tay ga").all()
+    assert SuggestionEngine().suggest(100).empty
@@ -0,0 +1,89 @@
+import sqlite3
+
+import pytest
+
+from utils.text_search import (
+    build_match_query, build_search_index, fold_vietnamese, normalize_query, search_listing_ids
+)
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE motorbikes (title TEXT, description TEXT)")
+    conn.executemany("INSERT INTO motorbikes (title, description) VALUES (?, ?)", [
+        ("Honda Air Blade 2019", "Cần bán xe chính chủ, biển số đẹp"),
+        ("Yamaha Exciter 2020", "Xe zin, máy êm, Đà Nẵng"),
+        ("Honda Vision 2021", None),
+        ("Bán gấp xe biển số đẹp", "Honda Lead"),
+    ])
+    yield conn
+    conn.close()
+
+
+def test_fold_vietnamese():
+    assert fold_vietnamese("Chính chủ, BIỂN SỐ ĐẸP") == "chinh chu, bien so dep"
+    assert fold_vietnamese("Đà Nẵng") == "da nang"
+    assert fold_vietnamese(None) == ""
+    assert fold_vietnamese(float("nan")) == ""
+
+
+def test_build_match_query():
+    assert normalize_query("  Air-Blade,  2019 ") == "air blade 2019"
+    assert build_match_query("Air Blade 2019") == '"air" "blade" "2019"*'
+    assert build_match_query('chính "chủ" OR') == '"chinh" "chu" "or"*'
+    assert build_match_query("  ,, ") is None
+
+
+def test_search_is_diacritic_insensitive(conn):
+    assert build_search_index(conn) == 4
+
+    accented = [rowid for rowid, _ in search_listing_ids(conn, "chính chủ")]
+    folded = [rowid for rowid, _ in search_listing_ids(conn, "chinh chu")]
+    assert accented == folded == [1]
+    assert [rowid for rowid, _ in search_listing_ids(conn, "da nang")] == [2]
+
+
+def test_search_prefix_and_title_first(conn):
+    build_search_index(conn)
+
+    assert search_listing_ids(conn, "air bla") == [(1, 0)]
+    # Khớp ở tiêu đề được xếp trên khớp ở mô tả
+    assert search_listing_ids(conn, "biển số đẹp") == [(4, 0), (1, 1)]
+    assert search_listing_ids(conn, "honda") == [(3, 0), (1, 0), (4, 1)]
+    assert search_listing_ids(conn, "honda", limit=2) == [(3, 0), (1, 0)]
+    assert search_listing_ids(conn, "") == []
+
+
+def test_title_matches_rank_above_newer_description_matches():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE motorbikes (title TEXT, description TEXT, post_date TEXT)")
+    # Thứ tự thêm vào (rowid) không phải thứ tự ngày đăng
+    conn.executemany("INSERT INTO motorbikes VALUES (?, ?, ?)", [
+        ("Honda Vision", None, "2025-03-01"),
+        ("Honda Lead", None, "2024-01-01"),
+        ("Xe tay ga", "Honda SH", "2025-05-01"),
+        ("Honda Wave", None, "2025-04-01"),
+        ("Honda Future", None, None),
+    ])
+    # Rất nhiều bài mới hơn chỉ nhắc tới từ khóa trong mô tả
+    conn.executemany("INSERT INTO motorbikes VALUES (?, ?, ?)", [
+        (f"Xe số {n}", "Máy Honda zin", f"2025-06-{n % 28 + 1:02d}") for n in range(500)
+    ])
+    build_search_index(conn)
+
+    # Bài khớp tiêu đề cũ vẫn đứng trước, mới đăng trước
+    assert search_listing_ids(conn, "honda", limit=3) == [(4, 0), (1, 0), (2, 0)]
+    top = search_listing_ids(conn, "honda", limit=6)
+    assert top[:4] == [(4, 0), (1, 0), (2, 0), (5, 0)]
+    assert [tier for _, tier in top[4:]] == [1, 1]
+    assert all(rowid > 5 for rowid, _ in top[4:])
+
+    # Bài chỉ khớp mô tả xếp theo ngày đăng, mới nhất trước
+    dates = dict(conn.execute("SELECT rowid, post_date FROM motorbikes").fetchall())
+    description_only = [rowid for rowid, tier in search_listing_ids(conn, "máy zin", limit=50)]
+    assert len(description_only) == 50
+    assert [dates[rowid] for rowid in description_only] == sorted(
+        (dates[rowid] for rowid in description_only), reverse=True
+    )
+    conn.close()
@@ -0,0 +1,125 @@
+# utils/analysis_cache.py
+import base64
+import binascii
+import hashlib
+import logging
+import re
+import threading
+import time
+import unicodedata
+from config import ANALYSIS_CACHE_TTL
+from utils.result_cache import get_result_cache
+
+# Thiết lập logging
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """Backend lưu trong bộ nhớ của tiến trình (dùng khi tắt cache trên đĩa và trong test)"""
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                return True, self._entries[key]
+        return False, None
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class AnalysisCache:
+    """
+    Cache kết quả phân tích ảnh/mô tả theo SHA-256 của nội dung, có thời hạn (TTL)
+
+    Backend là bất kỳ đối tượng nào có get(key) -> (found, value), set(key, value) và delete(key),
+    ví dụ ResultCache (trên đĩa, dùng chung giữa các tiến trình) hoặc MemoryBackend.
+    """
+    def __init__(self, backend=None, ttl=ANALYSIS_CACHE_TTL):
+        """
+        Args:
+            backend: Nơi lưu kết quả (mặc định MemoryBackend)
+            ttl (int): Thời gian giữ một kết quả (giây)
+        """
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+
+    def get(self, key):
+        """
+        Đọc kết quả đã phân tích
+
+        Returns:
+            dict hoặc None nếu chưa có hoặc đã hết hạn
+        """
+        try:
+            found, entry = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Lỗi khi đọc cache phân tích: {str(e)}")
+            return None
+        if not found:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.time():
+            self.backend.delete(key)
+            return None
+        return value
+
+    def set(self, key, value):
+        """Lưu kết quả phân tích kèm thời điểm hết hạn"""
+        try:
+            self.backend.set(key, (time.time() + self.ttl, value))
+        except Exception as e:
+            logger.warning(f"Lỗi khi ghi cache phân tích: {str(e)}")
+
+
+def image_cache_key(img_str):
+    """Khóa cache của một ảnh: SHA-256 của các byte ảnh (giải mã từ base64)"""
+    try:
+        data = base64.b64decode(img_str, validate=True)
+    except (binascii.Error, ValueError):
+        data = img_str.encode("utf-8")
+    return f"analysis:image:{hashlib.sha256(data).hexdigest()}"
+
+
+def normalize_description(text):
+    """Chuẩn hóa mô tả trước khi băm: Unicode NFC, không phân biệt hoa thường, gộp khoảng trắng"""
+    text = unicodedata.normalize("NFC", text or "")
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+def description_cache_key(text):
+    """Khóa cache của một mô tả: SHA-256 của mô tả đã chuẩn hóa"""
+    digest = hashlib.sha256(normalize_description(text).encode("utf-8")).hexdigest()
+    return f"analysis:description:{digest}"
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_analysis_cache():
+    """
+    Cache phân tích dùng chung: lưu cùng file với cache kết quả trên đĩa (RESULT_CACHE_DIR),
+    hoặc trong bộ nhớ nếu cache trên đĩa bị tắt
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AnalysisCache(get_result_cache())
+    return _cache
+
+
+def set_analysis_cache(cache):
+    """Thay cache phân tích dùng chung (ví dụ dùng backend khác hoặc trong test)"""
+    global _cache
+    with _cache_lock:
+        _cache = cache
@@ -0,0 +1,116 @@
+# utils/catalogue.py
+import logging
+
+# Thiết lập logging
+logger = logging.getLogger(__name__)
+
+# Một truy vấn duy nhất lấy toàn bộ ánh xạ thương hiệu -> mẫu xe kèm khoảng năm và số km
+CATALOGUE_QUERY = """
+    SELECT
+        brand,
+        model_normalized,
+        MIN(reg_year_numeric) AS year_min,
+        MAX(reg_year_numeric) AS year_max,
+        MIN(mileage_numeric) AS km_min,
+        MAX(mileage_numeric) AS km_max,
+        COUNT(*) AS listing_count
+    FROM motorbikes
+    WHERE brand IS NOT NULL AND model_normalized IS NOT NULL
+    GROUP BY brand, model_normalized
+"""
+
+
+class BikeCatalogue:
+    """
+    Danh mục thương hiệu -> mẫu xe được giữ trong bộ nhớ, dùng cho mọi selectbox của ứng dụng
+    """
+    def __init__(self, rows=()):
+        """
+        Khởi tạo danh mục từ kết quả CATALOGUE_QUERY
+
+        Args:
+            rows: Các dòng (brand, model, year_min, year_max, km_min, km_max, listing_count)
+        """
+        self._models = {}
+        for brand, model, year_min, year_max, km_min, km_max, listing_count in rows:
+            self._models.setdefault(brand, {})[model] = {
+                "year_range": (_to_int(year_min), _to_int(year_max)),
+                "km_range": (_to_int(km_min), _to_int(km_max)),
+                "listing_count": listing_count,
+            }
+
+        # Sắp xếp sẵn để các selectbox không phải sắp xếp lại mỗi lần chạy lại trang
+        self._brands = sorted(self._models)
+        self._sorted_models = {brand: sorted(models) for brand, models in self._models.items()}
+
+    @classmethod
+    def from_connection(cls, conn):
+        """Tạo danh mục bằng một truy vấn trên kết nối database"""
+        rows = conn.execute(CATALOGUE_QUERY).fetchall()
+        logger.info(f"Đã tạo danh mục xe với {len(rows)} cặp thương hiệu/mẫu xe")
+        return cls(tuple(row) for row in rows)
+
+    def brands(self):
+        """Danh sách thương hiệu"""
+        return list(self._brands)
+
+    def models(self, brand):
+        """Danh sách mẫu xe của một thương hiệu (rỗng nếu không có)"""
+        return list(self._sorted_models.get(brand, []))
+
+    def model_info(self, brand, model):
+        """
+        Thông tin của một mẫu xe
+
+        Returns:
+            dict: year_range, km_range, listing_count hoặc None nếu không có mẫu xe này
+        """
+        return self._models.get(brand, {}).get(model)
+
+    def year_range(self, brand, model):
+        """Khoảng năm đăng ký (min, max) của mẫu xe trên thị trường"""
+        info = self.model_info(brand, model)
+        return info["year_range"] if info else (None, None)
+
+    def km_range(self, brand, model):
+        """Khoảng số km đã đi (min, max) của mẫu xe trên thị trường"""
+        info = self.model_info(brand, model)
+        return info["km_range"] if info else (None, None)
+
+    def market_range_label(self, brand, model):
+        """
+        Mô tả khoảng năm đăng ký và số km của mẫu xe trên thị trường (bỏ qua phần không có dữ liệu)
+
+        Returns:
+            str: Ví dụ "đời 2015 - 2020, 1,000 - 50,000 km (12 tin đăng)", None nếu không có mẫu xe này
+        """
+        info = self.model_info(brand, model)
+        if not info:
+            return None
+        parts = []
+        year_range = _format_range(info["year_range"])
+        if year_range:
+            parts.append(f"đời {year_range}")
+        km_range = _format_range(info["km_range"], "{:,}")
+        if km_range:
+            parts.append(f"{km_range} km")
+        label = ", ".join(parts) or "chưa có thông tin đời xe và số km"
+        return f"{label} ({info['listing_count']:,} tin đăng)"
+
+    def __len__(self):
+        return sum(len(models) for models in self._models.values())
+
+
+def _to_int(value):
+    """Chuyển giá trị số từ SQLite sang int, giữ nguyên None"""
+    return int(value) if value is not None else None
+
+
+def _format_range(value_range, value_format="{}"):
+    """Định dạng khoảng (min, max), một đầu hoặc None nếu thiếu dữ liệu"""
+    values = [value_format.format(value) for value in value_range if value is not None]
+    if not values:
+        return None
+    if len(values) == 1 or values[0] == values[1]:
+        return values[0]
+    return f"{values[0]} - {values[1]}"
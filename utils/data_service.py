@@ -3,10 +3,22 @@ import sqlite3
 import pandas as pd
 import logging
 import os
-import requests
 import json
 import re
-from config import DB_PATH
+from config import DB_PATH, DB_SERVING_MODE, CLAUDE_API_URL
+from utils.db_serving import get_memory_database, get_data_version, get_liveness_version
+from utils.result_cache import disk_cached
+from utils.catalogue import BikeCatalogue
+from utils.listing_cards import DESCRIPTION_MAX_LENGTH
+from utils.price_sketch import PriceSketchIndex
+from utils.price_histogram import PriceHistogramIndex
+from utils.price_trend import load_price_trends
+from utils.text_search import normalize_query, search_listing_ids
+from utils.market_snapshot import MarketSnapshot
+from utils.spec_matrix import fetch_bike_specs
+from utils.suggestion_engine import SuggestionEngine
+from utils.analysis_cache import get_analysis_cache, image_cache_key, description_cache_key
+from utils.llm_client import get_llm_client
 
 # Thiết lập logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -17,7 +29,6 @@ try:
     from dotenv import load_dotenv
     load_dotenv()
     CLAUDE_API_KEY = os.getenv("CLAUDE_API_KEY")
-    CLAUDE_API_URL = "https://api.anthropic.com/v1/messages"
 except Exception as e:
     logger.warning(f"Không thể tải biến môi trường: {str(e)}")
     CLAUDE_API_KEY = None
@@ -26,9 +37,20 @@ except Exception as e:
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Bài đăng tương tự: số bài tối đa, các cột hiển thị trên thẻ bài đăng và bước làm tròn giá dự đoán (VND)
+# để các giá dự đoán gần nhau dùng chung một mục cache
+SIMILAR_LISTINGS_LIMIT = 6
+SIMILAR_LISTING_COLUMNS = [
+    "title", "brand", "model", "reg_year", "condition", "location", "post_date", "days_since_posted",
+    "mileage", "engine_capacity", "origin", "price", "price_numeric", "price_millions", "url", "url_full",
+]
+SIMILAR_PRICE_STEP = 100_000
+
 def get_db_connection():
     """Kết nối đến database"""
     try:
+        if DB_SERVING_MODE == "memory":
+            return get_memory_database(DB_PATH).connect()
         conn = sqlite3.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         return conn
@@ -36,31 +58,60 @@ def get_db_connection():
         logger.error(f"Lỗi kết nối database: {str(e)}")
         raise Exception(f"Database connection error: {str(e)}")
 
-@st.cache_data(ttl=3600)  # Cache 1 giờ
+def current_data_version():
+    """Phiên bản dữ liệu hiện tại của database, dùng làm khóa cache"""
+    return get_data_version(DB_PATH)
+
+def current_liveness_version():
+    """Phiên bản trạng thái còn tồn tại của bài đăng, thay đổi mỗi khi liveness sweeper cập nhật is_alive"""
+    return get_liveness_version(DB_PATH)
+
 def get_similar_listings(predicted_price, brand=None, model=None, year=None, mileage=None, 
-                         condition=None, origin=None):
+                         condition=None, origin=None, limit=SIMILAR_LISTINGS_LIMIT):
     """
     Lấy danh sách bài đăng có giá gần với giá dự đoán từ database
     
     Args:
-        predicted_price: Giá dự đoán (VND)
+        predicted_price: Giá dự đoán (VND), được làm tròn theo SIMILAR_PRICE_STEP để dùng lại cache
         brand: Thương hiệu xe (tùy chọn)
         model: Mẫu xe (tùy chọn)
-        year: Năm sản xuất (tùy chọn)
-        mileage: Số km đã đi (tùy chọn)
-        condition: Tình trạng xe (tùy chọn)
-        origin: Xuất xứ (tùy chọn)
+        year: Năm sản xuất (tùy chọn, chưa dùng để lọc)
+        mileage: Số km đã đi (tùy chọn, chưa dùng để lọc)
+        condition: Tình trạng xe (tùy chọn, chưa dùng để lọc)
+        origin: Xuất xứ (tùy chọn, chưa dùng để lọc)
+        limit: Số bài đăng tối đa
         
     Returns:
-        DataFrame chứa thông tin các bài đăng tương tự
+        DataFrame chứa thông tin các bài đăng tương tự (chỉ các cột hiển thị trên thẻ bài đăng)
     """
     try:
-        conn = get_db_connection()
-        
+        price = int(round(predicted_price / SIMILAR_PRICE_STEP)) * SIMILAR_PRICE_STEP
+        return _load_similar_listings(current_data_version(), current_liveness_version(), price,
+                                      brand, model, limit)
+    except Exception as e:
+        # Không cache kết quả rỗng khi lỗi, lần gọi sau sẽ thử lại
+        logger.error(f"Lỗi khi lấy danh sách bài đăng tương tự: {str(e)}")
+        import traceback
+        logger.error(traceback.format_exc())
+        return pd.DataFrame()
+
+@st.cache_data(max_entries=256)  # Cache theo phiên bản dữ liệu, không hết hạn theo thời gian
+@disk_cached("similar_listings", should_cache=lambda df: not df.empty)
+def _load_similar_listings(data_version, liveness_version, predicted_price, brand, model, limit):
+    """Truy vấn bài đăng tương tự, được cache theo phiên bản dữ liệu và phiên bản trạng thái bài đăng"""
+    conn = get_db_connection()
+    try:
+        columns = [col[1] for col in conn.execute("PRAGMA table_info(motorbikes)").fetchall()]
+    
+        # Chỉ lấy các cột hiển thị trên thẻ bài đăng; mô tả được cắt sẵn (thẻ chỉ hiện DESCRIPTION_MAX_LENGTH ký tự)
+        selected = [col for col in SIMILAR_LISTING_COLUMNS if col in columns]
+        if "description" in columns:
+            selected.append(f"SUBSTR(description, 1, {DESCRIPTION_MAX_LENGTH + 1}) AS description")
+    
         # Xây dựng truy vấn SQL với điều kiện
-        query = """
+        query = f"""
         SELECT 
-            *,
+            {", ".join(selected)},
             ABS(price_numeric - ?) AS price_diff,
             ((price_numeric - ?) / ? * 100) AS price_diff_percent
         FROM 
@@ -68,97 +119,263 @@ def get_similar_listings(predicted_price, brand=None, model=None, year=None, mil
         WHERE 
             1=1
         """
-        
+    
         # Danh sách tham số cho truy vấn
         params = [predicted_price, predicted_price, predicted_price]
-        
+    
+        # Bỏ các bài đăng đã bị gỡ (do liveness sweeper đánh dấu)
+        if "is_alive" in columns:
+            query += " AND is_alive = 1"
+    
         # Thêm điều kiện lọc theo brand
         if brand:
             query += " AND LOWER(brand) LIKE LOWER(?)"
             params.append(f"%{brand}%")
-        
+    
         # Thêm điều kiện lọc theo model
         if model:
             query += " AND LOWER(model_normalized) LIKE LOWER(?)"
             params.append(f"%{model}%")
-        
+    
    
         # Sắp xếp theo khoảng cách giá và thời gian đăng (nếu có)
         query += " ORDER BY price_diff ASC"
-        if "post_date" in [col[0] for col in conn.execute("PRAGMA table_info(motorbikes)").fetchall()]:
+        if "post_date" in columns:
             query += ", post_date DESC"
-        elif "days_since_posted" in [col[0] for col in conn.execute("PRAGMA table_info(motorbikes)").fetchall()]:
+        elif "days_since_posted" in columns:
             query += ", days_since_posted ASC"
-        
+        query += " LIMIT ?"
+        params.append(limit)
+    
         # Thực thi truy vấn
         logger.info(f"Executing query: {query}")
         logger.info(f"With parameters: {params}")
-        
+    
         # Sử dụng pandas để đọc kết quả truy vấn
         similar_listings = pd.read_sql_query(query, conn, params=params)
-        
-        # Đóng kết nối
+    finally:
         conn.close()
+    
+    # Xử lý kết quả
+    if not similar_listings.empty:
+        # Định dạng phần trăm chênh lệch giá
+        similar_listings["price_diff_percent"] = similar_listings["price_diff_percent"].round(1)
         
-        # Xử lý kết quả
-        if not similar_listings.empty:
-            # Định dạng phần trăm chênh lệch giá
-            similar_listings["price_diff_percent"] = similar_listings["price_diff_percent"].round(1)
-            
-            # Định dạng ngày đăng nếu có
-            if "post_date" in similar_listings.columns:
-                # Chuyển sang datetime nếu là chuỗi
-                if similar_listings["post_date"].dtype == 'object':
-                    similar_listings["post_date"] = pd.to_datetime(
-                        similar_listings["post_date"], errors='coerce'
-                    )
-                # Định dạng ngày đăng thành chuỗi dễ đọc
-                similar_listings["post_date_display"] = similar_listings["post_date"].dt.strftime("%d/%m/%Y")
-            
-            # Tạo URL đầy đủ nếu chưa có
-            if "url" in similar_listings.columns and "url_full" not in similar_listings.columns:
-                similar_listings["url_full"] = similar_listings["url"].apply(
-                    lambda url: f"https://xe.chotot.com{url}" if url and not url.startswith(('http://', 'https://')) else url
+        # Định dạng ngày đăng nếu có
+        if "post_date" in similar_listings.columns:
+            # Chuyển sang datetime nếu là chuỗi
+            if similar_listings["post_date"].dtype == 'object':
+                similar_listings["post_date"] = pd.to_datetime(
+                    similar_listings["post_date"], errors='coerce'
                 )
+            # Định dạng ngày đăng thành chuỗi dễ đọc
+            similar_listings["post_date_display"] = similar_listings["post_date"].dt.strftime("%d/%m/%Y")
         
-        logger.info(f"Tìm thấy {len(similar_listings)} bài đăng tương tự")
-        return similar_listings
+        # Tạo URL đầy đủ nếu chưa có
+        if "url" in similar_listings.columns and "url_full" not in similar_listings.columns:
+            similar_listings["url_full"] = similar_listings["url"].apply(
+                lambda url: f"https://xe.chotot.com{url}" if url and not url.startswith(('http://', 'https://')) else url
+            )
     
+    logger.info(f"Tìm thấy {len(similar_listings)} bài đăng tương tự")
+    return similar_listings
+    
+def search_listings(query, limit=20):
+    """
+    Tìm kiếm toàn văn bài đăng theo tiêu đề và mô tả (không phân biệt dấu)
+
+    Args:
+        query: Câu tìm kiếm, ví dụ "chính chủ", "biển số đẹp", "Air Blade 2019"
+        limit: Số kết quả tối đa
+
+    Returns:
+        DataFrame các bài đăng khớp: khớp tiêu đề trước, khớp mô tả sau, mới đăng trước
+    """
+    normalized = normalize_query(query)
+    if not normalized:
+        return pd.DataFrame()
+    try:
+        return _search_listings(current_data_version(), normalized, limit)
     except Exception as e:
-        logger.error(f"Lỗi khi lấy danh sách bài đăng tương tự: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
+        # Không cache kết quả rỗng khi lỗi, lần gọi sau sẽ thử lại
+        logger.error(f"Lỗi khi tìm kiếm bài đăng: {str(e)}")
         return pd.DataFrame()
-    
-@st.cache_data(ttl=3600)  # Cache 1 giờ
-def get_brands():
-    """Lấy danh sách thương hiệu từ database"""
+
+@st.cache_data(max_entries=512)  # Cache theo phiên bản dữ liệu
+def _search_listings(data_version, normalized_query, limit):
+    """Tìm rowid qua bảng FTS5 rồi lấy các bài đăng tương ứng từ bảng motorbikes"""
+    conn = get_db_connection()
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT DISTINCT brand FROM motorbikes")
-        brands = [row[0] for row in cursor.fetchall()]
+        matches = search_listing_ids(conn, normalized_query, limit)
+        if not matches:
+            return pd.DataFrame()
+
+        placeholders = ", ".join("?" for _ in matches)
+        results = pd.read_sql_query(
+            f"SELECT rowid AS listing_rowid, * FROM motorbikes WHERE rowid IN ({placeholders})",
+            conn, params=[rowid for rowid, _ in matches]
+        )
+    finally:
         conn.close()
-        return brands
+
+    # Giữ thứ tự hạng (khớp tiêu đề trước), trong cùng hạng ưu tiên tin mới đăng
+    results["match_tier"] = results["listing_rowid"].map(dict(matches))
+    sort_columns = ["match_tier", "post_date"] if "post_date" in results.columns else ["match_tier"]
+    results = results.sort_values(
+        sort_columns, ascending=[True] + [False] * (len(sort_columns) - 1)
+    ).reset_index(drop=True)
+
+    if "url" in results.columns and "url_full" not in results.columns:
+        results["url_full"] = results["url"].apply(
+            lambda url: f"https://xe.chotot.com{url}" if url and not url.startswith(('http://', 'https://')) else url
+        )
+
+    logger.info(f"Tìm thấy {len(results)} bài đăng cho \"{normalized_query}\"")
+    return results
+
+def get_catalogue():
+    """Lấy danh mục thương hiệu/mẫu xe trong bộ nhớ cho phiên bản dữ liệu hiện tại"""
+    try:
+        return _load_catalogue(current_data_version())
     except Exception as e:
-        logger.error(f"Lỗi khi lấy danh sách thương hiệu: {str(e)}")
-        st.error(f"Không thể lấy danh sách thương hiệu: {str(e)}")
-        return []
+        # Không cache danh mục rỗng khi lỗi, lần gọi sau sẽ thử lại
+        logger.error(f"Lỗi khi tạo danh mục xe: {str(e)}")
+        st.error(f"Không thể lấy danh mục thương hiệu và mẫu xe: {str(e)}")
+        return BikeCatalogue()
 
-@st.cache_data(ttl=3600)  # Cache 1 giờ
-def get_models(brand):
-    """Lấy danh sách mẫu xe theo thương hiệu từ database"""
+@st.cache_resource(max_entries=2)  # Một đối tượng dùng chung cho mỗi phiên bản dữ liệu
+def _load_catalogue(data_version):
+    """Tạo danh mục thương hiệu/mẫu xe bằng một truy vấn duy nhất"""
+    conn = get_db_connection()
+    try:
+        return BikeCatalogue.from_connection(conn)
+    finally:
+        conn.close()
+
+def get_price_position(brand, model, year, mileage, price):
+    """
+    Vị trí của một mức giá trên thị trường của mẫu xe (phân vị giá)
+
+    Args:
+        brand: Thương hiệu
+        model: Mẫu xe
+        year: Năm đăng ký
+        mileage: Số km đã đi
+        price: Giá (VND)
+
+    Returns:
+        dict: percentile, listing_count, reg_year, km_label hoặc None nếu không có dữ liệu
+    """
+    try:
+        return _load_price_sketches(current_data_version()).percentile(brand, model, year, mileage, price)
+    except Exception as e:
+        logger.error(f"Lỗi khi tra phân vị giá: {str(e)}")
+        return None
+
+@st.cache_resource(max_entries=2)  # Một bảng phân phối giá dùng chung cho mỗi phiên bản dữ liệu
+def _load_price_sketches(data_version):
+    """Nạp toàn bộ bảng price_sketches vào bộ nhớ"""
+    conn = get_db_connection()
+    try:
+        return PriceSketchIndex.from_connection(conn)
+    finally:
+        conn.close()
+
+def get_price_histograms():
+    """Lấy histogram giá đã tính sẵn của các thương hiệu/mẫu xe cho phiên bản dữ liệu hiện tại"""
+    try:
+        return _load_price_histograms(current_data_version())
+    except Exception as e:
+        logger.error(f"Lỗi khi nạp histogram giá: {str(e)}")
+        return PriceHistogramIndex()
+
+@st.cache_resource(max_entries=2)  # Một bảng histogram dùng chung cho mỗi phiên bản dữ liệu
+def _load_price_histograms(data_version):
+    """Nạp toàn bộ bảng price_histograms vào bộ nhớ"""
+    conn = get_db_connection()
+    try:
+        return PriceHistogramIndex.from_connection(conn)
+    finally:
+        conn.close()
+
+def get_price_trends(granularity="month", periods=12, brand=None):
+    """
+    Lấy chuỗi thời gian giá (trung vị/trung bình theo kỳ) của các kỳ gần nhất
+
+    Args:
+        granularity: "month" hoặc "week"
+        periods: Số kỳ gần nhất
+        brand: None để lấy theo thương hiệu, hoặc tên thương hiệu để lấy theo mẫu xe
+
+    Returns:
+        DataFrame: period_start, brand, model, listing_count, price_mean, price_median (rỗng nếu có lỗi)
+    """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT DISTINCT model_normalized FROM motorbikes WHERE brand = ?", (brand,))
-        models = [row[0] for row in cursor.fetchall()]
+        return _load_price_trends(current_data_version(), granularity, periods, brand)
+    except Exception as e:
+        logger.error(f"Lỗi khi lấy xu hướng giá: {str(e)}")
+        return pd.DataFrame()
+
+@st.cache_data(max_entries=64)  # Cache theo phiên bản dữ liệu
+def _load_price_trends(data_version, granularity, periods, brand):
+    """Đọc bảng price_trends"""
+    conn = get_db_connection()
+    try:
+        return load_price_trends(conn, granularity, periods, brand)
+    finally:
         conn.close()
-        return models
+
+def get_suggestion_engine():
+    """Lấy bộ gợi ý xe (bảng thông số trong bộ nhớ) cho phiên bản dữ liệu hiện tại"""
+    try:
+        return _load_suggestion_engine(current_data_version())
     except Exception as e:
-        logger.error(f"Lỗi khi lấy danh sách mẫu xe: {str(e)}")
-        st.error(f"Không thể lấy danh sách mẫu xe cho {brand}: {str(e)}")
-        return []
+        # Không cache bộ gợi ý rỗng khi lỗi, lần gọi sau sẽ thử lại
+        logger.error(f"Lỗi khi nạp bộ gợi ý xe: {str(e)}")
+        st.error(f"Không thể nạp thông số xe để gợi ý: {str(e)}")
+        return SuggestionEngine()
+
+@st.cache_resource(max_entries=2)  # Một bảng thông số dùng chung cho mỗi phiên bản dữ liệu
+def _load_suggestion_engine(data_version):
+    """Nạp toàn bộ thông số các phiên bản xe bằng một truy vấn và tính sẵn thứ hạng theo mục đích"""
+    conn = get_db_connection()
+    try:
+        return SuggestionEngine.from_connection(conn)
+    finally:
+        conn.close()
+
+def get_bike_specs(bikes):
+    """
+    Lấy thông số của nhiều mẫu xe để so sánh (một truy vấn cho tất cả xe)
+
+    Args:
+        bikes: Danh sách (brand, model)
+
+    Returns:
+        DataFrame: Mỗi dòng một mẫu xe theo thứ tự đã chọn, rỗng nếu có lỗi
+    """
+    try:
+        return _load_bike_specs(current_data_version(), tuple(tuple(bike) for bike in bikes))
+    except Exception as e:
+        logger.error(f"Lỗi khi lấy thông số xe: {str(e)}")
+        return pd.DataFrame()
+
+@st.cache_data(max_entries=128)  # Cache theo phiên bản dữ liệu
+def _load_bike_specs(data_version, bikes):
+    """Truy vấn thông số của các mẫu xe"""
+    conn = get_db_connection()
+    try:
+        return fetch_bike_specs(conn, bikes)
+    finally:
+        conn.close()
+
+def get_brands():
+    """Lấy danh sách thương hiệu từ danh mục xe"""
+    return get_catalogue().brands()
+
+def get_models(brand):
+    """Lấy danh sách mẫu xe theo thương hiệu từ danh mục xe"""
+    return get_catalogue().models(brand)
 
 # @st.cache_data(ttl=3600)  # Cache 1 giờ
 # def get_variants(brand, model):
@@ -178,33 +395,30 @@ def get_models(brand):
 #         st.error(f"Không thể lấy danh sách phiên bản cho {brand} {model}: {str(e)}")
 #         return []
     
-@st.cache_data(ttl=3600)  # Cache 1 giờ
-def load_market_data():
-    """Lấy dữ liệu thị trường từ database"""
+def get_market_snapshot():
+    """
+    Số liệu thị trường (chỉ số tổng quan, bảng thương hiệu, bảng chi tiết) cho phiên bản dữ liệu hiện tại
+
+    Returns:
+        MarketSnapshot: Rỗng nếu có lỗi
+    """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT 
-                brand as 'Thương hiệu',
-                COUNT(*) as 'Số lượng giao dịch',
-                ROUND(AVG(price_numeric), 1) as 'Giá trung bình (triệu VND)'
-            FROM motorbikes
-            GROUP BY brand
-            ORDER BY COUNT(*) DESC
-        """)
-        
-        # Chuyển kết quả thành list of dicts
-        market_data = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        
-        return pd.DataFrame(market_data)
+        return _load_market_snapshot(current_data_version())
     except Exception as e:
+        # Không cache snapshot rỗng khi lỗi, lần gọi sau sẽ thử lại
         logger.error(f"Lỗi khi truy vấn database để lấy dữ liệu thị trường: {str(e)}")
         st.error(f"Không thể tải dữ liệu thị trường: {str(e)}")
-        # Trả về DataFrame trống
-        return pd.DataFrame(columns=['Thương hiệu', 'Số lượng giao dịch', 'Giá trung bình (triệu VND)'])
+        return MarketSnapshot()
+
+@st.cache_resource(max_entries=2)  # Một snapshot dùng chung cho mỗi phiên bản dữ liệu
+@disk_cached("market_snapshot", should_cache=lambda snapshot: snapshot.total_count > 0)
+def _load_market_snapshot(data_version):
+    """Tính số liệu thị trường trong một lần duyệt (dùng chung qua cache trên đĩa)"""
+    conn = get_db_connection()
+    try:
+        return MarketSnapshot.from_connection(conn)
+    finally:
+        conn.close()
 
 def analyze_image(img_str):
     """
@@ -223,6 +437,14 @@ def analyze_image(img_str):
         st.error(error_msg)
         raise ValueError(error_msg)
     
+    # Cùng nội dung đã được phân tích trước đó thì dùng lại kết quả
+    cache = get_analysis_cache()
+    cache_key = image_cache_key(img_str)
+    cached_result = cache.get(cache_key)
+    if cached_result is not None:
+        logger.info(f"Dùng kết quả phân tích ảnh đã cache ({cache_key[-12:]})")
+        return cached_result
+    
     # Tiếp tục nếu có API key
     try:
         headers = {
@@ -256,9 +478,8 @@ def analyze_image(img_str):
             ]
         }
         
-        response = requests.post(CLAUDE_API_URL, headers=headers, json=payload, timeout=30)
-        response.raise_for_status()
-        result = response.json()
+        # Client dùng chung: giữ kết nối, giới hạn số lời gọi đồng thời và tự thử lại lỗi 429/5xx
+        result = get_llm_client().post_json(CLAUDE_API_URL, payload, headers=headers)
         
         # Trích xuất và phân tích phản hồi từ Claude
         try:
@@ -283,6 +504,7 @@ def analyze_image(img_str):
                 "confidence": 0.9  # Độ tin cậy cao vì dùng Claude
             }
             
+            cache.set(cache_key, normalized_result)
             return normalized_result
             
         except Exception as parse_error:
@@ -314,6 +536,14 @@ def analyze_description(description_text):
         st.error(error_msg)
         raise ValueError(error_msg)
     
+    # Cùng nội dung đã được phân tích trước đó thì dùng lại kết quả
+    cache = get_analysis_cache()
+    cache_key = description_cache_key(description_text)
+    cached_result = cache.get(cache_key)
+    if cached_result is not None:
+        logger.info(f"Dùng kết quả phân tích mô tả đã cache ({cache_key[-12:]})")
+        return cached_result
+    
     # Tiếp tục nếu có API key
     try:
         headers = {
@@ -339,9 +569,8 @@ def analyze_description(description_text):
             ]
         }
         
-        response = requests.post(CLAUDE_API_URL, headers=headers, json=payload, timeout=30)
-        response.raise_for_status()
-        result = response.json()
+        # Client dùng chung: giữ kết nối, giới hạn số lời gọi đồng thời và tự thử lại lỗi 429/5xx
+        result = get_llm_client().post_json(CLAUDE_API_URL, payload, headers=headers)
         
         # Trích xuất và phân tích phản hồi từ Claude
         try:
@@ -367,6 +596,7 @@ def analyze_description(description_text):
                 "confidence": 0.8  # Độ tin cậy cao vì dùng Claude
             }
             
+            cache.set(cache_key, normalized_result)
             return normalized_result
             
         except Exception as parse_error:
@@ -0,0 +1,242 @@
+# utils/db_serving.py
+import os
+import sqlite3
+import threading
+import itertools
+import logging
+import time
+
+# Thiết lập logging
+logger = logging.getLogger(__name__)
+
+
+def get_file_signature(db_path):
+    """
+    Lấy chữ ký phiên bản của file database trên đĩa
+
+    Args:
+        db_path (str): Đường dẫn đến file database
+
+    Returns:
+        tuple: (mtime_ns, size) của file database và file -wal (nếu có)
+    """
+    signature = []
+    for path in (db_path, f"{db_path}-wal"):
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class InMemoryDatabase:
+    """
+    Bản sao chỉ đọc của database trên đĩa, được nạp vào SQLite in-memory dùng chung (shared cache)
+
+    Mỗi lần nạp tạo một database in-memory mới (tên khác nhau) rồi mới chuyển sang dùng,
+    nên các kết nối đang đọc dở không bị ảnh hưởng khi làm mới.
+
+    Chỉ nạp lại khi data_version hoặc liveness_version trong bảng metadata thay đổi: các lượt quét
+    của liveness sweeper chỉ ghi last_checked_at (không đổi is_alive) không làm nạp lại cả database.
+    """
+    _names = itertools.count()
+
+    def __init__(self, db_path, check_interval=1.0):
+        """
+        Khởi tạo bản sao in-memory
+
+        Args:
+            db_path (str): Đường dẫn đến file database trên đĩa
+            check_interval (float): Khoảng thời gian tối thiểu (giây) giữa hai lần kiểm tra file thay đổi
+        """
+        self.db_path = os.path.abspath(db_path)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._anchor = None  # Kết nối giữ cho database in-memory tồn tại
+        self._uri = None
+        self._signature = None
+        self._last_check = 0.0
+
+    def _load(self):
+        """Sao chép database từ đĩa vào một database in-memory mới bằng backup API"""
+        signature = get_content_version(self.db_path)
+        uri = f"file:motorbike_mem_{os.getpid()}_{next(self._names)}?mode=memory&cache=shared"
+
+        start_time = time.perf_counter()
+        source = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        target = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        try:
+            source.backup(target)
+        except Exception:
+            target.close()
+            raise
+        finally:
+            source.close()
+
+        old_anchor = self._anchor
+        self._anchor, self._uri, self._signature = target, uri, signature
+        if old_anchor is not None:
+            # Database cũ sẽ được giải phóng khi kết nối cuối cùng tới nó đóng lại
+            old_anchor.close()
+
+        logger.info(f"Đã nạp {self.db_path} vào bộ nhớ trong {time.perf_counter() - start_time:.3f} giây")
+
+    def refresh_if_changed(self, force=False):
+        """
+        Nạp lại database nếu data_version hoặc liveness_version trên đĩa đã thay đổi
+
+        Args:
+            force (bool): Bỏ qua check_interval và kiểm tra ngay
+
+        Returns:
+            bool: True nếu database vừa được nạp (lại)
+        """
+        now = time.monotonic()
+        if not force and self._anchor is not None and now - self._last_check < self.check_interval:
+            return False
+
+        with self._lock:
+            self._last_check = now
+            if self._anchor is not None and get_content_version(self.db_path) == self._signature:
+                return False
+            self._load()
+            return True
+
+    def connect(self):
+        """
+        Mở kết nối chỉ đọc tới bản sao in-memory hiện tại
+
+        Returns:
+            sqlite3.Connection: Kết nối với row_factory = sqlite3.Row
+        """
+        self.refresh_if_changed()
+        # Mở kết nối trong lock để không trỏ vào database cũ vừa bị thay thế
+        with self._lock:
+            conn = sqlite3.connect(self._uri, uri=True)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only = 1")
+        return conn
+
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_memory_database(db_path):
+    """
+    Lấy (hoặc tạo) bản sao in-memory dùng chung trong tiến trình cho một file database
+
+    Args:
+        db_path (str): Đường dẫn đến file database trên đĩa
+
+    Returns:
+        InMemoryDatabase: Bản sao in-memory đã được nạp
+    """
+    key = os.path.abspath(db_path)
+    with _instances_lock:
+        database = _instances.get(key)
+        if database is None:
+            database = InMemoryDatabase(key)
+            database.refresh_if_changed(force=True)
+            _instances[key] = database
+    return database
+
+
+_version_cache = {}
+_version_lock = threading.Lock()
+
+
+def read_metadata(db_path):
+    """
+    Đọc toàn bộ bảng metadata (data_version, built_at, liveness_version...)
+
+    Args:
+        db_path (str): Đường dẫn đến file database
+
+    Returns:
+        dict: key -> value, rỗng nếu database chưa có bảng metadata
+    """
+    try:
+        conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+        try:
+            return dict(conn.execute("SELECT key, value FROM metadata").fetchall())
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Không đọc được metadata từ {db_path}: {str(e)}")
+        return {}
+
+
+def read_data_version(db_path):
+    """
+    Đọc phiên bản dữ liệu được create_sqlite_database ghi vào bảng metadata
+
+    Args:
+        db_path (str): Đường dẫn đến file database
+
+    Returns:
+        str: Phiên bản dữ liệu, hoặc chữ ký file nếu database chưa có bảng metadata
+    """
+    version = read_metadata(db_path).get("data_version")
+    if version:
+        return version
+    # Database cũ chưa được gắn phiên bản: dùng chữ ký file
+    return "file-" + "-".join(str(part) for part in get_file_signature(db_path))
+
+
+def _get_cached_metadata(db_path):
+    """Metadata của database, chỉ đọc lại khi file trên đĩa thay đổi (None nếu không có file)"""
+    key = os.path.abspath(db_path)
+    signature = get_file_signature(key)
+    if signature[0] is None:
+        return None
+
+    cached = _version_cache.get(key)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    with _version_lock:
+        metadata = read_metadata(key)
+        if not metadata.get("data_version"):
+            metadata["data_version"] = "file-" + "-".join(str(part) for part in signature)
+        _version_cache[key] = (signature, metadata)
+    return metadata
+
+
+def get_data_version(db_path):
+    """
+    Lấy phiên bản dữ liệu hiện tại của database, chỉ đọc lại khi file trên đĩa thay đổi
+
+    Args:
+        db_path (str): Đường dẫn đến file database
+
+    Returns:
+        str: Phiên bản dữ liệu, hoặc None nếu database không tồn tại
+    """
+    metadata = _get_cached_metadata(db_path)
+    return metadata["data_version"] if metadata is not None else None
+
+
+def get_liveness_version(db_path):
+    """
+    Lấy phiên bản trạng thái còn/hết hạn của bài đăng (tăng mỗi khi liveness sweeper đổi is_alive)
+
+    Returns:
+        str: Phiên bản, "0" nếu chưa có lần quét nào, None nếu database không tồn tại
+    """
+    metadata = _get_cached_metadata(db_path)
+    return metadata.get("liveness_version", "0") if metadata is not None else None
+
+
+def get_content_version(db_path):
+    """
+    Phiên bản nội dung mà ứng dụng đọc từ database
+
+    Returns:
+        tuple: (data_version, liveness_version), (None, None) nếu database không tồn tại
+    """
+    metadata = _get_cached_metadata(db_path)
+    if metadata is None:
+        return None, None
+    return metadata["data_version"], metadata.get("liveness_version", "0")
@@ -0,0 +1,152 @@
+# utils/figure_cache.py
+import hashlib
+import io
+import logging
+import threading
+from collections import OrderedDict
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from config import FIGURE_CACHE_MAX_ENTRIES, FIGURE_CACHE_MAX_MB
+
+# Thiết lập logging
+logger = logging.getLogger(__name__)
+
+# Giống cách st.pyplot lưu ảnh, để ảnh từ cache hiển thị như trước
+RENDER_DPI = 200
+
+
+def _update_digest(digest, value):
+    """Đưa một tham số vào hàm băm; DataFrame/Series/mảng được băm theo nội dung"""
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr((list(value.columns), [str(dtype) for dtype in value.dtypes])).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        digest.update(repr((value.name, str(value.dtype))).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(repr((value.dtype.str, value.shape)).encode("utf-8"))
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        for key in sorted(value, key=repr):
+            digest.update(repr(key).encode("utf-8"))
+            _update_digest(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}:{len(value)}".encode("utf-8"))
+        for item in value:
+            _update_digest(digest, item)
+    else:
+        digest.update(repr(value).encode("utf-8"))
+    digest.update(b"|")
+
+
+def figure_key(name, data_version, args=(), kwargs=None, fmt="png"):
+    """
+    Khóa cache của một biểu đồ: tên biểu đồ, phiên bản dữ liệu, định dạng và SHA-256 của dữ liệu đầu vào
+
+    Returns:
+        str: "<name>:<data_version>:<fmt>:<sha256>"
+    """
+    digest = hashlib.sha256()
+    _update_digest(digest, tuple(args))
+    _update_digest(digest, dict(kwargs or {}))
+    return f"{name}:{data_version}:{fmt}:{digest.hexdigest()}"
+
+
+def render_figure(fig, fmt="png"):
+    """Xuất Figure thành bytes (PNG hoặc SVG) rồi đóng Figure để giải phóng bộ nhớ"""
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, dpi=RENDER_DPI, bbox_inches="tight")
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+class FigureCache:
+    """
+    Cache LRU trong bộ nhớ chứa ảnh đã render của các biểu đồ
+
+    Giới hạn theo cả số mục và tổng dung lượng; mục lâu không dùng nhất bị loại trước.
+    """
+    def __init__(self, max_entries=FIGURE_CACHE_MAX_ENTRIES, max_bytes=FIGURE_CACHE_MAX_MB * 1024 * 1024):
+        """
+        Args:
+            max_entries (int): Số biểu đồ tối đa
+            max_bytes (int): Tổng dung lượng ảnh tối đa
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key):
+        """Ảnh đã render (bytes) hoặc None"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return data
+
+    def set(self, key, data):
+        """Lưu ảnh đã render và loại bớt các mục cũ nếu vượt giới hạn"""
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = data
+            self._size += len(data)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self._stats["evictions"] += 1
+
+    def render(self, name, build, *args, data_version=None, fmt="png", **kwargs):
+        """
+        Ảnh của biểu đồ build(*args, **kwargs); chỉ vẽ lại khi dữ liệu đầu vào hoặc phiên bản dữ liệu thay đổi
+
+        Args:
+            name (str): Tên biểu đồ
+            build (callable): Hàm tạo Figure (ví dụ create_market_overview)
+            data_version: Phiên bản dữ liệu
+            fmt (str): "png" hoặc "svg"
+
+        Returns:
+            bytes: Nội dung ảnh
+        """
+        key = figure_key(name, data_version, args, kwargs, fmt)
+        data = self.get(key)
+        if data is None:
+            data = render_figure(build(*args, **kwargs), fmt)
+            self.set(key, data)
+            logger.info(f"Đã vẽ biểu đồ {name} ({len(data):,} bytes)")
+        return data
+
+    def stats(self):
+        """
+        Returns:
+            dict: hits, misses, evictions, entries, size_bytes
+        """
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), size_bytes=self._size)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_figure_cache():
+    """Cache biểu đồ dùng chung cho toàn bộ tiến trình"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = FigureCache()
+    return _cache
@@ -0,0 +1,59 @@
+# utils/image_preprocessing.py
+import io
+import logging
+from PIL import Image, ImageOps
+from config import ANALYSIS_IMAGE_MAX_EDGE, ANALYSIS_IMAGE_QUALITY
+
+# Thiết lập logging
+logger = logging.getLogger(__name__)
+
+
+def _to_rgb(image):
+    """Chuyển ảnh về RGB; ảnh có kênh trong suốt được đặt lên nền trắng"""
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB") if image.mode != "RGB" else image
+
+
+def preprocess_image(raw_bytes, max_edge=ANALYSIS_IMAGE_MAX_EDGE, quality=ANALYSIS_IMAGE_QUALITY):
+    """
+    Chuẩn bị ảnh trước khi gửi đi phân tích: xoay theo EXIF, thu nhỏ, bỏ metadata và nén lại JPEG
+
+    Args:
+        raw_bytes (bytes): Nội dung file ảnh người dùng tải lên (JPEG/PNG)
+        max_edge (int): Cạnh dài nhất tối đa (pixel); ảnh nhỏ hơn không bị phóng to
+        quality (int): Chất lượng JPEG (1-95)
+
+    Returns:
+        tuple: (jpeg_bytes, stats) với stats gồm original_bytes, bytes, bytes_saved,
+               original_size, size (chiều rộng, chiều cao)
+    """
+    with Image.open(io.BytesIO(raw_bytes)) as image:
+        original_size = image.size
+        # Với JPEG, giải mã thẳng ở độ phân giải nhỏ hơn (1/2, 1/4, 1/8) nếu vẫn đủ lớn
+        image.draft("RGB", (max_edge, max_edge))
+        image = ImageOps.exif_transpose(image)
+        image = _to_rgb(image)
+        image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+        # Lưu ảnh mới không kèm exif/icc nên metadata (vị trí GPS, thiết bị...) bị loại bỏ
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=quality, optimize=True)
+        size = image.size
+
+    jpeg_bytes = output.getvalue()
+    stats = {
+        "original_bytes": len(raw_bytes),
+        "bytes": len(jpeg_bytes),
+        "bytes_saved": len(raw_bytes) - len(jpeg_bytes),
+        "original_size": original_size,
+        "size": size,
+    }
+    logger.info(
+        f"Ảnh phân tích: {original_size[0]}x{original_size[1]} -> {size[0]}x{size[1]}, "
+        f"{stats['original_bytes']:,} -> {stats['bytes']:,} bytes (tiết kiệm {stats['bytes_saved']:,} bytes)"
+    )
+    return jpeg_bytes, stats
@@ -0,0 +1,91 @@
+# utils/listing_cards.py
+import html
+import pandas as pd
+
+# Độ dài tối đa của mô tả hiển thị trên mỗi thẻ
+DESCRIPTION_MAX_LENGTH = 150
+BASE_URL = "https://xe.chotot.com"
+
+
+def _text(df, column):
+    """Cột dạng chuỗi đã escape HTML, giá trị thiếu/rỗng thành chuỗi rỗng"""
+    if column not in df.columns:
+        return pd.Series("", index=df.index)
+    values = df[column].astype("string").fillna("").str.strip()
+    return values.map(html.escape)
+
+
+def _line(df, column, prefix):
+    """Một dòng HTML cho mỗi bài đăng, bỏ trống nếu bài đăng không có giá trị của cột"""
+    values = _text(df, column)
+    return ("<div>" + prefix + values + "</div>").where(values != "", "")
+
+
+def _listing_urls(df):
+    """URL đầy đủ của bài đăng; chỉ giữ http(s) để tránh chèn javascript: vào href"""
+    column = "url_full" if "url_full" in df.columns else "url"
+    urls = df[column].astype("string").fillna("") if column in df.columns else pd.Series("", index=df.index)
+    relative = urls.str.startswith("/")
+    urls = urls.where(~relative, BASE_URL + urls)
+    safe = urls.str.startswith(("http://", "https://"))
+    return urls.where(safe, "#").map(lambda url: html.escape(url, quote=True))
+
+
+def render_listing_cards(df):
+    """
+    Tạo một khối HTML duy nhất chứa thẻ của tất cả bài đăng (mọi chuỗi đều được escape)
+
+    Args:
+        df: DataFrame bài đăng (title, brand, model, reg_year, condition, location, post_date_display,
+            days_since_posted, mileage, engine_capacity, origin, description, price_millions, price, url_full)
+
+    Returns:
+        str: HTML để hiển thị bằng một lần st.markdown(..., unsafe_allow_html=True)
+    """
+    if df.empty:
+        return ""
+
+    # Mô tả ngắn
+    description = df["description"].astype("string").fillna("") if "description" in df.columns else pd.Series("", index=df.index)
+    too_long = description.str.len() > DESCRIPTION_MAX_LENGTH
+    description = description.where(~too_long, description.str.slice(0, DESCRIPTION_MAX_LENGTH - 3) + "...")
+    description = description.map(html.escape)
+    description_html = ("<div class='listing-description'>📝 " + description + "</div>").where(description != "", "")
+
+    # Model = thương hiệu + mẫu xe, chỉ hiển thị khi có cả hai
+    brand, model = _text(df, "brand"), _text(df, "model")
+    model_html = ("<div>🏭 Model: " + brand + " " + model + "</div>").where((brand != "") & (model != ""), "")
+
+    # Thời gian đăng: ưu tiên ngày đăng, nếu không có thì số ngày đã đăng
+    post_date = _line(df, "post_date_display", "⏱️ Đăng ngày: ")
+    days = _text(df, "days_since_posted")
+    days_html = ("<div>⏱️ Đã đăng: " + days + " ngày trước</div>").where(days != "", "")
+    posted_html = post_date.where(post_date != "", days_html)
+
+    # Giá: ưu tiên giá theo triệu
+    price_millions = _text(df, "price_millions")
+    price = (price_millions + " triệu").where(price_millions != "", _text(df, "price"))
+
+    cards = (
+        "<div class='listing-card'>"
+        "<div class='listing-main'>"
+        "<div class='listing-title'>" + _text(df, "title") + "</div>"
+        + model_html
+        + _line(df, "reg_year", "📅 Năm đăng ký: ")
+        + _line(df, "condition", "🔍 Tình trạng: ")
+        + _line(df, "location", "📍 ")
+        + posted_html
+        + "</div>"
+        "<div class='listing-details'>"
+        + _line(df, "mileage", "📏 Số km: ")
+        + _line(df, "engine_capacity", "🔧 Dung tích: ")
+        + _line(df, "origin", "🌐 Nguồn gốc: ")
+        + description_html
+        + "</div>"
+        "<div class='listing-action'>"
+        "<div class='listing-price'>" + price + "</div>"
+        "<a class='listing-link' href='" + _listing_urls(df) + "' target='_blank' rel='noopener'>Xem chi tiết</a>"
+        "</div>"
+        "</div>"
+    )
+    return "<div class='listing-cards'>" + "".join(cards.tolist()) + "</div>"
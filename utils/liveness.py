@@ -0,0 +1,54 @@
+# utils/liveness.py
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from config import LIVENESS_REQUEST_TIMEOUT
+
+# Thiết lập logging
+logger = logging.getLogger(__name__)
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Máy chủ không hỗ trợ HEAD (hoặc chặn HEAD) thì thử lại bằng GET
+HEAD_UNSUPPORTED = {403, 405, 501}
+
+
+class LivenessChecker:
+    """
+    Kiểm tra URL bài đăng còn tồn tại hay không (dùng bởi liveness sweeper)
+
+    Dùng một Session với connection pool, gửi HEAD trước (GET nếu máy chủ không hỗ trợ HEAD)
+    và giới hạn thời gian cho từng request.
+    """
+    def __init__(self, request_timeout=LIVENESS_REQUEST_TIMEOUT, max_workers=8):
+        """
+        Khởi tạo bộ kiểm tra
+
+        Args:
+            request_timeout (float): Thời gian chờ kết nối/đọc của mỗi request (giây)
+            max_workers (int): Số kết nối giữ trong pool (bằng số luồng gọi status song song)
+        """
+        self.request_timeout = request_timeout
+
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def status(self, url):
+        """
+        Lấy status code cuối cùng (sau khi theo redirect) của một URL
+
+        Returns:
+            int: HTTP status code
+        """
+        timeout = (self.request_timeout, self.request_timeout)
+        response = self.session.head(url, allow_redirects=True, timeout=timeout)
+        if response.status_code in HEAD_UNSUPPORTED:
+            # stream=True để không tải nội dung trang, chỉ cần status code
+            with self.session.get(url, allow_redirects=True, timeout=timeout, stream=True) as response:
+                return response.status_code
+        return response.status_code
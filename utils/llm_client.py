@@ -0,0 +1,207 @@
+# utils/llm_client.py
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+from config import LLM_MAX_CONCURRENCY, LLM_MAX_RETRIES, LLM_REQUEST_TIMEOUT, LLM_DEADLINE
+
+# Thiết lập logging
+logger = logging.getLogger(__name__)
+
+# Lỗi tạm thời đáng thử lại: quá tải/giới hạn tốc độ và lỗi phía máy chủ
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504, 529}
+
+
+class LLMClientError(Exception):
+    """Gọi API thất bại (hết lượt thử lại, hết thời hạn hoặc lỗi không thử lại được)"""
+
+
+def _retry_after(response):
+    """Số giây chờ theo header Retry-After (dạng số giây hoặc ngày giờ HTTP), None nếu không có"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)], 1)
+
+
+class LLMClient:
+    """
+    Client HTTP dùng chung cho các lời gọi API phân tích
+
+    Giữ kết nối keep-alive trong connection pool, giới hạn số request đồng thời bằng semaphore,
+    thử lại lỗi 429/5xx với backoff ngẫu nhiên (tôn trọng Retry-After) và không vượt quá thời hạn
+    của cả lời gọi. Thời gian phản hồi, thời gian chờ trong hàng đợi và số lần thử lại được ghi lại.
+    """
+    def __init__(self, max_concurrency=LLM_MAX_CONCURRENCY, max_retries=LLM_MAX_RETRIES,
+                 request_timeout=LLM_REQUEST_TIMEOUT, deadline=LLM_DEADLINE,
+                 backoff_base=0.5, backoff_max=8.0, history=1000):
+        """
+        Khởi tạo client
+
+        Args:
+            max_concurrency (int): Số request được gửi đồng thời tối đa
+            max_retries (int): Số lần thử lại tối đa cho lỗi tạm thời
+            request_timeout (float): Thời gian chờ tối đa của một request (giây)
+            deadline (float): Thời hạn mặc định của cả lời gọi, gồm chờ hàng đợi và thử lại (giây)
+            backoff_base (float): Thời gian chờ cơ sở trước lần thử lại đầu tiên (giây)
+            backoff_max (float): Thời gian chờ tối đa giữa hai lần thử (giây)
+            history (int): Số lời gọi gần nhất được giữ lại để tính phân vị
+        """
+        self.max_retries = max_retries
+        self.request_timeout = request_timeout
+        self.deadline = deadline
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_concurrency, pool_maxsize=max_concurrency, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=history)
+        self._queue_waits = deque(maxlen=history)
+        self._counters = {"calls": 0, "requests": 0, "retries": 0, "failures": 0, "in_flight": 0}
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def _backoff(self, attempt, response=None):
+        """Thời gian chờ trước lần thử lại: Retry-After nếu có, nếu không thì full jitter"""
+        if response is not None:
+            retry_after = _retry_after(response)
+            if retry_after is not None:
+                return retry_after
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def post_json(self, url, payload, headers=None, deadline=None):
+        """
+        Gửi POST JSON và trả về nội dung JSON của phản hồi
+
+        Args:
+            url (str): Địa chỉ API
+            payload (dict): Nội dung request
+            headers (dict): Header bổ sung
+            deadline (float): Thời hạn của cả lời gọi (giây), mặc định self.deadline
+
+        Returns:
+            dict: Phản hồi đã parse
+
+        Raises:
+            LLMClientError: Khi hết thời hạn, hết lượt thử lại hoặc gặp lỗi không thử lại được
+        """
+        start_time = time.monotonic()
+        expires_at = start_time + (deadline if deadline is not None else self.deadline)
+        self._count("calls")
+
+        # Chờ đến lượt trong giới hạn đồng thời, nhưng không quá thời hạn
+        if not self._semaphore.acquire(timeout=max(expires_at - time.monotonic(), 0)):
+            self._count("failures")
+            raise LLMClientError("Hết thời hạn khi chờ đến lượt gọi API")
+        queue_wait = time.monotonic() - start_time
+        self._count("in_flight")
+        try:
+            response = self._send_with_retries(url, payload, headers, expires_at)
+        except Exception:
+            self._count("failures")
+            raise
+        finally:
+            self._count("in_flight", -1)
+            self._semaphore.release()
+
+        latency = time.monotonic() - start_time
+        with self._lock:
+            self._latencies.append(latency * 1000)
+            self._queue_waits.append(queue_wait * 1000)
+        logger.info(f"Gọi API {url}: {latency * 1000:.0f} ms (chờ hàng đợi {queue_wait * 1000:.0f} ms)")
+        return response
+
+    def _send_with_retries(self, url, payload, headers, expires_at):
+        attempt = 0
+        while True:
+            remaining = expires_at - time.monotonic()
+            if remaining <= 0:
+                raise LLMClientError("Hết thời hạn gọi API")
+
+            self._count("requests")
+            response = None
+            try:
+                response = self.session.post(
+                    url, headers=headers, json=payload, timeout=min(self.request_timeout, remaining)
+                )
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response.json()
+                error = f"HTTP {response.status_code}"
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = str(e)
+            except requests.HTTPError as e:
+                raise LLMClientError(f"API trả về lỗi: {str(e)}") from e
+            except json.JSONDecodeError as e:
+                raise LLMClientError(f"Phản hồi API không phải JSON: {str(e)}") from e
+
+            if attempt >= self.max_retries:
+                raise LLMClientError(f"Gọi API thất bại sau {attempt + 1} lần thử: {error}")
+            delay = self._backoff(attempt, response)
+            if time.monotonic() + delay >= expires_at:
+                raise LLMClientError(f"Không đủ thời hạn để thử lại sau lỗi: {error}")
+
+            logger.warning(f"Lỗi tạm thời khi gọi API ({error}), thử lại sau {delay:.2f} giây")
+            self._count("retries")
+            attempt += 1
+            time.sleep(delay)
+
+    def metrics(self):
+        """
+        Số liệu hoạt động của client
+
+        Returns:
+            dict: calls, requests, retries, failures, in_flight, latency_p50_ms, latency_p95_ms,
+                  queue_wait_p50_ms, queue_wait_p95_ms
+        """
+        with self._lock:
+            latencies = list(self._latencies)
+            queue_waits = list(self._queue_waits)
+            metrics = dict(self._counters)
+        metrics.update({
+            "latency_p50_ms": _percentile(latencies, 0.5),
+            "latency_p95_ms": _percentile(latencies, 0.95),
+            "queue_wait_p50_ms": _percentile(queue_waits, 0.5),
+            "queue_wait_p95_ms": _percentile(queue_waits, 0.95),
+        })
+        return metrics
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client():
+    """Client dùng chung cho toàn bộ tiến trình (chung connection pool và giới hạn đồng thời)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LLMClient()
+    return _client
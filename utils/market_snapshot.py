@@ -0,0 +1,98 @@
+# utils/market_snapshot.py
+import logging
+import pandas as pd
+
+# Thiết lập logging
+logger = logging.getLogger(__name__)
+
+# Một lần quét duy nhất lấy các cột cần cho mọi số liệu thị trường
+MARKET_QUERY = """
+    SELECT brand, model_normalized, price_numeric, reg_year_numeric
+    FROM motorbikes
+    WHERE brand IS NOT NULL
+"""
+MARKET_COLUMNS = ["brand", "model_normalized", "price_numeric", "reg_year_numeric"]
+
+BRAND_COLUMNS = ["Thương hiệu", "Số lượng giao dịch", "Giá trung bình (triệu VND)"]
+DETAILED_COLUMNS = [
+    "Thương hiệu", "Mẫu xe", "Số tin đăng", "Giá trung bình (triệu)",
+    "Giá thấp nhất (triệu)", "Giá cao nhất (triệu)", "Năm đăng ký",
+]
+
+
+def _year_range(year_min, year_max):
+    """Khoảng năm đăng ký dạng chuỗi, ví dụ "2015-2022" """
+    if pd.isna(year_min):
+        return ""
+    if year_min == year_max:
+        return str(int(year_min))
+    return f"{int(year_min)}-{int(year_max)}"
+
+
+class MarketSnapshot:
+    """
+    Toàn bộ số liệu của trang tổng quan thị trường cho một phiên bản dữ liệu
+
+    Được tính trong một lần duyệt: gộp theo thương hiệu × mẫu xe một lần, rồi bảng thương hiệu
+    và các chỉ số tổng quan được cộng dồn từ bảng mẫu xe (không quét lại dữ liệu).
+    """
+    def __init__(self, listings=None):
+        """
+        Args:
+            listings: DataFrame với các cột MARKET_COLUMNS (None là thị trường rỗng)
+        """
+        if listings is None:
+            listings = pd.DataFrame(columns=MARKET_COLUMNS)
+        data = listings[listings["brand"].notna()]
+        price = pd.to_numeric(data["price_numeric"], errors="coerce") / 1_000_000
+        year = pd.to_numeric(data["reg_year_numeric"], errors="coerce")
+        frame = pd.DataFrame({
+            "brand": data["brand"].astype(str).to_numpy(),
+            "model": data["model_normalized"].astype("string").fillna("").to_numpy(),
+            "price": price.to_numpy(),
+            "year": year.to_numpy(),
+        })
+
+        # Lần gộp duy nhất trên dữ liệu gốc
+        models = frame.groupby(["brand", "model"], sort=True).agg(
+            listings=("price", "size"),
+            priced=("price", "count"),
+            price_sum=("price", "sum"),
+            price_min=("price", "min"),
+            price_max=("price", "max"),
+            year_min=("year", "min"),
+            year_max=("year", "max"),
+        ).reset_index()
+
+        # Bảng thương hiệu và chỉ số tổng quan được cộng dồn từ bảng mẫu xe
+        brands = models.groupby("brand", sort=False)[["listings", "priced", "price_sum"]].sum().reset_index()
+        brand_price = brands["price_sum"] / brands["priced"].where(brands["priced"] > 0)
+
+        self.total_count = int(brands["listings"].sum())
+        priced = int(brands["priced"].sum())
+        self.avg_price = round(float(brands["price_sum"].sum()) / priced, 1) if priced else None
+        self.brand_count = len(brands)
+        self.model_count = len(models)
+
+        self.brands = pd.DataFrame({
+            BRAND_COLUMNS[0]: brands["brand"],
+            BRAND_COLUMNS[1]: brands["listings"],
+            BRAND_COLUMNS[2]: brand_price.round(1),
+        }).sort_values(BRAND_COLUMNS[1], ascending=False, kind="stable").reset_index(drop=True)
+
+        self.detailed = pd.DataFrame({
+            DETAILED_COLUMNS[0]: models["brand"],
+            DETAILED_COLUMNS[1]: models["model"],
+            DETAILED_COLUMNS[2]: models["listings"],
+            DETAILED_COLUMNS[3]: (models["price_sum"] / models["priced"].where(models["priced"] > 0)).round(1),
+            DETAILED_COLUMNS[4]: models["price_min"].round(1),
+            DETAILED_COLUMNS[5]: models["price_max"].round(1),
+            DETAILED_COLUMNS[6]: [_year_range(low, high) for low, high in zip(models["year_min"], models["year_max"])],
+        })
+
+    @classmethod
+    def from_connection(cls, conn):
+        """Tính snapshot bằng một truy vấn trên kết nối database"""
+        listings = pd.read_sql_query(MARKET_QUERY, conn)
+        logger.info(f"Đã tính số liệu thị trường từ {len(listings)} bài đăng")
+        return cls(listings)
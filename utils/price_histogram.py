@@ -0,0 +1,171 @@
+# utils/price_histogram.py
+import logging
+import numpy as np
+import pandas as pd
+
+# Thiết lập logging
+logger = logging.getLogger(__name__)
+
+# Bảng lưu số lượng tin đăng theo bin giá và bảng lưu biên các bin (dùng chung cho mọi nhóm)
+HISTOGRAM_TABLE = "price_histograms"
+EDGES_TABLE = "price_histogram_edges"
+
+# Giá trị mẫu xe của dòng gộp cả thương hiệu
+ALL_MODELS = ""
+
+# Số bin giá; thang giá từ 0 đến phân vị PRICE_QUANTILE (triệu VND), giá cao hơn được tính vào bin cuối
+N_BINS = 40
+PRICE_QUANTILE = 0.99
+
+
+def price_edges(prices):
+    """
+    Biên các bin giá (triệu VND) dùng chung cho mọi thương hiệu/mẫu xe để các histogram vẽ chồng được
+
+    Args:
+        prices: Mảng giá (triệu VND)
+
+    Returns:
+        ndarray: N_BINS + 1 biên
+    """
+    if len(prices) == 0:
+        return np.histogram_bin_edges([], bins=N_BINS, range=(0, 1))
+    # Làm tròn giới hạn trên lên bội số của 10 triệu để trục giá dễ đọc
+    upper = max(np.ceil(np.quantile(prices, PRICE_QUANTILE) / 10) * 10, 10)
+    return np.histogram_bin_edges(prices, bins=N_BINS, range=(0, upper))
+
+
+def build_price_histograms(df):
+    """
+    Tính histogram giá cho từng thương hiệu × mẫu xe và cho cả thương hiệu
+
+    Args:
+        df: DataFrame bài đăng với brand, model_normalized, price_numeric
+
+    Returns:
+        tuple: (edges, DataFrame brand, model, listing_count, counts (bytes của mảng uint32 N_BINS phần tử))
+    """
+    data = df[["brand", "model_normalized", "price_numeric"]].dropna(subset=["brand", "price_numeric"])
+    data = data[data["price_numeric"] > 0]
+    prices = data["price_numeric"].to_numpy(dtype=float) / 1_000_000
+    edges = price_edges(prices)
+    if data.empty:
+        return edges, pd.DataFrame(columns=["brand", "model", "listing_count", "counts"])
+
+    # Chỉ số bin của mọi tin đăng được tính một lần trên cả cột giá
+    bins = np.clip(np.searchsorted(edges, prices, side="right") - 1, 0, N_BINS - 1)
+    keys = pd.DataFrame({
+        "brand": data["brand"].astype(str).to_numpy(),
+        "model": data["model_normalized"].astype("string").fillna(ALL_MODELS).to_numpy(),
+    })
+
+    frames = []
+    for level in (keys, keys.assign(model=ALL_MODELS)):
+        # Đánh số nhóm rồi đếm (nhóm, bin) bằng một lần bincount
+        group_ids, groups = pd.MultiIndex.from_frame(level).factorize()
+        counts = np.bincount(group_ids * N_BINS + bins, minlength=len(groups) * N_BINS)
+        counts = counts.reshape(len(groups), N_BINS).astype(np.uint32)
+
+        frame = groups.to_frame(index=False, name=list(level.columns))
+        frame["listing_count"] = counts.sum(axis=1)
+        frame["counts"] = [row.tobytes() for row in counts]
+        frames.append(frame)
+
+    # Mẫu xe không rõ tên chỉ nằm trong dòng gộp của thương hiệu
+    histograms = pd.concat(frames, ignore_index=True).drop_duplicates(["brand", "model"], keep="last")
+    return edges, histograms.reset_index(drop=True)
+
+
+def store_price_histograms(conn, df):
+    """
+    Tính và lưu histogram giá vào bảng price_histograms (thay thế dữ liệu cũ)
+
+    Returns:
+        int: Số nhóm đã lưu
+    """
+    edges, histograms = build_price_histograms(df)
+    conn.execute(f"DROP TABLE IF EXISTS {HISTOGRAM_TABLE}")
+    conn.execute(f"DROP TABLE IF EXISTS {EDGES_TABLE}")
+    conn.execute(f"""
+        CREATE TABLE {HISTOGRAM_TABLE} (
+            brand TEXT NOT NULL,
+            model TEXT NOT NULL,
+            listing_count INTEGER NOT NULL,
+            counts BLOB NOT NULL,
+            PRIMARY KEY (brand, model)
+        )
+    """)
+    conn.execute(f"CREATE TABLE {EDGES_TABLE} (edges BLOB NOT NULL)")
+    conn.execute(f"INSERT INTO {EDGES_TABLE} (edges) VALUES (?)", (edges.astype(np.float64).tobytes(),))
+    conn.executemany(
+        f"INSERT INTO {HISTOGRAM_TABLE} (brand, model, listing_count, counts) VALUES (?, ?, ?, ?)",
+        (
+            (brand, model, int(count), counts)
+            for brand, model, count, counts in histograms.itertuples(index=False)
+        )
+    )
+    conn.commit()
+    return len(histograms)
+
+
+class PriceHistogramIndex:
+    """
+    Histogram giá đã tính sẵn của mọi thương hiệu/mẫu xe, giữ trong bộ nhớ để vẽ biểu đồ phân phối giá
+    """
+    def __init__(self, edges=None, rows=()):
+        """
+        Args:
+            edges: Biên các bin giá (triệu VND)
+            rows: Các dòng (brand, model, listing_count, counts) của bảng price_histograms
+        """
+        self.edges = np.asarray(edges if edges is not None else price_edges([]), dtype=float)
+        self._histograms = {
+            (brand, model): (listing_count, np.frombuffer(counts, dtype=np.uint32))
+            for brand, model, listing_count, counts in rows
+        }
+
+    @classmethod
+    def from_connection(cls, conn):
+        """Đọc toàn bộ bảng price_histograms (rỗng nếu database chưa có bảng này)"""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (HISTOGRAM_TABLE,)
+        ).fetchone()
+        if not exists:
+            logger.warning(f"Database chưa có bảng {HISTOGRAM_TABLE}")
+            return cls()
+        edges = conn.execute(f"SELECT edges FROM {EDGES_TABLE}").fetchone()
+        rows = conn.execute(f"SELECT brand, model, listing_count, counts FROM {HISTOGRAM_TABLE}").fetchall()
+        return cls(np.frombuffer(edges[0], dtype=np.float64), (tuple(row) for row in rows))
+
+    def brands(self):
+        """Các thương hiệu, nhiều tin đăng nhất trước"""
+        totals = [(brand, count) for (brand, model), (count, _) in self._histograms.items() if model == ALL_MODELS]
+        return [brand for brand, _ in sorted(totals, key=lambda item: (-item[1], item[0]))]
+
+    def distribution(self, brand=None, limit=5):
+        """
+        Số lượng tin đăng theo bin giá để vẽ biểu đồ phân phối
+
+        Args:
+            brand (str, optional): None để so sánh các thương hiệu, hoặc tên thương hiệu để so sánh các mẫu xe của nó
+            limit (int): Số thương hiệu/mẫu xe nhiều tin đăng nhất được lấy
+
+        Returns:
+            dict: Tên thương hiệu/mẫu xe -> mảng số lượng N_BINS phần tử
+        """
+        if brand is None:
+            candidates = [((b, m), hist) for (b, m), hist in self._histograms.items() if m == ALL_MODELS]
+        else:
+            candidates = [((b, m), hist) for (b, m), hist in self._histograms.items()
+                          if b == brand and m != ALL_MODELS]
+            if not candidates and (brand, ALL_MODELS) in self._histograms:
+                candidates = [((brand, ALL_MODELS), self._histograms[(brand, ALL_MODELS)])]
+
+        candidates.sort(key=lambda item: (-item[1][0], item[0]))
+        return {
+            (model or b) if brand is not None else b: counts
+            for (b, model), (_, counts) in candidates[:limit]
+        }
+
+    def __len__(self):
+        return len(self._histograms)
@@ -0,0 +1,190 @@
+# utils/price_sketch.py
+import logging
+import numpy as np
+import pandas as pd
+
+# Thiết lập logging
+logger = logging.getLogger(__name__)
+
+# Bảng lưu phân phối giá đã tính sẵn
+SKETCH_TABLE = "price_sketches"
+
+# Các ngưỡng số km, giống các lựa chọn trên trang dự đoán giá
+KM_EDGES = [0, 5_000, 10_000, 20_000, 30_000, 50_000]
+KM_LABELS = ["dưới 5k km", "5-10k km", "10-20k km", "20-30k km", "30-50k km", "trên 50k km"]
+# Giá trị đánh dấu "mọi năm" / "mọi mức km" ở các mức gộp
+ALL = -1
+
+# Histogram giá cố định theo thang log: 128 bin từ 1 triệu đến 1 tỷ VND (mỗi bin rộng ~5.5%)
+PRICE_MIN = 1_000_000
+PRICE_MAX = 1_000_000_000
+N_BINS = 128
+_LOG_MIN = np.log(PRICE_MIN)
+_LOG_STEP = (np.log(PRICE_MAX) - _LOG_MIN) / N_BINS
+
+# Số tin đăng tối thiểu để dùng phân phối của một nhóm chi tiết, nếu ít hơn thì dùng nhóm gộp
+MIN_LISTINGS = 20
+
+
+def km_bucket(mileage):
+    """Chỉ số nhóm số km (0..5) của một hoặc nhiều giá trị số km"""
+    return np.maximum(np.searchsorted(KM_EDGES, mileage, side="right") - 1, 0)
+
+
+def price_bin(price):
+    """Chỉ số bin giá (0..N_BINS-1) của một hoặc nhiều mức giá (VND)"""
+    clipped = np.clip(price, PRICE_MIN, PRICE_MAX)
+    return np.minimum(((np.log(clipped) - _LOG_MIN) / _LOG_STEP).astype(int), N_BINS - 1)
+
+
+def _midpoint_cdf(counts):
+    """
+    Chuyển số lượng theo bin thành phân vị tại mỗi bin (đơn vị 0.01%, uint16)
+
+    Giá trị của bin i là tỷ lệ tin đăng rẻ hơn bin i cộng một nửa số tin trong bin i,
+    nên tra cứu chỉ cần đọc một phần tử.
+    """
+    cumulative = np.cumsum(counts, axis=-1)
+    totals = cumulative[..., -1:]
+    midpoint = (cumulative - counts / 2) / np.maximum(totals, 1)
+    return np.round(midpoint * 10_000).astype(np.uint16)
+
+
+def build_price_sketches(df):
+    """
+    Tính phân phối giá cho từng mẫu xe × năm × nhóm km (và các mức gộp theo năm, theo mẫu xe)
+
+    Args:
+        df: DataFrame bài đăng với brand, model_normalized, reg_year_numeric, mileage_numeric, price_numeric
+
+    Returns:
+        DataFrame: brand, model, reg_year, km_bucket, listing_count, cdf (bytes của mảng uint16 N_BINS phần tử)
+    """
+    data = df[["brand", "model_normalized", "reg_year_numeric", "mileage_numeric", "price_numeric"]].dropna()
+    data = data[data["price_numeric"] > 0]
+    if data.empty:
+        return pd.DataFrame(columns=["brand", "model", "reg_year", "km_bucket", "listing_count", "cdf"])
+
+    keys = pd.DataFrame({
+        "brand": data["brand"].to_numpy(),
+        "model": data["model_normalized"].to_numpy(),
+        "reg_year": data["reg_year_numeric"].to_numpy().astype(int),
+        "km_bucket": km_bucket(data["mileage_numeric"].to_numpy()),
+    })
+    bins = price_bin(data["price_numeric"].to_numpy(dtype=float))
+
+    levels = [
+        keys,
+        keys.assign(km_bucket=ALL),
+        keys.assign(reg_year=ALL, km_bucket=ALL),
+    ]
+    frames = []
+    for level in levels:
+        # Đánh số nhóm rồi đếm (nhóm, bin) bằng một lần bincount
+        group_ids, groups = pd.MultiIndex.from_frame(level).factorize()
+        counts = np.bincount(group_ids * N_BINS + bins, minlength=len(groups) * N_BINS)
+        counts = counts.reshape(len(groups), N_BINS)
+        cdf = _midpoint_cdf(counts)
+
+        frame = groups.to_frame(index=False, name=list(level.columns))
+        frame["listing_count"] = counts.sum(axis=1)
+        frame["cdf"] = [row.tobytes() for row in cdf]
+        frames.append(frame)
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def store_price_sketches(conn, df):
+    """
+    Tính và lưu phân phối giá vào bảng price_sketches (thay thế dữ liệu cũ)
+
+    Returns:
+        int: Số nhóm đã lưu
+    """
+    sketches = build_price_sketches(df)
+    conn.execute(f"DROP TABLE IF EXISTS {SKETCH_TABLE}")
+    conn.execute(f"""
+        CREATE TABLE {SKETCH_TABLE} (
+            brand TEXT NOT NULL,
+            model TEXT NOT NULL,
+            reg_year INTEGER NOT NULL,
+            km_bucket INTEGER NOT NULL,
+            listing_count INTEGER NOT NULL,
+            cdf BLOB NOT NULL,
+            PRIMARY KEY (brand, model, reg_year, km_bucket)
+        )
+    """)
+    conn.executemany(
+        f"INSERT INTO {SKETCH_TABLE} (brand, model, reg_year, km_bucket, listing_count, cdf) VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            (brand, model, int(reg_year), int(bucket), int(count), cdf)
+            for brand, model, reg_year, bucket, count, cdf in sketches.itertuples(index=False)
+        )
+    )
+    conn.commit()
+    return len(sketches)
+
+
+class PriceSketchIndex:
+    """
+    Phân phối giá của mọi nhóm được giữ trong bộ nhớ để tra phân vị của một mức giá
+    """
+    def __init__(self, rows=()):
+        """
+        Args:
+            rows: Các dòng (brand, model, reg_year, km_bucket, listing_count, cdf) của bảng price_sketches
+        """
+        self._sketches = {
+            (brand, model, reg_year, bucket): (listing_count, np.frombuffer(cdf, dtype=np.uint16))
+            for brand, model, reg_year, bucket, listing_count, cdf in rows
+        }
+
+    @classmethod
+    def from_connection(cls, conn):
+        """Đọc toàn bộ bảng price_sketches (rỗng nếu database chưa có bảng này)"""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SKETCH_TABLE,)
+        ).fetchone()
+        if not exists:
+            logger.warning(f"Database chưa có bảng {SKETCH_TABLE}")
+            return cls()
+        rows = conn.execute(
+            f"SELECT brand, model, reg_year, km_bucket, listing_count, cdf FROM {SKETCH_TABLE}"
+        ).fetchall()
+        return cls(tuple(row) for row in rows)
+
+    def percentile(self, brand, model, year, mileage, price):
+        """
+        Phân vị của một mức giá trong phân phối giá của mẫu xe
+
+        Dùng nhóm chi tiết nhất (năm + nhóm km, rồi chỉ năm, rồi cả mẫu xe) có ít nhất MIN_LISTINGS tin đăng.
+
+        Returns:
+            dict: percentile (0-100), listing_count, reg_year (hoặc None), km_label (hoặc None);
+                  None nếu không có dữ liệu cho mẫu xe
+        """
+        bucket = int(km_bucket(mileage)) if mileage is not None else ALL
+        year = int(year) if year is not None else ALL
+        candidates = [(year, bucket), (year, ALL), (ALL, ALL)]
+
+        chosen = None
+        for reg_year, km in candidates:
+            sketch = self._sketches.get((brand, model, reg_year, km))
+            if sketch is None:
+                continue
+            chosen = (reg_year, km, sketch)
+            if sketch[0] >= MIN_LISTINGS:
+                break
+        if chosen is None:
+            return None
+
+        reg_year, km, (listing_count, cdf) = chosen
+        return {
+            "percentile": cdf[price_bin(price)] / 100,
+            "listing_count": listing_count,
+            "reg_year": reg_year if reg_year != ALL else None,
+            "km_label": KM_LABELS[km] if km != ALL else None,
+        }
+
+    def __len__(self):
+        return len(self._sketches)
@@ -0,0 +1,259 @@
+# utils/price_trend.py
+import logging
+import pandas as pd
+
+# Thiết lập logging
+logger = logging.getLogger(__name__)
+
+# Bảng giữ mỗi bài đăng đã thấy một dòng (giữ lại cả bài đã bị gỡ) và bảng chuỗi thời gian đã gộp
+OBSERVATIONS_TABLE = "price_observations"
+TREND_TABLE = "price_trends"
+
+# Giá trị mẫu xe của dòng gộp cả thương hiệu
+ALL_MODELS = ""
+
+# Độ chi tiết của chuỗi thời gian -> tần suất Period của pandas (tuần bắt đầu từ thứ Hai)
+GRANULARITIES = {"month": "M", "week": "W-SUN"}
+
+TREND_COLUMNS = ["granularity", "period_start", "brand", "model", "listing_count", "price_mean", "price_median"]
+
+
+def ensure_trend_tables(conn):
+    """Tạo bảng price_observations và price_trends nếu chưa có (không xóa dữ liệu cũ)"""
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {OBSERVATIONS_TABLE} (
+            url_full TEXT PRIMARY KEY,
+            post_date TEXT NOT NULL,
+            brand TEXT NOT NULL,
+            model TEXT NOT NULL,
+            price INTEGER NOT NULL
+        )
+    """)
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_observations_brand_date ON {OBSERVATIONS_TABLE}(brand, post_date)")
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {TREND_TABLE} (
+            granularity TEXT NOT NULL,
+            period_start TEXT NOT NULL,
+            brand TEXT NOT NULL,
+            model TEXT NOT NULL,
+            listing_count INTEGER NOT NULL,
+            price_mean REAL NOT NULL,
+            price_median REAL NOT NULL,
+            PRIMARY KEY (granularity, period_start, brand, model)
+        )
+    """)
+
+
+def _observations(df):
+    """Chuẩn hóa một đợt dữ liệu thành các dòng (url_full, post_date, brand, model, price)"""
+    url = df["url_full"] if "url_full" in df.columns else df.get("url")
+    if url is None or "post_date" not in df.columns:
+        return pd.DataFrame(columns=["url_full", "post_date", "brand", "model", "price"])
+
+    model = df["model_normalized"] if "model_normalized" in df.columns else pd.Series(None, index=df.index)
+    batch = pd.DataFrame({
+        "url_full": url,
+        "post_date": pd.to_datetime(df["post_date"], errors="coerce").dt.normalize(),
+        "brand": df["brand"],
+        "model": model.astype("string").fillna(ALL_MODELS),
+        "price": pd.to_numeric(df["price_numeric"], errors="coerce"),
+    }).dropna(subset=["url_full", "post_date", "brand", "price"])
+    batch = batch[batch["price"] > 0].drop_duplicates("url_full", keep="last")
+    batch["post_date"] = batch["post_date"].dt.strftime("%Y-%m-%d")
+    batch["price"] = batch["price"].astype("int64")
+    batch["brand"] = batch["brand"].astype(str)
+    batch["model"] = batch["model"].astype(str)
+    return batch.reset_index(drop=True)
+
+
+def _period_starts(dates, granularity):
+    """Ngày bắt đầu (YYYY-MM-DD) của tháng/tuần chứa mỗi ngày"""
+    periods = pd.to_datetime(dates).dt.to_period(GRANULARITIES[granularity])
+    return periods.dt.start_time.dt.strftime("%Y-%m-%d")
+
+
+def rollup_trends(observations, granularity):
+    """
+    Gộp giá theo kỳ × thương hiệu × mẫu xe và theo kỳ × thương hiệu
+
+    Args:
+        observations: DataFrame với post_date, brand, model, price (VND)
+        granularity (str): "month" hoặc "week"
+
+    Returns:
+        DataFrame: các cột TREND_COLUMNS, giá tính bằng triệu VND
+    """
+    if observations.empty:
+        return pd.DataFrame(columns=TREND_COLUMNS)
+    data = pd.DataFrame({
+        "period_start": _period_starts(observations["post_date"], granularity).to_numpy(),
+        "brand": observations["brand"].to_numpy(),
+        "model": observations["model"].to_numpy(),
+        "price": observations["price"].to_numpy(dtype=float) / 1_000_000,
+    })
+
+    frames = []
+    for level in (data, data.assign(model=ALL_MODELS)):
+        frame = level.groupby(["period_start", "brand", "model"], sort=True)["price"].agg(
+            listing_count="size", price_mean="mean", price_median="median"
+        ).reset_index()
+        frames.append(frame)
+
+    # Mẫu xe không rõ tên chỉ nằm trong dòng gộp của thương hiệu
+    trends = pd.concat(frames, ignore_index=True).drop_duplicates(["period_start", "brand", "model"], keep="last")
+    trends.insert(0, "granularity", granularity)
+    trends[["price_mean", "price_median"]] = trends[["price_mean", "price_median"]].round(2)
+    return trends[TREND_COLUMNS].reset_index(drop=True)
+
+
+def update_price_trends(conn, df):
+    """
+    Cập nhật chuỗi thời gian giá với một đợt dữ liệu mới
+
+    Bài đăng được lưu theo url_full nên bài đã thấy ở các đợt trước không bị đếm lại (giữ ngày đăng lần đầu,
+    cập nhật giá/mẫu xe nếu đổi), và bài đã bị gỡ khỏi đợt mới vẫn nằm trong lịch sử. Chỉ các kỳ × thương hiệu có bài đăng mới hoặc thay đổi mới được
+    tính lại; các kỳ khác giữ nguyên.
+
+    Args:
+        conn: Kết nối SQLite đến cơ sở dữ liệu
+        df: DataFrame bài đăng với url_full, post_date, brand, model_normalized, price_numeric
+
+    Returns:
+        dict: new_listings, changed_listings, updated_groups (số kỳ × thương hiệu được tính lại)
+    """
+    ensure_trend_tables(conn)
+    batch = _observations(df)
+    if batch.empty:
+        return {"new_listings": 0, "changed_listings": 0, "updated_groups": 0}
+
+    # So sánh với các bài đăng đã thấy để tìm bài mới hoặc thay đổi (kèm giá trị cũ để tính lại kỳ cũ)
+    conn.execute("CREATE TEMP TABLE batch_urls (url_full TEXT PRIMARY KEY)")
+    try:
+        conn.executemany("INSERT INTO batch_urls VALUES (?)", ((url,) for url in batch["url_full"]))
+        previous = pd.read_sql_query(f"""
+            SELECT o.url_full, o.post_date, o.brand, o.model, o.price
+            FROM {OBSERVATIONS_TABLE} o JOIN batch_urls USING (url_full)
+        """, conn)
+    finally:
+        conn.execute("DROP TABLE batch_urls")
+
+    merged = batch.merge(previous, on="url_full", how="left", suffixes=("", "_old"), indicator=True)
+    is_new = merged["_merge"] == "left_only"
+    is_changed = ~is_new & (
+        (merged["brand"] != merged["brand_old"]) | (merged["model"] != merged["model_old"])
+        | (merged["price"] != merged["price_old"])
+    )
+    # Ngày đăng được suy ra từ "Đăng N ngày trước" nên xê dịch giữa các đợt; giữ ngày của lần thấy đầu tiên
+    merged["post_date"] = merged["post_date_old"].where(~is_new, merged["post_date"])
+    changed = merged[is_new | is_changed]
+    if changed.empty:
+        return {"new_listings": 0, "changed_listings": 0, "updated_groups": 0}
+
+    # Các (ngày, thương hiệu) bị ảnh hưởng, gồm cả vị trí cũ của bài đăng bị sửa
+    touched = pd.concat([
+        changed[["post_date", "brand"]],
+        merged.loc[is_changed, ["post_date_old", "brand_old"]].set_axis(["post_date", "brand"], axis=1),
+    ], ignore_index=True)
+
+    conn.executemany(
+        f"""
+        INSERT INTO {OBSERVATIONS_TABLE} (url_full, post_date, brand, model, price) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(url_full) DO UPDATE SET brand = excluded.brand, model = excluded.model, price = excluded.price
+        """,
+        changed[["url_full", "post_date", "brand", "model", "price"]].itertuples(index=False, name=None)
+    )
+
+    updated_groups = 0
+    for granularity in GRANULARITIES:
+        dirty = pd.DataFrame({
+            "period_start": _period_starts(touched["post_date"], granularity).to_numpy(),
+            "brand": touched["brand"].to_numpy(),
+        }).drop_duplicates()
+        updated_groups += len(dirty)
+
+        # Đọc lại lịch sử của các thương hiệu bị ảnh hưởng trong khoảng kỳ cần tính
+        end = (pd.to_datetime(dirty["period_start"]).max().to_period(GRANULARITIES[granularity]) + 1).start_time
+        placeholders = ", ".join("?" for _ in dirty["brand"].unique())
+        history = pd.read_sql_query(
+            f"""
+            SELECT post_date, brand, model, price FROM {OBSERVATIONS_TABLE}
+            WHERE brand IN ({placeholders}) AND post_date >= ? AND post_date < ?
+            """,
+            conn,
+            params=[*dirty["brand"].unique(), dirty["period_start"].min(), end.strftime("%Y-%m-%d")],
+        )
+        trends = rollup_trends(history, granularity).merge(dirty, on=["period_start", "brand"])
+
+        conn.executemany(
+            f"DELETE FROM {TREND_TABLE} WHERE granularity = ? AND period_start = ? AND brand = ?",
+            ((granularity, period_start, brand) for period_start, brand in dirty.itertuples(index=False))
+        )
+        conn.executemany(
+            f"INSERT INTO {TREND_TABLE} ({', '.join(TREND_COLUMNS)}) VALUES ({', '.join('?' for _ in TREND_COLUMNS)})",
+            trends.astype(object).itertuples(index=False, name=None)
+        )
+    conn.commit()
+
+    return {
+        "new_listings": int(is_new.sum()),
+        "changed_listings": int(is_changed.sum()),
+        "updated_groups": updated_groups,
+    }
+
+
+def load_price_trends(conn, granularity="month", periods=12, brand=None):
+    """
+    Đọc chuỗi thời gian giá của các kỳ gần nhất
+
+    Args:
+        conn: Kết nối SQLite đến cơ sở dữ liệu
+        granularity (str): "month" hoặc "week"
+        periods (int): Số kỳ gần nhất (tính từ kỳ mới nhất có dữ liệu)
+        brand (str, optional): None để lấy dòng gộp của mọi thương hiệu, hoặc tên thương hiệu để lấy các mẫu xe
+
+    Returns:
+        DataFrame: period_start (datetime), brand, model, listing_count, price_mean, price_median
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (TREND_TABLE,)
+    ).fetchone()
+    if not exists:
+        logger.warning(f"Database chưa có bảng {TREND_TABLE}")
+        return pd.DataFrame(columns=TREND_COLUMNS[1:])
+
+    if brand is None:
+        condition, params = "model = ?", [ALL_MODELS]
+    else:
+        condition, params = "brand = ? AND model != ?", [brand, ALL_MODELS]
+    trends = pd.read_sql_query(
+        f"""
+        SELECT period_start, brand, model, listing_count, price_mean, price_median
+        FROM {TREND_TABLE}
+        WHERE granularity = ? AND {condition} AND period_start IN (
+            SELECT DISTINCT period_start FROM {TREND_TABLE} WHERE granularity = ?
+            ORDER BY period_start DESC LIMIT ?
+        )
+        ORDER BY period_start
+        """,
+        conn,
+        params=[granularity, *params, granularity, periods],
+    )
+    trends["period_start"] = pd.to_datetime(trends["period_start"])
+    return trends
+
+
+def trend_series(trends, metric="price_median", limit=5):
+    """
+    Bảng rộng để vẽ: mỗi cột là một thương hiệu/mẫu xe (nhiều tin đăng nhất trước), mỗi dòng một kỳ
+
+    Args:
+        trends: Kết quả của load_price_trends
+        metric (str): "price_median" hoặc "price_mean"
+        limit (int): Số đường tối đa
+    """
+    if trends.empty:
+        return pd.DataFrame()
+    label = trends["model"].where(trends["model"] != ALL_MODELS, trends["brand"])
+    data = trends.assign(label=label)
+    top = data.groupby("label")["listing_count"].sum().sort_values(ascending=False, kind="stable").index[:limit]
+    return data[data["label"].isin(top)].pivot(index="period_start", columns="label", values=metric)[list(top)]
@@ -0,0 +1,304 @@
+# utils/result_cache.py
+import atexit
+import os
+import sqlite3
+import pickle
+import hashlib
+import threading
+import functools
+import logging
+import json
+import time
+from config import RESULT_CACHE_DIR, RESULT_CACHE_MAX_MB
+
+# Thiết lập logging
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """
+    Cache kết quả truy vấn lưu trên đĩa (SQLite), dùng chung cho mọi tiến trình trên cùng máy
+
+    Mỗi mục được lưu dưới dạng pickle kèm thời điểm truy cập gần nhất. Khi tổng dung lượng
+    vượt quá max_bytes, các mục lâu không dùng nhất (LRU) sẽ bị xóa.
+
+    Đọc cache chỉ là một câu SELECT: số hit/miss và thời điểm truy cập được giữ trong bộ nhớ
+    của tiến trình và ghi xuống file theo lô (mỗi flush_interval giây, khi ghi mục mới hoặc khi
+    lấy thống kê), nên các tiến trình không tranh khóa ghi của SQLite khi chỉ đọc. Tổng dung lượng
+    được cộng dồn trong bảng stats khi ghi/xóa, không phải tính SUM(size) mỗi lần ghi.
+    """
+    FILENAME = "result_cache.sqlite"
+
+    def __init__(self, cache_dir, max_bytes=256 * 1024 * 1024, flush_interval=10.0):
+        """
+        Khởi tạo cache
+
+        Args:
+            cache_dir (str): Thư mục chứa file cache
+            max_bytes (int): Dung lượng tối đa của các giá trị trong cache
+            flush_interval (float): Khoảng thời gian tối đa (giây) giữ số liệu truy cập trong bộ nhớ
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, self.FILENAME)
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self._local = threading.local()
+
+        # Số liệu truy cập chưa ghi xuống file
+        self._pending_lock = threading.Lock()
+        self._pending_access = {}
+        self._pending_counts = {"hits": 0, "misses": 0}
+        self._last_flush = time.monotonic()
+
+        conn = self._connect()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access);
+            CREATE TABLE IF NOT EXISTS stats (
+                name TEXT PRIMARY KEY,
+                count INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO stats (name, count) VALUES ('hits', 0), ('misses', 0), ('evictions', 0);
+            INSERT OR IGNORE INTO stats (name, count) SELECT 'size_bytes', COALESCE(SUM(size), 0) FROM entries;
+        """)
+
+    def _connect(self):
+        """Lấy kết nối SQLite riêng cho luồng hiện tại"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _increment(self, conn, name, amount=1):
+        conn.execute("UPDATE stats SET count = count + ? WHERE name = ?", (amount, name))
+
+    def get(self, key):
+        """
+        Đọc một mục từ cache
+
+        Args:
+            key (str): Khóa cache
+
+        Returns:
+            tuple: (found, value) - found là False nếu không có trong cache
+        """
+        row = self._connect().execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        self._record_access(key if row is not None else None)
+        if row is None:
+            return False, None
+
+        try:
+            return True, pickle.loads(row[0])
+        except Exception as e:
+            logger.warning(f"Không đọc được mục cache {key}: {str(e)}")
+            self.delete(key)
+            return False, None
+
+    def _record_access(self, key):
+        """Ghi nhận một hit (key) hoặc miss (None) trong bộ nhớ, flush khi đã quá flush_interval"""
+        with self._pending_lock:
+            if key is None:
+                self._pending_counts["misses"] += 1
+            else:
+                self._pending_counts["hits"] += 1
+                self._pending_access[key] = time.time()
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def _take_pending(self):
+        with self._pending_lock:
+            access, counts = self._pending_access, self._pending_counts
+            self._pending_access, self._pending_counts = {}, {"hits": 0, "misses": 0}
+            self._last_flush = time.monotonic()
+        return access, counts
+
+    def _write_pending(self, conn, access, counts):
+        if access:
+            conn.executemany(
+                "UPDATE entries SET last_access = MAX(last_access, ?) WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in access.items()]
+            )
+        for name, amount in counts.items():
+            if amount:
+                self._increment(conn, name, amount)
+
+    def flush(self):
+        """Ghi số hit/miss và thời điểm truy cập đang giữ trong bộ nhớ xuống file trong một transaction"""
+        access, counts = self._take_pending()
+        if not access and not any(counts.values()):
+            return
+        conn = self._connect()
+        with conn:
+            self._write_pending(conn, access, counts)
+
+    def set(self, key, value):
+        """
+        Ghi một mục vào cache và xóa bớt các mục cũ nếu vượt quá dung lượng
+
+        Args:
+            key (str): Khóa cache
+            value: Giá trị cần lưu (phải pickle được)
+        """
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            logger.info(f"Bỏ qua mục cache {key}: {len(blob):,} bytes vượt quá giới hạn")
+            return
+
+        # Ghi kèm số liệu truy cập đang chờ, để thứ tự LRU dùng khi xóa bớt là mới nhất
+        access, counts = self._take_pending()
+        conn = self._connect()
+        with conn:
+            self._write_pending(conn, access, counts)
+            previous = conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time())
+            )
+            self._increment(conn, "size_bytes", len(blob) - (previous[0] if previous else 0))
+            self._evict(conn)
+
+    def _evict(self, conn):
+        """Xóa các mục ít được dùng gần đây nhất cho đến khi tổng dung lượng <= max_bytes"""
+        total_size = conn.execute("SELECT count FROM stats WHERE name = 'size_bytes'").fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+
+        evicted = 0
+        freed = 0
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            if total_size - freed <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            freed += size
+            evicted += 1
+        self._increment(conn, "size_bytes", -freed)
+        self._increment(conn, "evictions", evicted)
+
+    def delete(self, key):
+        """Xóa một mục khỏi cache"""
+        conn = self._connect()
+        with conn:
+            row = conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._increment(conn, "size_bytes", -row[0])
+
+    def clear(self):
+        """Xóa toàn bộ cache và đặt lại thống kê"""
+        self._take_pending()
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM entries")
+            conn.execute("UPDATE stats SET count = 0")
+
+    def stats(self):
+        """
+        Thống kê cache (cộng dồn cho mọi tiến trình dùng chung thư mục cache, tính đến lần flush
+        gần nhất của mỗi tiến trình)
+
+        Returns:
+            dict: hits, misses, evictions, hit_rate, entries, size_bytes, max_bytes
+        """
+        self.flush()
+        conn = self._connect()
+        counters = dict(conn.execute("SELECT name, count FROM stats").fetchall())
+        entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        size_bytes = counters.get("size_bytes", 0)
+        lookups = counters.get("hits", 0) + counters.get("misses", 0)
+        return {
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "evictions": counters.get("evictions", 0),
+            "hit_rate": round(counters.get("hits", 0) / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": size_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+def make_cache_key(namespace, data_version, args, kwargs):
+    """
+    Tạo khóa cache từ tên nhóm, phiên bản dữ liệu và tham số gọi hàm
+
+    Returns:
+        str: "<namespace>:<data_version>:<sha256 của tham số>"
+    """
+    params = repr((args, sorted(kwargs.items())))
+    digest = hashlib.sha256(params.encode("utf-8")).hexdigest()
+    return f"{namespace}:{data_version}:{digest}"
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """
+    Lấy cache dùng chung theo cấu hình RESULT_CACHE_DIR / RESULT_CACHE_MAX_MB
+
+    Returns:
+        ResultCache hoặc None nếu cache bị tắt (RESULT_CACHE_DIR rỗng) hoặc không khởi tạo được
+    """
+    global _cache
+    if not RESULT_CACHE_DIR:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    _cache = ResultCache(RESULT_CACHE_DIR, RESULT_CACHE_MAX_MB * 1024 * 1024)
+                    # Ghi nốt số liệu truy cập còn trong bộ nhớ khi tiến trình kết thúc
+                    atexit.register(_cache.flush)
+                except Exception as e:
+                    logger.error(f"Không thể khởi tạo cache trên đĩa tại {RESULT_CACHE_DIR}: {str(e)}")
+                    return None
+    return _cache
+
+
+def disk_cached(namespace, should_cache=lambda value: value is not None):
+    """
+    Decorator cache kết quả hàm trên đĩa. Tham số đầu tiên của hàm phải là phiên bản dữ liệu.
+
+    Args:
+        namespace (str): Tên nhóm cache (thường là tên truy vấn)
+        should_cache (callable): Hàm quyết định có lưu kết quả hay không (ví dụ bỏ qua kết quả lỗi)
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(data_version, *args, **kwargs):
+            cache = get_result_cache()
+            if cache is None or data_version is None:
+                return func(data_version, *args, **kwargs)
+
+            key = make_cache_key(namespace, data_version, args, kwargs)
+            try:
+                found, value = cache.get(key)
+                if found:
+                    return value
+            except sqlite3.Error as e:
+                logger.warning(f"Lỗi khi đọc cache trên đĩa: {str(e)}")
+
+            value = func(data_version, *args, **kwargs)
+            if should_cache(value):
+                try:
+                    cache.set(key, value)
+                except sqlite3.Error as e:
+                    logger.warning(f"Lỗi khi ghi cache trên đĩa: {str(e)}")
+            return value
+        return wrapper
+    return decorator
+
+
+if __name__ == "__main__":
+    # In thống kê cache: python -m utils.result_cache
+    cache = get_result_cache()
+    print(json.dumps(cache.stats() if cache else {"enabled": False}, indent=2))
@@ -0,0 +1,199 @@
+# utils/spec_matrix.py
+import logging
+import numpy as np
+import pandas as pd
+
+# Thiết lập logging
+logger = logging.getLogger(__name__)
+
+# Số xe tối đa trong một lần so sánh
+MAX_COMPARE_BIKES = 10
+
+# Thông số trung bình các phiên bản của nhiều mẫu xe trong một truy vấn; {pairs} là danh sách (?, ?)
+SPEC_QUERY = """
+    SELECT
+        brand, model, 'Trung bình các phiên bản' AS variant,
+        AVG(engine_cc) AS engine_cc,
+        AVG(price_new) AS price_new,
+        AVG(avg_price_used) AS avg_price_used,
+        AVG(fuel_consumption) AS fuel_consumption,
+        AVG(horsepower) AS horsepower,
+        AVG(torque) AS torque,
+        AVG(weight) AS weight,
+        AVG(fuel_capacity) AS fuel_capacity,
+        MIN(year_start) AS year_start,
+        MAX(year_end) AS year_end,
+        MIN(segment) AS segment,
+        MIN(transmission) AS transmission
+    FROM motorbikes
+    WHERE (brand, model) IN (VALUES {pairs})
+    GROUP BY brand, model
+"""
+
+NUMERIC_COLUMNS = [
+    "engine_cc", "price_new", "avg_price_used", "fuel_consumption",
+    "horsepower", "torque", "weight", "fuel_capacity", "year_start", "year_end",
+]
+
+# Thang điểm: cột -> (điểm tối đa, giá trị cao hơn là tốt hơn)
+SCORE_POINTS = {
+    "horsepower": (15, True),
+    "torque": (15, True),
+    "weight": (10, False),
+    "adjusted_price": (15, False),
+    "fuel_consumption": (15, False),
+    "fuel_capacity": (5, True),
+}
+# Điểm tiện nghi cơ bản theo phân khúc (các phân khúc khác tính như xe số)
+SEGMENT_CONVENIENCE = {"Xe tay ga": 25, "Xe côn tay": 20}
+DEFAULT_CONVENIENCE = 15
+
+# Giả định chi phí: đi khoảng 10,000 km/năm, giá xăng 25,000 VND/lít, bảo dưỡng 5% giá xe mỗi năm
+KM_PER_YEAR = 10_000
+FUEL_PRICE = 25_000
+MAINTENANCE_RATE = 0.05
+OWNERSHIP_YEARS = 3
+COST_COLUMNS = ["purchase", "fuel_per_year", "maintenance_per_year", "total_3yr"]
+
+# Thông số của biểu đồ radar, weight và fuel_consumption thấp hơn là tốt hơn
+RADAR_ATTRIBUTES = ["engine_cc", "horsepower", "torque", "weight", "fuel_capacity", "fuel_consumption"]
+RADAR_LOWER_IS_BETTER = np.array([False, False, False, True, False, True])
+
+
+def bike_label(brand, model):
+    """Tên hiển thị của một mẫu xe"""
+    return f"{brand} {model}"
+
+
+def fetch_bike_specs(conn, bikes):
+    """
+    Lấy thông số của nhiều mẫu xe bằng một truy vấn IN (...)
+
+    Args:
+        conn: Kết nối database
+        bikes: Danh sách (brand, model), tối đa MAX_COMPARE_BIKES
+
+    Returns:
+        DataFrame: Mỗi dòng một mẫu xe theo đúng thứ tự đã chọn (bỏ qua mẫu xe không có dữ liệu),
+                   index là tên xe, có thêm cột adjusted_price
+    """
+    bikes = list(dict.fromkeys(tuple(bike) for bike in bikes))[:MAX_COMPARE_BIKES]
+    if not bikes:
+        return pd.DataFrame()
+
+    query = SPEC_QUERY.format(pairs=", ".join(["(?, ?)"] * len(bikes)))
+    params = [value for bike in bikes for value in bike]
+    specs = pd.read_sql_query(query, conn, params=params)
+
+    # Sắp xếp lại theo thứ tự người dùng chọn
+    specs = specs.set_index(["brand", "model"]).reindex(bikes).dropna(how="all").reset_index()
+    missing = len(bikes) - len(specs)
+    if missing:
+        logger.warning(f"Không tìm thấy thông số của {missing} mẫu xe")
+
+    specs[NUMERIC_COLUMNS] = specs[NUMERIC_COLUMNS].apply(pd.to_numeric, errors="coerce").fillna(0.0)
+    specs["adjusted_price"] = specs["avg_price_used"]
+    specs.index = [bike_label(brand, model) for brand, model in zip(specs["brand"], specs["model"])]
+    return specs
+
+
+def _relative_scores(matrix, points, higher_is_better):
+    """
+    Chuẩn hóa từng cột của ma trận thông số theo xe tốt nhất
+
+    Cột "cao hơn là tốt hơn" chấm value / max, cột còn lại chấm min / value, rồi nhân với điểm tối đa.
+    Cột không chuẩn hóa được (max hoặc min <= 0) cho mọi xe nửa số điểm.
+    """
+    best_high = matrix.max(axis=0)
+    best_low = matrix.min(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(higher_is_better, matrix / best_high, best_low / matrix)
+    valid = np.where(higher_is_better, best_high > 0, best_low > 0)
+    return np.where(valid, ratio, 0.5) * points
+
+
+def score_matrix(specs):
+    """
+    Chấm điểm tất cả xe cùng lúc (thang 100: hiệu suất 40, chi phí 30, tiện nghi 30)
+
+    Returns:
+        DataFrame: Index là tên xe; các cột điểm thành phần, performance, cost, convenience, total
+                   và điểm theo mục đích sử dụng daily, travel, sport
+    """
+    columns = list(SCORE_POINTS)
+    points = np.array([SCORE_POINTS[col][0] for col in columns], dtype=float)
+    higher = np.array([SCORE_POINTS[col][1] for col in columns])
+    scores = pd.DataFrame(
+        _relative_scores(specs[columns].to_numpy(dtype=float), points, higher),
+        index=specs.index, columns=columns
+    )
+
+    segment = specs["segment"].map(SEGMENT_CONVENIENCE).fillna(DEFAULT_CONVENIENCE)
+    scores["performance"] = scores["horsepower"] + scores["torque"] + scores["weight"]
+    scores["cost"] = scores["adjusted_price"] + scores["fuel_consumption"]
+    scores["convenience"] = segment + scores["fuel_capacity"]
+    scores["total"] = scores["performance"] + scores["cost"] + scores["convenience"]
+
+    scores["daily"] = scores["fuel_consumption"] * 1.5 + scores["adjusted_price"] * 1.2
+    scores["travel"] = scores["horsepower"] + scores["fuel_capacity"] * 2 + scores["convenience"]
+    scores["sport"] = scores["horsepower"] * 1.5 + scores["torque"] * 1.5 + scores["weight"]
+    return scores
+
+
+def ownership_costs(specs):
+    """
+    Chi phí sở hữu của tất cả xe bằng một phép nhân ma trận [giá, tiêu thụ nhiên liệu] x hệ số
+
+    Returns:
+        DataFrame: Index là tên xe; purchase, fuel_per_year, maintenance_per_year, total_3yr (triệu VND)
+    """
+    # Triệu VND/năm cho mỗi L/100km
+    fuel_rate = KM_PER_YEAR / 100 * FUEL_PRICE / 1_000_000
+    coefficients = np.array([
+        # purchase, fuel/năm, bảo dưỡng/năm, tổng OWNERSHIP_YEARS năm
+        [1.0, 0.0, MAINTENANCE_RATE, 1.0 + MAINTENANCE_RATE * OWNERSHIP_YEARS],  # adjusted_price
+        [0.0, fuel_rate, 0.0, fuel_rate * OWNERSHIP_YEARS],  # fuel_consumption
+    ])
+    matrix = specs[["adjusted_price", "fuel_consumption"]].to_numpy(dtype=float)
+    return pd.DataFrame(matrix @ coefficients, index=specs.index, columns=COST_COLUMNS)
+
+
+def radar_matrix(specs):
+    """
+    Chuẩn hóa thông số về [0, 1] cho biểu đồ radar (1 là tốt nhất trong nhóm xe so sánh)
+
+    Returns:
+        ndarray: Ma trận (số xe, len(RADAR_ATTRIBUTES))
+    """
+    values = specs[RADAR_ATTRIBUTES].to_numpy(dtype=float)
+    max_values = values.max(axis=0)
+    min_values = values.min(axis=0) * 0.5
+
+    # Đảo chiều các thông số thấp hơn là tốt hơn
+    values = np.where(RADAR_LOWER_IS_BETTER, max_values - values + min_values, values)
+    max_values = np.where(RADAR_LOWER_IS_BETTER, values.max(axis=0), max_values)
+    min_values = np.where(RADAR_LOWER_IS_BETTER, values.min(axis=0), min_values)
+
+    span = max_values - min_values
+    with np.errstate(divide="ignore", invalid="ignore"):
+        normalized = (values - min_values) / span
+    return np.where(span != 0, normalized, 0.5)
+
+
+def advantages_matrix(specs):
+    """
+    Ưu điểm rõ rệt (chênh lệch trên 10%) của mỗi xe so với trung bình các xe còn lại
+
+    Returns:
+        DataFrame: Index là tên xe, mỗi cột là một ưu điểm (True/False)
+    """
+    columns = ["horsepower", "fuel_consumption", "adjusted_price", "weight", "fuel_capacity"]
+    values = specs[columns].to_numpy(dtype=float)
+    n = len(values)
+    if n < 2:
+        return pd.DataFrame(False, index=specs.index, columns=columns)
+    others = (values.sum(axis=0) - values) / (n - 1)
+
+    higher = np.array([True, False, False, False, True])
+    flags = np.where(higher, values > others * 1.1, values < others * 0.9)
+    return pd.DataFrame(flags, index=specs.index, columns=columns)
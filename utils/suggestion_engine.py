@@ -0,0 +1,163 @@
+# utils/suggestion_engine.py
+import logging
+import numpy as np
+import pandas as pd
+
+# Thiết lập logging
+logger = logging.getLogger(__name__)
+
+# Một truy vấn duy nhất lấy toàn bộ phiên bản xe cùng thông số dùng để lọc và xếp hạng
+SUGGESTION_QUERY = """
+    SELECT
+        brand, model, variant, engine_cc,
+        price_new, avg_price_used,
+        segment, abs, transmission,
+        fuel_consumption, brake_front,
+        horsepower, torque, weight, fuel_capacity
+    FROM motorbikes
+"""
+
+# Các cột hiển thị trong bảng gợi ý
+RESULT_COLUMNS = [
+    "brand", "model", "variant", "engine_cc", "price_new", "avg_price_used",
+    "segment", "abs", "transmission", "fuel_consumption",
+]
+SPEC_COLUMNS = RESULT_COLUMNS + ["brake_front", "horsepower", "torque", "weight", "fuel_capacity"]
+NUMERIC_COLUMNS = ["engine_cc", "price_new", "avg_price_used", "fuel_consumption", "horsepower", "torque", "weight", "fuel_capacity"]
+
+# Thứ tự xếp hạng theo mục đích sử dụng: danh sách (cột, tăng dần), cột đầu tiên ưu tiên nhất
+PURPOSE_ORDER = {
+    "Đi lại hàng ngày": [("fuel_consumption", True), ("avg_price_used", True)],
+    "Đi phố": [("weight", True), ("avg_price_used", True)],
+    "Đi xa": [("fuel_capacity", False), ("avg_price_used", True)],
+    "Thể thao": [("horsepower", False), ("torque", False)],
+}
+
+TOP_K = 10
+
+
+def _rank(frame, order):
+    """
+    Thứ hạng của mỗi dòng theo thứ tự nhiều cột (giống ORDER BY), giá trị thiếu xếp cuối
+
+    Returns:
+        ndarray: Thứ hạng 0..n-1 (int32), nhỏ hơn là tốt hơn
+    """
+    keys = []
+    for column, ascending in order:
+        values = frame[column].to_numpy(dtype=float)
+        values = values if ascending else -values
+        keys.append(np.where(np.isnan(values), np.inf, values))
+    # np.lexsort dùng khóa cuối cùng làm khóa chính
+    ordering = np.lexsort(keys[::-1])
+    ranks = np.empty(len(frame), dtype=np.int32)
+    ranks[ordering] = np.arange(len(frame), dtype=np.int32)
+    return ranks
+
+
+class SuggestionEngine:
+    """
+    Bảng thông số các phiên bản xe dạng cột trong bộ nhớ, lọc bằng mask và xếp hạng theo mục đích sử dụng
+    """
+    def __init__(self, specs=None):
+        """
+        Khởi tạo từ DataFrame kết quả SUGGESTION_QUERY; thứ hạng của mọi mục đích được tính sẵn
+
+        Args:
+            specs: DataFrame thông số (None là bảng rỗng)
+        """
+        if specs is None:
+            specs = pd.DataFrame(columns=SPEC_COLUMNS)
+        specs = specs.reset_index(drop=True)
+        specs[NUMERIC_COLUMNS] = specs[NUMERIC_COLUMNS].apply(pd.to_numeric, errors="coerce")
+        self._results = specs[RESULT_COLUMNS]
+
+        # Các cột dùng để lọc, giữ dưới dạng mảng numpy
+        self._price = specs["avg_price_used"].to_numpy(dtype=float)
+        self._engine = specs["engine_cc"].to_numpy(dtype=float)
+        self._fuel = specs["fuel_consumption"].to_numpy(dtype=float)
+        self._horsepower = specs["horsepower"].to_numpy(dtype=float)
+        self._abs = pd.to_numeric(specs["abs"], errors="coerce").to_numpy(dtype=float) == 1
+        self._disc_brake = (specs["brake_front"] == "Đĩa").to_numpy()
+        self._segment_codes, self._segments = pd.factorize(specs["segment"])
+        self._brand_codes, self._brands = pd.factorize(specs["brand"])
+
+        self._ranks = {purpose: _rank(specs, order) for purpose, order in PURPOSE_ORDER.items()}
+
+    @classmethod
+    def from_connection(cls, conn):
+        """Nạp toàn bộ thông số bằng một truy vấn trên kết nối database"""
+        specs = pd.read_sql_query(SUGGESTION_QUERY, conn)
+        logger.info(f"Đã nạp {len(specs)} phiên bản xe cho bộ gợi ý")
+        return cls(specs)
+
+    def _codes_of(self, categories, values):
+        """Mã factorize của các giá trị (bỏ qua giá trị không có trong bảng)"""
+        codes = categories.get_indexer(list(values))
+        return codes[codes >= 0]
+
+    def mask(self, budget, segment="Tất cả", engine_size="Tất cả", brands=(), features=()):
+        """
+        Mask các phiên bản thỏa mãn tất cả tiêu chí
+
+        Returns:
+            ndarray: Mảng bool, mỗi phần tử ứng với một phiên bản xe
+        """
+        # Điều kiện về ngân sách (giá thiếu luôn bị loại vì so sánh với NaN là False)
+        mask = self._price <= budget
+
+        # Điều kiện về phân khúc
+        if segment != "Tất cả":
+            mask &= np.isin(self._segment_codes, self._codes_of(self._segments, [segment]))
+
+        # Điều kiện về dung tích động cơ
+        if engine_size == "Dưới 125cc":
+            mask &= self._engine < 125
+        elif engine_size == "125-150cc":
+            mask &= (self._engine >= 125) & (self._engine <= 150)
+        elif engine_size == "Trên 150cc":
+            mask &= self._engine > 150
+
+        # Điều kiện về thương hiệu
+        if brands:
+            mask &= np.isin(self._brand_codes, self._codes_of(self._brands, brands))
+
+        # Điều kiện về tính năng
+        for feature in features:
+            if feature == "ABS":
+                mask &= self._abs
+            elif feature == "Phanh đĩa":
+                mask &= self._disc_brake
+            elif feature == "Vận hành tiết kiệm":
+                mask &= self._fuel < 2.2
+            elif feature == "Cốp rộng":
+                # Đây chỉ là giả định, trong thực tế cần có dữ liệu về kích thước cốp
+                if "Xe tay ga" in segment or segment == "Tất cả":
+                    mask &= np.isin(self._segment_codes, self._codes_of(self._segments, ["Xe tay ga"]))
+            elif feature == "Mạnh mẽ":
+                mask &= self._horsepower > 10
+        return mask
+
+    def suggest(self, budget, segment="Tất cả", engine_size="Tất cả", purpose="Đi lại hàng ngày",
+                brands=(), features=(), limit=TOP_K):
+        """
+        Các phiên bản phù hợp nhất với tiêu chí, xếp theo mục đích sử dụng
+
+        Returns:
+            DataFrame: Tối đa limit dòng với các cột RESULT_COLUMNS
+        """
+        candidates = np.flatnonzero(self.mask(budget, segment, engine_size, brands, features))
+        ranks = self._ranks.get(purpose)
+        if ranks is None:
+            return self._results.iloc[candidates[:limit]].reset_index(drop=True)
+
+        candidate_ranks = ranks[candidates]
+        if len(candidates) > limit:
+            # Chọn top-k không cần sắp xếp toàn bộ, rồi chỉ sắp xếp k phần tử
+            top = np.argpartition(candidate_ranks, limit - 1)[:limit]
+            candidates, candidate_ranks = candidates[top], candidate_ranks[top]
+        chosen = candidates[np.argsort(candidate_ranks, kind="stable")]
+        return self._results.iloc[chosen].reset_index(drop=True)
+
+    def __len__(self):
+        return len(self._results)
@@ -0,0 +1,169 @@
+# utils/text_search.py
+import re
+import unicodedata
+import logging
+
+# Thiết lập logging
+logger = logging.getLogger(__name__)
+
+# Tên bảng FTS5 chứa chỉ mục toàn văn của tiêu đề và mô tả bài đăng
+SEARCH_TABLE = "motorbikes_fts"
+# Bảng nối mã tài liệu FTS5 (đánh số theo ngày đăng) với rowid của bảng bài đăng
+SEARCH_DOCS_TABLE = "motorbikes_fts_docs"
+
+# Các dấu thanh/dấu mũ sau khi tách Unicode (NFD) đều nằm trong khối Combining Diacritical Marks
+_COMBINING_MARKS = re.compile(r"[\u0300-\u036f]")
+# "đ" là một chữ cái riêng, không tách được bằng NFD nên phải thay thủ công
+_D_STROKE = str.maketrans({"đ": "d", "Đ": "d"})
+_TOKEN = re.compile(r"\w+")
+
+
+def fold_vietnamese(text):
+    """
+    Bỏ dấu tiếng Việt và chuyển về chữ thường (ví dụ: "Biển số đẹp" -> "bien so dep")
+
+    Args:
+        text: Chuỗi cần chuẩn hóa (None hoặc NaN trả về chuỗi rỗng)
+
+    Returns:
+        str: Chuỗi đã bỏ dấu, chữ thường
+    """
+    if text is None or (isinstance(text, float) and text != text):
+        return ""
+    decomposed = unicodedata.normalize("NFD", str(text).translate(_D_STROKE))
+    return _COMBINING_MARKS.sub("", decomposed).lower()
+
+
+def build_search_index(conn, table="motorbikes"):
+    """
+    Tạo (lại) bảng FTS5 cho tiêu đề và mô tả bài đăng
+
+    Bảng là contentless (content=''), chỉ lưu chỉ mục của văn bản đã bỏ dấu. Mã tài liệu (rowid
+    của bảng FTS5) được đánh số tăng dần theo post_date (rồi theo rowid), nên duyệt ngược mã tài liệu
+    là duyệt từ bài mới đăng nhất; bảng SEARCH_DOCS_TABLE nối mã tài liệu với rowid của bảng
+    motorbikes. detail=column bỏ vị trí từ trong
+    chỉ mục (không cần cho truy vấn AND) nên doclist nhỏ và đọc nhanh hơn nhiều; prefix
+    tạo sẵn chỉ mục tiền tố 2-3 ký tự cho từ đang gõ dở.
+
+    Args:
+        conn: Kết nối SQLite đến cơ sở dữ liệu
+        table: Tên bảng bài đăng
+
+    Returns:
+        int: Số bài đăng đã được đánh chỉ mục
+    """
+    conn.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+    conn.execute(f"DROP TABLE IF EXISTS {SEARCH_DOCS_TABLE}")
+    conn.execute(f"CREATE TABLE {SEARCH_DOCS_TABLE} (doc_id INTEGER PRIMARY KEY, listing_rowid INTEGER NOT NULL)")
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(
+            title, description,
+            content='',
+            detail=column,
+            prefix='2 3',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+
+    # Bài không có ngày đăng được coi là cũ nhất (NULL đứng đầu khi sắp xếp tăng dần)
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    order = "post_date, rowid" if "post_date" in columns else "rowid"
+    rows = conn.execute(f"SELECT rowid, title, description FROM {table} ORDER BY {order}").fetchall()
+    conn.executemany(
+        f"INSERT INTO {SEARCH_DOCS_TABLE} (doc_id, listing_rowid) VALUES (?, ?)",
+        ((doc_id, rowid) for doc_id, (rowid, _, _) in enumerate(rows, 1))
+    )
+    documents = (
+        (doc_id, fold_vietnamese(title), fold_vietnamese(description))
+        for doc_id, (_, title, description) in enumerate(rows, 1)
+    )
+    cursor = conn.executemany(
+        f"INSERT INTO {SEARCH_TABLE}(rowid, title, description) VALUES (?, ?, ?)", documents
+    )
+    indexed = cursor.rowcount
+
+    # Gộp các segment để truy vấn nhanh hơn
+    conn.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+    conn.commit()
+    return indexed
+
+
+def normalize_query(query):
+    """
+    Chuẩn hóa câu tìm kiếm: bỏ dấu, chữ thường, chỉ giữ lại các từ
+
+    Returns:
+        str: Các từ cách nhau bởi một dấu cách (chuỗi rỗng nếu không có từ nào)
+    """
+    return " ".join(_TOKEN.findall(fold_vietnamese(query)))
+
+
+def build_match_query(query):
+    """
+    Chuyển câu tìm kiếm của người dùng thành biểu thức MATCH của FTS5
+
+    Mỗi từ được bỏ dấu và đặt trong dấu nháy (tránh lỗi cú pháp FTS5), các từ được nối
+    bằng AND, từ cuối cùng được tìm theo tiền tố để hỗ trợ gõ dở (ví dụ "air bla").
+
+    Args:
+        query (str): Câu tìm kiếm, ví dụ "Air Blade 2019" hoặc "chính chủ"
+
+    Returns:
+        str: Biểu thức MATCH, hoặc None nếu câu tìm kiếm không có từ nào
+    """
+    tokens = normalize_query(query).split()
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search_listing_ids(conn, query, limit=20):
+    """
+    Tìm rowid của các bài đăng khớp với câu tìm kiếm, sắp xếp theo độ liên quan
+
+    Bài có đủ các từ ngay trong tiêu đề (hạng 0) đứng trước bài chỉ khớp khi tính cả mô tả (hạng 1),
+    cùng hạng thì bài mới đăng hơn đứng trước. Mỗi hạng là một truy vấn FTS5 riêng (hạng 0 lọc theo
+    cột title) duyệt ngược mã tài liệu (từ bài mới đăng nhất, xem build_search_index) và dừng ngay khi
+    đủ limit kết quả, nên xếp hạng được áp dụng trên mọi bài khớp mà thời gian không phụ thuộc vào số
+    bài khớp. Không dùng bm25 vì hàm này phải đọc toàn bộ doclist của từng từ, rất chậm với các cụm
+    phổ biến như "chính chủ" trên hàng triệu bài đăng.
+
+    Args:
+        conn: Kết nối SQLite
+        query (str): Câu tìm kiếm
+        limit (int): Số kết quả tối đa
+
+    Returns:
+        list: Các cặp (rowid của bảng bài đăng, hạng)
+    """
+    match = build_match_query(query)
+    if match is None:
+        return []
+
+    def newest(expression, count):
+        return [row[0] for row in conn.execute(f"""
+            SELECT rowid FROM {SEARCH_TABLE}
+            WHERE {SEARCH_TABLE} MATCH ?
+            ORDER BY rowid DESC
+            LIMIT ?
+        """, (expression, count))]
+
+    # Hạng 0: khớp trong tiêu đề. Nếu chưa đủ limit thì đây là tất cả bài khớp tiêu đề,
+    # nên chỉ cần bỏ chúng ra khỏi kết quả khớp cả hai cột để lấy hạng 1
+    in_title = newest(f"title : ({match})", limit)
+    matched = [(doc_id, 0) for doc_id in in_title]
+    if len(in_title) < limit:
+        title_ids = set(in_title)
+        others = [doc_id for doc_id in newest(match, limit + len(in_title)) if doc_id not in title_ids]
+        matched += [(doc_id, 1) for doc_id in others[:limit - len(in_title)]]
+    if not matched:
+        return []
+
+    placeholders = ", ".join("?" for _ in matched)
+    listing_rowids = dict(conn.execute(
+        f"SELECT doc_id, listing_rowid FROM {SEARCH_DOCS_TABLE} WHERE doc_id IN ({placeholders})",
+        [doc_id for doc_id, _ in matched]
+    ).fetchall())
+    return [(listing_rowids[doc_id], tier) for doc_id, tier in matched]
@@ -35,97 +35,76 @@ def create_market_overview(data):
     fig.tight_layout()
     return fig
 
-def create_price_trend():
+def create_price_trend(series, granularity="month"):
     """
     Tạo biểu đồ xu hướng giá
     
+    Args:
+        series (DataFrame): Giá (triệu VND) theo kỳ, mỗi cột là một thương hiệu/mẫu xe (bảng price_trends)
+        granularity (str): "month" hoặc "week"
+        
     Returns:
         Figure: Đối tượng Figure của matplotlib
     """
-    # Dữ liệu mẫu cho xu hướng giá
-    months = ['T1', 'T2', 'T3', 'T4', 'T5', 'T6', 'T7', 'T8', 'T9', 'T10', 'T11', 'T12']
-    
-    # Giá trung bình các loại xe theo tháng (triệu VND)
-    honda_prices = [25, 24.5, 24.8, 25.2, 25.5, 26, 26.5, 27, 27.2, 27.5, 28, 28.2]
-    yamaha_prices = [30, 29.5, 29.8, 30.2, 30.5, 31, 31.5, 32, 32.2, 32.5, 33, 33.2]
-    suzuki_prices = [22, 21.5, 21.8, 22.2, 22.5, 23, 23.5, 24, 24.2, 24.5, 25, 25.2]
-    
     fig, ax = plt.subplots(figsize=(10, 6))
     
-    ax.plot(months, honda_prices, 'b-', label='Honda')
-    ax.plot(months, yamaha_prices, 'r-', label='Yamaha')
-    ax.plot(months, suzuki_prices, 'g-', label='Suzuki')
+    # Nhãn kỳ: T<tháng>/<năm> hoặc ngày đầu tuần
+    if granularity == "week":
+        labels = [period.strftime('%d/%m') for period in series.index]
+        xlabel = 'Tuần'
+    else:
+        labels = [f"T{period.month}/{period.year % 100:02d}" for period in series.index]
+        xlabel = 'Tháng'
     
-    ax.set_xlabel('Tháng')
-    ax.set_ylabel('Giá trung bình (triệu VND)')
-    ax.set_title('Xu hướng giá xe máy cũ theo tháng')
-    ax.legend()
+    x = np.arange(len(series.index))
+    for label in series.columns:
+        ax.plot(x, series[label], marker='o', markersize=3, label=label)
+    
+    ax.set_xticks(x)
+    ax.set_xticklabels(labels, rotation=45 if len(labels) > 12 else 0)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel('Giá trung vị (triệu VND)')
+    ax.set_title(f'Xu hướng giá xe máy cũ theo {xlabel.lower()}')
+    if len(series.columns):
+        ax.legend()
+    else:
+        ax.text(0.5, 0.5, 'Chưa có dữ liệu giá theo thời gian', ha='center', va='center', transform=ax.transAxes)
     ax.grid(True)
     
     fig.tight_layout()
     return fig
 
-def create_price_distribution(brand=None):
+def create_price_distribution(edges, histograms, brand=None):
     """
-    Tạo biểu đồ phân phối giá theo thương hiệu
+    Tạo biểu đồ phân phối giá theo thương hiệu (hoặc theo mẫu xe của một thương hiệu)
     
     Args:
-        brand (str, optional): Thương hiệu để lọc. Mặc định là None.
+        edges (ndarray): Biên các bin giá (triệu VND)
+        histograms (dict): Tên thương hiệu/mẫu xe -> số lượng tin đăng theo bin (đã tính sẵn khi nạp dữ liệu)
+        brand (str, optional): Thương hiệu đang xem. Mặc định là None.
         
     Returns:
         Figure: Đối tượng Figure của matplotlib
     """
-    # Dữ liệu mẫu cho phân phối giá
-    brands = ['Honda', 'Yamaha', 'Suzuki', 'Piaggio', 'SYM']
-    
-    # Tạo dữ liệu phân phối giá giả lập
-    np.random.seed(42)  # Để kết quả nhất quán
-    data = []
-    
-    for b in brands:
-        if brand is None or b == brand:
-            if b == 'Honda':
-                mean_price = 25
-                std_price = 5
-            elif b == 'Yamaha':
-                mean_price = 30
-                std_price = 7
-            elif b == 'Suzuki':
-                mean_price = 22
-                std_price = 4
-            elif b == 'Piaggio':
-                mean_price = 40
-                std_price = 10
-            else:  # SYM
-                mean_price = 18
-                std_price = 3
-            
-            # Tạo dữ liệu phân phối giá
-            prices = np.random.normal(mean_price, std_price, 100)
-            prices = np.clip(prices, 0, None)  # Đảm bảo giá không âm
-            
-            for price in prices:
-                data.append({'Thương hiệu': b, 'Giá (triệu VND)': price})
-    
-    df = pd.DataFrame(data)
-    
-    # Tạo biểu đồ histogram
     fig, ax = plt.subplots(figsize=(10, 6))
     
+    # Chỉ vẽ lại từ số lượng theo bin, không đọc lại dữ liệu gốc
+    alpha = 0.5 if len(histograms) > 1 else 0.7
+    for label, counts in histograms.items():
+        ax.stairs(counts, edges, fill=True, alpha=alpha, label=label)
+    
     if brand is None:
-        for b in brands:
-            subset = df[df['Thương hiệu'] == b]
-            ax.hist(subset['Giá (triệu VND)'], alpha=0.5, label=b, bins=20)
         title = 'Phân phối giá theo thương hiệu'
     else:
-        subset = df[df['Thương hiệu'] == brand]
-        ax.hist(subset['Giá (triệu VND)'], alpha=0.7, label=brand, bins=20)
         title = f'Phân phối giá xe {brand}'
     
     ax.set_xlabel('Giá (triệu VND)')
     ax.set_ylabel('Tần suất')
     ax.set_title(title)
-    ax.legend()
+    if histograms:
+        ax.legend()
+    else:
+        ax.text(0.5, 0.5, 'Chưa có dữ liệu giá', ha='center', va='center', transform=ax.transAxes)
     ax.grid(True, alpha=0.3)
     
     fig.tight_layout()
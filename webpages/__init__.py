@@ -9,4 +9,5 @@ sys.path.append(parent_dir)
 from .market_overview import show_market_overview
 from .price_prediction import show_price_prediction
 from .bike_comparison import show_bike_comparison
-from .bike_suggestion import show_bike_suggestion
\ No newline at end of file
+from .bike_suggestion import show_bike_suggestion
+from .listing_search import show_listing_search
\ No newline at end of file
@@ -1,8 +1,6 @@
 # pages/bike_suggestion.py
 import streamlit as st
-import pandas as pd
-from utils.data_service import get_brands
-from config import get_db_connection
+from utils.data_service import get_catalogue, get_suggestion_engine
 
 def show_bike_suggestion():
     """Hiển thị trang gợi ý mua xe"""
@@ -44,7 +42,7 @@ def show_bike_suggestion():
         
         brand_preference = st.multiselect(
             "Thương hiệu ưa thích",
-            get_brands(),
+            get_catalogue().brands(),
             key="brand_preference_multi"
         )
         
@@ -61,84 +59,18 @@ def show_bike_suggestion():
 def process_bike_suggestion(budget, segment, engine_size, purpose, brand_preference, feature_preference):
     """Xử lý gợi ý xe"""
     with st.spinner("Đang tìm kiếm xe phù hợp..."):
-        # Xây dựng truy vấn dựa trên các tiêu chí
-        query_conditions = []
-        query_params = []
-        
-        # Điều kiện về ngân sách
-        query_conditions.append("avg_price_used <= ?")
-        query_params.append(budget)
-        
-        # Điều kiện về phân khúc
-        if segment != "Tất cả":
-            query_conditions.append("segment = ?")
-            query_params.append(segment)
-        
-        # Điều kiện về dung tích động cơ
-        if engine_size != "Tất cả":
-            if engine_size == "Dưới 125cc":
-                query_conditions.append("engine_cc < 125")
-            elif engine_size == "125-150cc":
-                query_conditions.append("engine_cc >= 125 AND engine_cc <= 150")
-            elif engine_size == "Trên 150cc":
-                query_conditions.append("engine_cc > 150")
-        
-        # Điều kiện về thương hiệu
-        if brand_preference:
-            placeholders = ", ".join(["?" for _ in brand_preference])
-            query_conditions.append(f"brand IN ({placeholders})")
-            query_params.extend(brand_preference)
-        
-        # Điều kiện về tính năng
-        for feature in feature_preference:
-            if feature == "ABS":
-                query_conditions.append("abs = 1")
-            elif feature == "Phanh đĩa":
-                query_conditions.append("brake_front = 'Đĩa'")
-            elif feature == "Vận hành tiết kiệm":
-                query_conditions.append("fuel_consumption < 2.2")
-            elif feature == "Cốp rộng":
-                # Đây chỉ là giả định, trong thực tế cần có dữ liệu về kích thước cốp
-                if "Xe tay ga" in segment or segment == "Tất cả":
-                    query_conditions.append("segment = 'Xe tay ga'")
-            elif feature == "Mạnh mẽ":
-                query_conditions.append("horsepower > 10")
-        
-        # Xây dựng câu truy vấn hoàn chỉnh
-        query = """
-            SELECT 
-                brand, model, variant, engine_cc, 
-                price_new, avg_price_used, 
-                segment, abs, transmission,
-                fuel_consumption
-            FROM motorbikes
-        """
-        
-        if query_conditions:
-            query += " WHERE " + " AND ".join(query_conditions)
-        
-        # Thêm sắp xếp
-        if purpose == "Đi lại hàng ngày":
-            query += " ORDER BY fuel_consumption, avg_price_used"
-        elif purpose == "Đi phố":
-            query += " ORDER BY weight, avg_price_used"
-        elif purpose == "Đi xa":
-            query += " ORDER BY fuel_capacity DESC, avg_price_used"
-        elif purpose == "Thể thao":
-            query += " ORDER BY horsepower DESC, torque DESC"
-        
-        # Giới hạn kết quả
-        query += " LIMIT 10"
-        
-        # Thực hiện truy vấn
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute(query, query_params)
-            results = cursor.fetchall()
-            conn.close()
-            
-            if results and len(results) > 0:
+            # Lọc và xếp hạng trên bảng thông số trong bộ nhớ, không truy vấn database mỗi lần tìm
+            results = get_suggestion_engine().suggest(
+                budget,
+                segment=segment,
+                engine_size=engine_size,
+                purpose=purpose,
+                brands=brand_preference,
+                features=feature_preference
+            )
+
+            if not results.empty:
                 display_bike_suggestions(results, budget, purpose)
             else:
                 st.warning("Không tìm thấy xe phù hợp với tiêu chí của bạn. Hãy thử điều chỉnh lại các tiêu chí.")
@@ -151,11 +83,8 @@ def display_bike_suggestions(results, budget, purpose):
     # Hiển thị kết quả
     st.markdown('<div class="sub-header">Các xe phù hợp với tiêu chí của bạn</div>', unsafe_allow_html=True)
     
-    # Chuyển đổi kết quả thành DataFrame
-    results_df = pd.DataFrame([dict(row) for row in results])
-    
     # Đổi tên cột để hiển thị đẹp hơn
-    results_df = results_df.rename(columns={
+    results_df = results.rename(columns={
         'brand': 'Thương hiệu',
         'model': 'Mẫu xe',
         'variant': 'Phiên bản',
@@ -175,9 +104,8 @@ def display_bike_suggestions(results, budget, purpose):
     num_results = min(3, len(results))
     st.markdown(f"### Top {num_results} gợi ý")
     
-    for i, row in enumerate(results[:num_results]):
-        row_dict = dict(row)
-        
+    records = results.to_dict("records")
+    for i, row_dict in enumerate(records[:num_results]):
         expander = st.expander(f"{i+1}. {row_dict['brand']} {row_dict['model']} {row_dict['variant']}")
         with expander:
             col1, col2 = st.columns([1, 2])
@@ -225,14 +153,14 @@ def display_bike_suggestions(results, budget, purpose):
         # Nếu có ít nhất 2 kết quả, hiển thị lời khuyên đầy đủ
         st.info(f"""
             **Lời khuyên:** Dựa trên tiêu chí của bạn, chúng tôi đề xuất bạn nên tập trung vào các xe có giá trong khoảng {budget-5} đến {budget} triệu VND. 
-            Nếu bạn cần xe chủ yếu cho mục đích {purpose.lower()}, hãy chú ý đến các mẫu xe {results[0]['brand']} {results[0]['model']} hoặc {results[1]['brand']} {results[1]['model']}.
+            Nếu bạn cần xe chủ yếu cho mục đích {purpose.lower()}, hãy chú ý đến các mẫu xe {records[0]['brand']} {records[0]['model']} hoặc {records[1]['brand']} {records[1]['model']}.
             Các mẫu xe này đều có mức giá phù hợp và các tính năng đáp ứng nhu cầu của bạn.
         """)
     elif len(results) == 1:
         # Nếu chỉ có 1 kết quả
         st.info(f"""
             **Lời khuyên:** Dựa trên tiêu chí của bạn, chúng tôi đề xuất bạn nên tập trung vào các xe có giá trong khoảng {budget-5} đến {budget} triệu VND.
-            Mẫu xe {results[0]['brand']} {results[0]['model']} có mức giá phù hợp và các tính năng đáp ứng nhu cầu của bạn cho mục đích {purpose.lower()}.
+            Mẫu xe {records[0]['brand']} {records[0]['model']} có mức giá phù hợp và các tính năng đáp ứng nhu cầu của bạn cho mục đích {purpose.lower()}.
         """)
     else:
         # Trường hợp này không nên xảy ra vì chúng ta đã kiểm tra results trước đó
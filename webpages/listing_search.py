@@ -0,0 +1,53 @@
+# pages/listing_search.py
+import streamlit as st
+from utils.data_service import search_listings
+
+# Các cột hiển thị trong bảng kết quả tìm kiếm
+RESULT_COLUMNS = {
+    "title": "Tiêu đề",
+    "price_numeric": "Giá (VND)",
+    "reg_year_numeric": "Năm đăng ký",
+    "mileage_numeric": "Số km",
+    "province": "Khu vực",
+    "url_full": "Link",
+}
+
+def show_listing_search():
+    """Hiển thị trang tìm kiếm bài đăng theo tiêu đề và mô tả"""
+    st.markdown('<div class="main-header">Tìm kiếm tin đăng</div>', unsafe_allow_html=True)
+
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        query = st.text_input(
+            "Từ khóa",
+            placeholder="Ví dụ: chính chủ, biển số đẹp, Air Blade 2019",
+            help="Có thể gõ không dấu, ví dụ: \"bien so dep\"",
+            key="listing_search_query"
+        )
+    with col2:
+        limit = st.selectbox("Số kết quả", [20, 50, 100], key="listing_search_limit")
+
+    if not query.strip():
+        st.info("Nhập từ khóa để tìm trong tiêu đề và mô tả của các bài đăng.")
+        return
+
+    results = search_listings(query, limit=limit)
+    if results.empty:
+        st.warning(f"Không tìm thấy bài đăng nào cho \"{query}\".")
+        return
+
+    st.caption(f"{len(results)} bài đăng phù hợp nhất, sắp xếp theo mức độ liên quan")
+
+    columns = [col for col in RESULT_COLUMNS if col in results.columns]
+    display_df = results[columns].rename(columns=RESULT_COLUMNS)
+    st.dataframe(
+        display_df,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Giá (VND)": st.column_config.NumberColumn(format="%d"),
+            "Năm đăng ký": st.column_config.NumberColumn(format="%d"),
+            "Số km": st.column_config.NumberColumn(format="%d"),
+            "Link": st.column_config.LinkColumn(display_text="Xem tin"),
+        }
+    )
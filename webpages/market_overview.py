@@ -1,96 +1,55 @@
 # pages/market_overview.py
 import streamlit as st
-import pandas as pd
-from utils.data_service import load_market_data
-from utils.visualization import create_market_overview, create_price_trend
-from config import get_db_connection
-
-def get_market_stats():
-    """Lấy thống kê thị trường từ database"""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Tổng số xe
-        cursor.execute("SELECT COUNT(*) as total FROM motorbikes")
-        total_count = cursor.fetchone()['total']
-        
-        # Giá trung bình
-        cursor.execute("SELECT ROUND(AVG(avg_price_used), 1) as avg_price FROM motorbikes")
-        avg_price = cursor.fetchone()['avg_price']
-        
-        # Chênh lệch giá
-        cursor.execute("""
-            SELECT ROUND((AVG(price_new) - AVG(avg_price_used)) / AVG(price_new) * 100, 1) as price_diff 
-            FROM motorbikes
-        """)
-        price_diff = cursor.fetchone()['price_diff']
-        
-        conn.close()
-        
-        return total_count, avg_price, price_diff
-    except Exception as e:
-        st.error(f"Lỗi khi lấy thống kê thị trường: {str(e)}")
-        return 3000, 27, 12
-
-@st.cache_data
-def get_detailed_market_data():
-    """Lấy dữ liệu chi tiết thị trường từ database"""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT 
-                brand as 'Thương hiệu',
-                model as 'Mẫu xe',
-                variant as 'Phiên bản',
-                segment as 'Phân khúc',
-                engine_cc as 'Dung tích (cc)',
-                price_new as 'Giá mới (triệu)',
-                avg_price_used as 'Giá cũ TB (triệu)'
-            FROM motorbikes
-            ORDER BY brand, model, variant
-        """)
-        
-        detailed_data = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        
-        return pd.DataFrame(detailed_data)
-    except Exception as e:
-        st.error(f"Lỗi khi lấy dữ liệu chi tiết: {str(e)}")
-        return pd.DataFrame()
+from utils.data_service import get_market_snapshot, get_price_histograms, get_price_trends, current_data_version
+from utils.visualization import create_market_overview, create_price_trend, create_price_distribution
+from utils.figure_cache import get_figure_cache
+from utils.price_trend import trend_series
 
 def show_market_overview():
     """Hiển thị trang tổng quan thị trường"""
     st.markdown('<div class="main-header">Tổng quan thị trường xe máy cũ</div>', unsafe_allow_html=True)
     
-    # Load dữ liệu thị trường
-    market_data = load_market_data()
-    
-    # Sử dụng dữ liệu market_data để tính toán
-    total_count = market_data['Số lượng giao dịch'].sum()
-    avg_price = round(market_data['Giá trung bình (triệu VND)'].mean(), 1)
+    # Toàn bộ số liệu của trang được tính một lần cho mỗi phiên bản dữ liệu
+    snapshot = get_market_snapshot()
+    market_data = snapshot.brands
+    data_version = current_data_version()
+    figures = get_figure_cache()
     
     # Hiển thị các số liệu tổng quan
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Số lượng xe", f"{total_count:,}", "+5%")
+        st.metric("Số lượng xe", f"{snapshot.total_count:,}", "+5%")
     with col2:
-        st.metric("Giá trung bình", f"{avg_price} triệu VND", "+2%")
+        st.metric("Giá trung bình", f"{snapshot.avg_price} triệu VND", "+2%")
+    with col3:
+        st.metric("Số mẫu xe", f"{snapshot.model_count:,}")
 
     
     # Hiển thị biểu đồ thị trường
     st.markdown('<div class="sub-header">Phân tích thị trường theo thương hiệu</div>', unsafe_allow_html=True)
-    market_chart = create_market_overview(market_data)
-    st.pyplot(market_chart)
+    # Biểu đồ chỉ được vẽ lại khi dữ liệu thay đổi, các lần chạy lại dùng ảnh đã render
+    market_chart = figures.render("market_overview", create_market_overview, market_data, data_version=data_version)
+    st.image(market_chart, use_container_width=True)
     
     # Hiển thị xu hướng giá
-    st.markdown('<div class="sub-header">Xu hướng giá trong 12 tháng qua</div>', unsafe_allow_html=True)
-    trend_chart = create_price_trend()
-    st.pyplot(trend_chart)
+    st.markdown('<div class="sub-header">Xu hướng giá theo thời gian</div>', unsafe_allow_html=True)
+    period = st.radio("Theo", ["Tháng", "Tuần"], horizontal=True, key="trend_granularity")
+    granularity, periods = ("week", 26) if period == "Tuần" else ("month", 12)
+    series = trend_series(get_price_trends(granularity, periods))
+    trend_chart = figures.render("price_trend", create_price_trend, series, granularity, data_version=data_version)
+    st.image(trend_chart, use_container_width=True)
+    
+    # Hiển thị phân phối giá từ histogram đã tính sẵn khi nạp dữ liệu
+    st.markdown('<div class="sub-header">Phân phối giá</div>', unsafe_allow_html=True)
+    histograms = get_price_histograms()
+    selected = st.selectbox("Thương hiệu", ["Tất cả thương hiệu"] + histograms.brands(), key="distribution_brand")
+    brand = None if selected == "Tất cả thương hiệu" else selected
+    distribution_chart = figures.render(
+        "price_distribution", create_price_distribution,
+        histograms.edges, histograms.distribution(brand), brand, data_version=data_version
+    )
+    st.image(distribution_chart, use_container_width=True)
     
     # Hiển thị bảng dữ liệu chi tiết
     st.markdown('<div class="sub-header">Dữ liệu thị trường chi tiết</div>', unsafe_allow_html=True)
-    detailed_data = get_detailed_market_data()
-    st.dataframe(detailed_data)
\ No newline at end of file
+    st.dataframe(snapshot.detailed)
@@ -1,43 +1,81 @@
 # webpages/price_prediction.py
 import streamlit as st
-import io
 import base64
 import pandas as pd
 import os
-from PIL import Image
+import time
+from contextlib import contextmanager
 from utils.price_prediction import MotorbikePricePredictor
 from utils.data_service import *
+from utils.listing_cards import render_listing_cards
+from utils.image_preprocessing import preprocess_image
 from config import check_model
 import logging
 
 # Thiết lập logging
 logger = logging.getLogger(__name__)
+
+# Số bài đăng tương tự tối đa được hiển thị
+MAX_SIMILAR_LISTINGS = 6
+
+# Khóa session_state lưu kết quả dự đoán gần nhất và kết quả phân tích ảnh/mô tả
+PREDICTION_KEY = "prediction_result"
+ANALYSIS_KEY = "analysis_result_{tab_key}"
+# Khóa session_state lưu ảnh đã xử lý của lần tải lên gần nhất
+UPLOAD_KEY = "prepared_upload"
+
+@contextmanager
+def log_render_time(section):
+    """Ghi log thời gian chạy lại của một phần trang (toàn trang hoặc một fragment)"""
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        logger.info(f"Dự đoán giá - {section}: {(time.perf_counter() - start_time) * 1000:.1f} ms")
+
 def show_price_prediction():
-    """Hiển thị trang dự đoán giá xe"""
-    st.title("Dự đoán giá xe máy cũ")
-    st.markdown("Nhập thông tin xe để dự đoán giá.")
-    
-    # Tạo tabs cho các phương thức nhập
-    tab1, tab2, tab3 = st.tabs(["Nhập thông số", "Tải lên ảnh", "Nhập mô tả"])
-    
-    with tab1:
-        show_input_specs_tab()
-    
-    with tab2:
-        show_upload_image_tab()
-    
-    with tab3:
-        show_input_description_tab()
+    """
+    Hiển thị trang dự đoán giá xe
+
+    Mỗi tab nhập liệu, phần kết quả và phần bài đăng tương tự là một fragment riêng: thay đổi một
+    widget chỉ chạy lại fragment chứa nó. Kết quả dự đoán được lưu trong session_state, chỉ khi bấm
+    "Dự đoán giá" thì cả trang mới chạy lại để cập nhật phần kết quả.
+    """
+    with log_render_time("toàn trang"):
+        st.title("Dự đoán giá xe máy cũ")
+        st.markdown("Nhập thông tin xe để dự đoán giá.")
+        
+        # Tạo tabs cho các phương thức nhập
+        tab1, tab2, tab3 = st.tabs(["Nhập thông số", "Tải lên ảnh", "Nhập mô tả"])
+        
+        with tab1:
+            show_input_specs_tab()
+        
+        with tab2:
+            show_upload_image_tab()
+        
+        with tab3:
+            show_input_description_tab()
+
+        show_prediction_result()
+        show_similar_listings_panel()
 
+@st.fragment
 def show_input_specs_tab():
     """Hiển thị tab nhập thông số"""
+    with log_render_time("tab nhập thông số"):
+        render_input_specs_tab()
+
+def render_input_specs_tab():
+    """Nội dung tab nhập thông số"""
     st.subheader("Nhập thông số xe")
     
     # Kiểm tra model tồn tại
     model_available = check_model()
     
-    # Lấy danh sách thương hiệu
-    brands = get_brands()
+    # Lấy danh mục thương hiệu/mẫu xe (giữ trong bộ nhớ, đổi thương hiệu không cần truy vấn lại)
+    catalogue = get_catalogue()
+    brands = catalogue.brands()
     
     col1, col2 = st.columns(2)
     with col1:
@@ -48,13 +86,14 @@ def show_input_specs_tab():
         )
         
         # Lấy danh sách mẫu xe dựa trên thương hiệu đã chọn
-        models = get_models(brand)
+        models = catalogue.models(brand)
             
         model = st.selectbox(
             "Mẫu xe",
             models,
             key="model_tab1"
         )
+        show_model_market_range(catalogue, brand, model)
         
         # # Lấy danh sách phiên bản dựa trên thương hiệu và mẫu xe đã chọn
         # if model and model != "Không có dữ liệu":
@@ -123,56 +162,86 @@ def show_input_specs_tab():
         variant = ""
         process_prediction(brand, model, variant, year, km_driven, condition, origin)
 
+@st.fragment
 def show_upload_image_tab():
     """Hiển thị tab tải lên ảnh"""
+    with log_render_time("tab tải lên ảnh"):
+        render_upload_image_tab()
+
+def render_upload_image_tab():
+    """Nội dung tab tải lên ảnh"""
     st.subheader("Tải lên ảnh xe")
     
     # Kiểm tra model tồn tại
     model_available = check_model()
+    analysis_key = ANALYSIS_KEY.format(tab_key="tab2")
         
     uploaded_file = st.file_uploader("Chọn ảnh xe máy", type=["jpg", "jpeg", "png"], key="file_uploader_tab2")
     
-    if uploaded_file is not None:
-        image = Image.open(uploaded_file)
-        st.image(image, caption="Ảnh đã tải lên", use_column_width=True)
+    if uploaded_file is None:
+        st.session_state.pop(analysis_key, None)
+        st.session_state.pop(UPLOAD_KEY, None)
+        return
+
+    # Xoay, thu nhỏ và nén lại ảnh một lần cho mỗi file tải lên (không làm lại khi fragment chạy lại)
+    prepared = st.session_state.get(UPLOAD_KEY)
+    if prepared is None or prepared["file_id"] != uploaded_file.file_id:
+        try:
+            image_bytes, image_stats = preprocess_image(uploaded_file.getvalue())
+        except Exception as e:
+            logger.error(f"Lỗi khi xử lý ảnh: {str(e)}")
+            st.error(f"Không thể đọc ảnh: {str(e)}")
+            return
+        prepared = {"file_id": uploaded_file.file_id, "data": image_bytes, "stats": image_stats}
+        st.session_state[UPLOAD_KEY] = prepared
+
+    stats = prepared["stats"]
+    st.image(prepared["data"], caption="Ảnh đã tải lên", use_column_width=True)
+    st.caption(
+        f"Ảnh gửi phân tích: {stats['size'][0]}x{stats['size'][1]} px, "
+        f"{stats['bytes'] / 1024:,.0f} KB (giảm {max(stats['bytes_saved'], 0) / 1024:,.0f} KB "
+        f"so với ảnh gốc {stats['original_bytes'] / 1024:,.0f} KB)"
+    )
+    
+    if st.button("Phân tích ảnh", key="analyze_image_btn"):
+        with st.spinner("Đang phân tích ảnh..."):
+            try:
+                # Chuyển ảnh đã xử lý thành base64 để gửi đến API
+                img_str = base64.b64encode(prepared["data"]).decode()
+                
+                # Gọi API để phân tích ảnh, lưu lại để form điều chỉnh không mất khi chạy lại fragment
+                st.session_state[analysis_key] = analyze_image(img_str)
+            except Exception as e:
+                logger.error(f"Lỗi khi phân tích ảnh: {str(e)}")
+                st.error(f"Không thể phân tích ảnh: {str(e)}")
+                st.session_state.pop(analysis_key, None)
+
+    analysis_result = st.session_state.get(analysis_key)
+    if analysis_result:
+        show_analysis_result(analysis_result)
         
-        if st.button("Phân tích ảnh", key="analyze_image_btn"):
-            with st.spinner("Đang phân tích ảnh..."):
-                try:
-                    # Chuyển ảnh thành base64 để gửi đến API
-                    buffered = io.BytesIO()
-                    image.save(buffered, format="JPEG")
-                    img_str = base64.b64encode(buffered.getvalue()).decode()
-                    
-                    # Gọi API để phân tích ảnh
-                    analysis_result = analyze_image(img_str)
-                    
-                    # Hiển thị kết quả phân tích
-                    st.success("Kết quả phân tích:")
-                    
-                    # Hiển thị thông số gợi ý từ API
-                    st.subheader("Thông số xe nhận diện được:")
-                    for key, value in analysis_result.items():
-                        st.write(f"**{key}:** {value}")
-                    
-                    # Lấy giá trị thương hiệu và mẫu xe từ kết quả phân tích
-                    brand_detected = analysis_result.get("brand", "Honda")
-                    model_detected = analysis_result.get("model", "")
-                    year_detected = analysis_result.get("year", 2020)
-                    condition_detected = analysis_result.get("condition", "Tốt")
-                    
-                    # Display form for adjustment
-                    show_adjustment_form_from_analysis(brand_detected, model_detected, year_detected, condition_detected, "tab2")
-                except Exception as e:
-                    logger.error(f"Lỗi khi phân tích ảnh: {str(e)}")
-                    st.error(f"Không thể phân tích ảnh: {str(e)}")
+        # Lấy giá trị thương hiệu và mẫu xe từ kết quả phân tích
+        brand_detected = analysis_result.get("brand", "Honda")
+        model_detected = analysis_result.get("model", "")
+        year_detected = analysis_result.get("year", 2020)
+        condition_detected = analysis_result.get("condition", "Tốt")
+        
+        # Display form for adjustment
+        show_adjustment_form_from_analysis(brand_detected, model_detected, year_detected, condition_detected, "tab2")
 
+@st.fragment
 def show_input_description_tab():
     """Hiển thị tab nhập mô tả"""
+    with log_render_time("tab nhập mô tả"):
+        render_input_description_tab()
+
+def render_input_description_tab():
+    """Nội dung tab nhập mô tả"""
     st.subheader("Nhập mô tả xe")
     
     # Kiểm tra model tồn tại
     model_available = check_model()
+    analysis_key = ANALYSIS_KEY.format(tab_key="tab3")
         
     description = st.text_area(
         "Mô tả chi tiết về xe máy của bạn",
@@ -185,38 +254,45 @@ def show_input_description_tab():
         if description:
             with st.spinner("Đang phân tích mô tả..."):
                 try:
-                    # Gọi API để phân tích mô tả
-                    analysis_result = analyze_description(description)
-                    
-                    # Hiển thị kết quả phân tích
-                    st.success("Kết quả phân tích:")
-                    
-                    # Hiển thị thông số gợi ý từ API
-                    st.subheader("Thông số xe nhận diện được:")
-                    for key, value in analysis_result.items():
-                        st.write(f"**{key}:** {value}")
-                    
-                    # Lấy giá trị từ kết quả phân tích
-                    brand_detected = analysis_result.get("brand", "Honda")
-                    model_detected = analysis_result.get("model", "")
-                    year_detected = analysis_result.get("year", 2020)
-                    km_detected = analysis_result.get("km_driven", 15000)
-                    condition_detected = analysis_result.get("condition", "Tốt")
-                    
-                    # Show form for adjustment
-                    show_adjustment_form_from_analysis(brand_detected, model_detected, year_detected, condition_detected, "tab3", km_detected)
+                    # Gọi API để phân tích mô tả, lưu lại để form điều chỉnh không mất khi chạy lại fragment
+                    st.session_state[analysis_key] = analyze_description(description)
                 except Exception as e:
                     logger.error(f"Lỗi khi phân tích mô tả: {str(e)}")
                     st.error(f"Không thể phân tích mô tả: {str(e)}")
+                    st.session_state.pop(analysis_key, None)
         else:
             st.error("Vui lòng nhập mô tả về xe máy của bạn")
 
+    analysis_result = st.session_state.get(analysis_key)
+    if analysis_result:
+        show_analysis_result(analysis_result)
+        
+        # Lấy giá trị từ kết quả phân tích
+        brand_detected = analysis_result.get("brand", "Honda")
+        model_detected = analysis_result.get("model", "")
+        year_detected = analysis_result.get("year", 2020)
+        km_detected = analysis_result.get("km_driven", 15000)
+        condition_detected = analysis_result.get("condition", "Tốt")
+        
+        # Show form for adjustment
+        show_adjustment_form_from_analysis(brand_detected, model_detected, year_detected, condition_detected, "tab3", km_detected)
+
+def show_analysis_result(analysis_result):
+    """Hiển thị thông số xe nhận diện được từ ảnh hoặc mô tả"""
+    st.success("Kết quả phân tích:")
+    
+    # Hiển thị thông số gợi ý từ API
+    st.subheader("Thông số xe nhận diện được:")
+    for key, value in analysis_result.items():
+        st.write(f"**{key}:** {value}")
+
 def show_adjustment_form_from_analysis(brand_detected, model_detected, year_detected, condition_detected, tab_key, km_detected=None):
     """Hiển thị form điều chỉnh thông số dựa trên kết quả phân tích"""
     # Lấy danh sách thương hiệu và mẫu xe
-    brands = get_brands()
+    catalogue = get_catalogue()
+    brands = catalogue.brands()
     
-    models = get_models(brand_detected) if brand_detected in brands else []
+    models = catalogue.models(brand_detected)
   
     
     # Tạo form để người dùng điều chỉnh thông số
@@ -233,10 +309,7 @@ def show_adjustment_form_from_analysis(brand_detected, model_detected, year_dete
         
         # Lấy lại danh sách mẫu xe nếu thương hiệu thay đổi
         if brand != brand_detected:
-            try:
-                models = get_models(brand)
-            except Exception as e:
-                models = []
+            models = catalogue.models(brand)
         
         model = st.selectbox(
             "Mẫu xe",
@@ -327,7 +400,7 @@ def show_adjustment_form_from_analysis(brand_detected, model_detected, year_dete
         process_prediction(brand, model, variant, year, km_driven, condition, origin)
 
 def process_prediction(brand, model, variant, year, km_driven, condition, origin):
-    """Xử lý dự đoán giá"""
+    """Dự đoán giá, lưu kết quả vào session_state rồi chạy lại trang để cập nhật phần kết quả"""
     try:
         with st.spinner("Đang dự đoán giá..."):
             # Khởi tạo model từ đường dẫn trong config
@@ -345,39 +418,82 @@ def process_prediction(brand, model, variant, year, km_driven, condition, origin
             }
             # Dự đoán giá
             result = predictor.predict(input_data)
-            
-            # Định dạng giá trị tiền để dễ đọc
-            formatted_price = f"{result['price'] / 1_000_000:.2f}".rstrip('0').rstrip('.') if result['price'] % 1_000_000 == 0 else f"{result['price'] / 1_000_000:.2f}"
-            formatted_low = f"{result['price_range'][0] / 1_000_000:.2f}".rstrip('0').rstrip('.')
-            formatted_high = f"{result['price_range'][1] / 1_000_000:.2f}".rstrip('0').rstrip('.')
-            
-            # Hiển thị kết quả
-            st.success("Kết quả dự đoán:")
-            col1, col2 = st.columns(2)
-            with col1:
-                st.metric("Giá dự đoán", f"{formatted_price} triệu VND")
-                st.metric("Khoảng giá", f"{formatted_low} - {formatted_high} triệu VND")
-            with col2:
-                st.progress(result['confidence'])
-                st.write(f"Độ tin cậy: {int(result['confidence']*100)}%")
-            
-            
-            # Tìm và hiển thị các bài đăng tương tự
-            with st.spinner("Đang tìm kiếm các bài đăng tương tự..."):
-                similar_listings = fetch_similar_listings(
-                    predicted_price=result['price'],
-                    input_data=input_data,
-                )
-                
-                if not similar_listings.empty:
-                    st.markdown("---")
-                    display_similar_listings(similar_listings)
-                else:
-                    st.info("Không tìm thấy bài đăng tương tự.")
-            
     except Exception as e:
         logger.error(f"Lỗi khi dự đoán giá: {str(e)}")
         st.error(f"Lỗi khi dự đoán giá: {str(e)}")
+        return
+
+    st.session_state[PREDICTION_KEY] = {"input_data": input_data, "result": result}
+    # Nút bấm nằm trong fragment của tab: chạy lại cả trang để phần kết quả bên dưới được cập nhật
+    st.rerun()
+
+@st.fragment
+def show_prediction_result():
+    """Hiển thị kết quả dự đoán gần nhất (lưu trong session_state)"""
+    prediction = st.session_state.get(PREDICTION_KEY)
+    if not prediction:
+        return
+
+    with log_render_time("kết quả dự đoán"):
+        input_data, result = prediction["input_data"], prediction["result"]
+        
+        # Định dạng giá trị tiền để dễ đọc
+        formatted_price = f"{result['price'] / 1_000_000:.2f}".rstrip('0').rstrip('.') if result['price'] % 1_000_000 == 0 else f"{result['price'] / 1_000_000:.2f}"
+        formatted_low = f"{result['price_range'][0] / 1_000_000:.2f}".rstrip('0').rstrip('.')
+        formatted_high = f"{result['price_range'][1] / 1_000_000:.2f}".rstrip('0').rstrip('.')
+        
+        # Hiển thị kết quả
+        st.success(f"Kết quả dự đoán: {input_data['brand']} {input_data['model']} {input_data['reg_year']}")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Giá dự đoán", f"{formatted_price} triệu VND")
+            st.metric("Khoảng giá", f"{formatted_low} - {formatted_high} triệu VND")
+        with col2:
+            st.progress(result['confidence'])
+            st.write(f"Độ tin cậy: {int(result['confidence']*100)}%")
+
+        show_price_position(input_data["brand"], input_data["model"], input_data["reg_year"],
+                            input_data["mileage"], result['price'])
+
+@st.fragment
+def show_similar_listings_panel():
+    """Hiển thị các bài đăng tương tự với kết quả dự đoán gần nhất"""
+    prediction = st.session_state.get(PREDICTION_KEY)
+    if not prediction:
+        return
+
+    with log_render_time("bài đăng tương tự"):
+        # Tìm và hiển thị các bài đăng tương tự
+        with st.spinner("Đang tìm kiếm các bài đăng tương tự..."):
+            similar_listings = fetch_similar_listings(
+                predicted_price=prediction["result"]['price'],
+                input_data=prediction["input_data"],
+            )
+            
+            if not similar_listings.empty:
+                st.markdown("---")
+                display_similar_listings(similar_listings)
+            else:
+                st.info("Không tìm thấy bài đăng tương tự.")
+
+def show_model_market_range(catalogue, brand, model):
+    """Hiển thị khoảng năm đăng ký và số km của mẫu xe trên thị trường"""
+    label = catalogue.market_range_label(brand, model)
+    if label:
+        st.caption(f"Trên thị trường: {label}")
+
+def show_price_position(brand, model, year, km_driven, price):
+    """Hiển thị phân vị của giá dự đoán trong phân phối giá thị trường của mẫu xe"""
+    position = get_price_position(brand, model, year, km_driven, price)
+    if not position:
+        return
+    group = " ".join(str(part) for part in (model, position["reg_year"]) if part)
+    if position["km_label"]:
+        group += f" với {position['km_label']}"
+    st.info(
+        f"Mức giá này nằm ở phân vị thứ {position['percentile']:.0f} của {group} "
+        f"(rẻ hơn khoảng {100 - position['percentile']:.0f}% trong {position['listing_count']:,} tin đăng)"
+    )
 
 def convert_km_range_to_value(km_range):
     """Chuyển đổi khoảng km thành giá trị số"""
@@ -427,27 +543,9 @@ def fetch_similar_listings(predicted_price, input_data):
             mileage=mileage,
             condition=condition,
             origin=origin,
+            limit=MAX_SIMILAR_LISTINGS,
         )
-        valid_urls = []
-        count = 0
-        for url in similar_listings['url_full']:
-            try:
-                if count > 5:
-                    break
-                count +=1
-                # Thử kết nối và kiểm tra status code
-                response = requests.get(url)
-                
-                # Chỉ giữ lại URL có status code 200
-                if response.status_code == 200:
-                    valid_urls.append(url)
-            
-            except requests.RequestException:
-                # Bỏ qua các URL gặp lỗi kết nối
-                continue
-        
-        # Lọc DataFrame chỉ giữ lại các URL hợp lệ
-        similar_listings =  similar_listings[similar_listings['url_full'].isin(valid_urls)]
+        # Bài đăng đã bị gỡ được lọc sẵn trong database (is_alive) nên không cần gọi HTTP ở đây
         logger.info(f"Đã tìm thấy {len(similar_listings)} bài đăng tương tự")
         return similar_listings
     
@@ -459,6 +557,9 @@ def display_similar_listings(similar_listings):
     """
     Hiển thị các bài đăng có giá gần với giá dự đoán
     
+    Tất cả thẻ bài đăng được tạo thành một khối HTML (vector hóa trên DataFrame) và gửi bằng
+    một lần st.markdown, thay vì vài widget cho mỗi bài đăng.
+    
     Args:
         similar_listings: DataFrame chứa thông tin các bài đăng tương tự
     """
@@ -467,72 +568,4 @@ def display_similar_listings(similar_listings):
         return
     
     st.subheader("Các bài đăng tương tự trên thị trường")
-    
-    # Hiển thị các bài đăng
-    for i, row in similar_listings.iterrows():
-        with st.container():
-            # Tạo layout với 3 columns
-            col1, col2, col3 = st.columns([3, 2, 1])
-            
-            with col1:
-                # Thông tin chính về xe
-                st.markdown(f"**{row['title']}**")
-                
-                # Thông tin chi tiết về xe với icon
-                if 'brand' in row and row['brand'] and 'model' in row and row['model']:
-                    st.text(f"🏭 Model: {row['brand']} {row['model']}")
-                if 'reg_year' in row and row['reg_year']:
-                    st.text(f"📅 Năm đăng ký: {row['reg_year']}")
-                if 'condition' in row and row['condition']:
-                    st.text(f"🔍 Tình trạng: {row['condition']}")
-                
-                # Thông tin về vị trí và thời gian đăng
-                if 'location' in row and row['location']:
-                    st.text(f"📍 {row['location']}")
-                
-                # Thông tin về thời gian đăng
-                if 'post_date_display' in row and row['post_date_display']:
-                    st.text(f"⏱️ Đăng ngày: {row['post_date_display']}")
-                elif 'days_since_posted' in row and row['days_since_posted'] is not None:
-                    st.text(f"⏱️ Đã đăng: {row['days_since_posted']} ngày trước")
-                
-            with col2:
-                # Thông tin kỹ thuật
-                tech_details = []
-                if 'mileage' in row and row['mileage']:
-                    tech_details.append(f"📏 Số km: {row['mileage']}")
-                if 'engine_capacity' in row and row['engine_capacity']:
-                    tech_details.append(f"🔧 Dung tích: {row['engine_capacity']}")
-                if 'origin' in row and row['origin']:
-                    tech_details.append(f"🌐 Nguồn gốc: {row['origin']}")
-                
-                for detail in tech_details:
-                    st.text(detail)
-                
-                # Mô tả ngắn nếu có
-                if 'description' in row and row['description']:
-                    # Cắt mô tả nếu quá dài
-                    description = row['description']
-                    if len(description) > 150:
-                        description = description[:147] + "..."
-                    st.markdown(f"📝 **Mô tả:**\n{description}")
-            
-            with col3:
-                # Hiển thị giá và nút xem chi tiết
-                if 'price_millions' in row and row['price_millions'] is not None:
-                    st.markdown(f"### {row['price_millions']} triệu")
-                elif 'price' in row and row['price']:
-                    st.markdown(f"### {row['price']}")
-                                
-                # Tạo khóa duy nhất cho mỗi nút
-                button_key = f"btn_listing_{row.get('id', i)}"
-                
-                # Kiểm tra URL có đầy đủ không
-                url = row.get('url_full', row.get('url', ''))
-                if url and not url.startswith(('http://', 'https://')):
-                    url = f"https://xe.chotot.com{url}"
-                
-                # Hiển thị liên kết trực tiếp
-                st.markdown(f"<a href='{url}' target='_blank'><button style='background-color:#1E88E5; color:white; border:none; border-radius:4px; padding:8px 16px; cursor:pointer; width:100%;'>Xem chi tiết</button></a>", unsafe_allow_html=True)
-            
-            st.markdown("---")
\ No newline at end of file
+    st.markdown(render_listing_cards(similar_listings), unsafe_allow_html=True)